@@ -0,0 +1 @@
+from .throughput import benchmark_env, benchmark_trace, compare, record_trace
@@ -0,0 +1,136 @@
+"""
+Environment throughput benchmarks.
+
+    python -m pyboy_environment.benchmarks run --act_freq 24 12 -o bench.json
+    python -m pyboy_environment.benchmarks record-trace -o trace.npz
+    python -m pyboy_environment.benchmarks trace --trace trace.npz -o bench.json
+    python -m pyboy_environment.benchmarks compare baseline.json bench.json
+
+run falls back to the RAM-trace benchmark for any domain whose ROM is missing
+when --trace is given.
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from pyboy_environment.benchmarks import throughput
+from pyboy_environment.benchmarks.ram_trace import load_trace
+
+logging.basicConfig(level=logging.INFO)
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser(prog="python -m pyboy_environment.benchmarks")
+    commands = parse_args.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run")
+    run.add_argument("--domain", type=str, nargs="+", default=list(throughput.TASKS))
+    run.add_argument("--act_freq", type=int, nargs="+", default=[24])
+    run.add_argument("--windowed", action="store_true")
+    run.add_argument("--steps", type=int, default=2000)
+    run.add_argument("--resets", type=int, default=50)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--trace", type=str, default=None)
+    run.add_argument("-o", "--output", type=str, default=None)
+
+    record = commands.add_parser("record-trace")
+    record.add_argument("--domain", type=str, default="pokemon")
+    record.add_argument("--task", type=str, default="brock")
+    record.add_argument("--act_freq", type=int, default=24)
+    record.add_argument("--steps", type=int, default=1000)
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("-o", "--output", type=str, required=True)
+
+    trace = commands.add_parser("trace")
+    trace.add_argument("--trace", type=str, required=True)
+    trace.add_argument("--repeats", type=int, default=1)
+    trace.add_argument("-o", "--output", type=str, default=None)
+
+    compare = commands.add_parser("compare")
+    compare.add_argument("baseline", type=str)
+    compare.add_argument("current", type=str)
+    compare.add_argument("--threshold", type=float, default=0.1)
+
+    return parse_args.parse_args()
+
+
+def write_results(results: list[dict], output: str) -> None:
+    report = {"meta": throughput.metadata(), "results": results}
+    text = json.dumps(report, indent=2)
+
+    if output is None:
+        print(text)
+        return
+
+    with open(output, "w", encoding="utf-8") as file:
+        file.write(text)
+    logging.info(f"Saved benchmark results to {output}")
+
+
+def run(args) -> list[dict]:
+    trace_domain = None
+    if args.trace is not None:
+        _, trace_domain, _ = load_trace(args.trace)
+
+    results = []
+    for domain in args.domain:
+        if not throughput.rom_available(domain):
+            if domain != trace_domain:
+                logging.warning(f"No ROM or RAM trace for {domain}, skipping")
+                continue
+            logging.info(f"No ROM for {domain}, running the RAM-trace benchmark")
+            results.append(throughput.benchmark_trace(args.trace))
+            continue
+
+        for task in throughput.TASKS[domain]:
+            for act_freq in args.act_freq:
+                logging.info(f"Benchmarking {domain} {task} act_freq={act_freq}")
+                result = throughput.benchmark_env(
+                    domain,
+                    task,
+                    act_freq,
+                    headless=not args.windowed,
+                    steps=args.steps,
+                    resets=args.resets,
+                    seed=args.seed,
+                )
+                logging.info(
+                    f"{result['steps_per_sec']:.1f} steps/s "
+                    f"{result['ticks_per_sec']:.1f} ticks/s"
+                )
+                results.append(result)
+    return results
+
+
+def main():
+    args = get_args()
+
+    if args.command == "run":
+        write_results(run(args), args.output)
+    elif args.command == "record-trace":
+        throughput.record_trace(
+            args.domain, args.task, args.act_freq, args.steps, args.output, args.seed
+        )
+        logging.info(f"Saved RAM trace to {args.output}")
+    elif args.command == "trace":
+        write_results(
+            [throughput.benchmark_trace(args.trace, args.repeats)], args.output
+        )
+    elif args.command == "compare":
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.current, "r", encoding="utf-8") as file:
+            current = json.load(file)
+
+        regressions = throughput.compare(baseline, current, args.threshold)
+        for regression in regressions:
+            logging.warning(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logging.info("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Recorded RAM traces so the decode benchmarks can run without a ROM.
+
+A trace holds WRAM (0xC000-0xE000) and HRAM (0xFF80-0xFFFF) after every step of a
+real run. TracePyBoy replays it behind the small part of the PyBoy API that the
+RAM decoders and environment construction use - memory reads, frame_count, tick
+and no-op stand-ins for the rest.
+"""
+
+import numpy as np
+from pyboy import PyBoy
+
+TRACE_RANGES = ((0xC000, 0xE000), (0xFF80, 0x10000))
+
+
+def capture(pyboy: PyBoy) -> np.ndarray:
+    return np.concatenate(
+        [
+            np.array(pyboy.memory[start:end], dtype=np.uint8)
+            for start, end in TRACE_RANGES
+        ]
+    )
+
+
+def save_trace(path: str, frames: np.ndarray, domain: str, task: str) -> None:
+    np.savez_compressed(path, frames=frames, domain=domain, task=task)
+
+
+def load_trace(path: str) -> tuple[np.ndarray, str, str]:
+    with np.load(path) as data:
+        return data["frames"], str(data["domain"]), str(data["task"])
+
+
+class TraceMemory:
+    def __init__(self) -> None:
+        self.data = np.zeros(0x10000, dtype=np.uint8)
+
+    def load(self, frame: np.ndarray) -> None:
+        position = 0
+        for start, end in TRACE_RANGES:
+            self.data[start:end] = frame[position : position + end - start]
+            position += end - start
+
+    def __getitem__(self, addr):
+        if isinstance(addr, slice):
+            return self.data[addr].tolist()
+        return int(self.data[addr])
+
+
+class TracePyBoy:
+    def __init__(self, frames: np.ndarray) -> None:
+        self.frames = frames
+        self.memory = TraceMemory()
+        self.frame_count = 0
+        self.index = 0
+        self.memory.load(frames[0])
+
+    def tick(self, count: int = 1, render: bool = True) -> bool:
+        self.frame_count += count
+        self.index = (self.index + 1) % len(self.frames)
+        self.memory.load(self.frames[self.index])
+        return True
+
+    def send_input(self, event) -> None:
+        pass
+
+    # A trace only holds RAM
+    screen = None
+
+    def set_emulation_speed(self, speed: int) -> None:
+        pass
@@ -0,0 +1,258 @@
+import platform
+import random
+import subprocess
+import time
+from importlib import metadata as package_metadata
+from pathlib import Path
+
+import numpy as np
+
+from pyboy_environment import suite
+from pyboy_environment.benchmarks.ram_trace import (
+    TracePyBoy,
+    capture,
+    load_trace,
+    save_trace,
+)
+from pyboy_environment.benchmarks.timing import summarise
+from pyboy_environment.environments.pokemon.ram_schema import FIELDS, RamReader
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+
+ROMS = {"pokemon": "PokemonRed.gb", "mario": "SuperMarioLand.gb"}
+TASKS = {"pokemon": ["brock"], "mario": ["run"]}
+
+# Only the Pokemon decoders run purely from RAM, so only they can use a trace
+TRACE_TASKS = {("pokemon", "brock"): PokemonBrock}
+
+REWARD_HELPERS = [
+    "_caught_reward",
+    "_seen_reward",
+    "_health_reward",
+    "_xp_reward",
+    "_levels_reward",
+    "_badges_reward",
+    "_money_reward",
+    "_event_reward",
+]
+
+
+def rom_available(domain: str) -> bool:
+    return Path(f"{Path.home()}/cares_rl_configs/{domain}/{ROMS[domain]}").exists()
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pyboy": package_metadata.version("pyboy"),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def _actions(env, steps: int, seed: int) -> list[np.ndarray]:
+    random.seed(seed)
+    np.random.seed(seed)
+    return [np.atleast_1d(env.sample_action()) for _ in range(steps)]
+
+
+def _run_steps(env, actions: list[np.ndarray]) -> None:
+    for action in actions:
+        _, _, done, truncated = env.step(action)
+        if done or truncated:
+            env.reset()
+
+
+def benchmark_env(
+    domain: str,
+    task: str,
+    act_freq: int,
+    headless: bool = True,
+    steps: int = 2000,
+    resets: int = 50,
+    seed: int = 0,
+) -> dict:
+    env = suite.make(domain, task, act_freq, headless=headless)
+    actions = _actions(env, steps, seed)
+
+    reset_samples = []
+    for _ in range(resets):
+        start = time.perf_counter()
+        env.reset()
+        reset_samples.append(time.perf_counter() - start)
+
+    env.reset()
+    start_frame = env.pyboy.frame_count
+    start = time.perf_counter()
+    _run_steps(env, actions)
+    elapsed = time.perf_counter() - start
+    frames = env.pyboy.frame_count - start_frame
+
+    # Second pass with every phase wrapped, so the throughput above is not skewed
+    env.reset()
+    profiler = env.enable_profiling()
+    _run_steps(env, actions)
+    env.disable_profiling()
+
+    decode_samples = []
+    for _ in range(min(steps, 500)):
+        start = time.perf_counter()
+        env._generate_game_stats()
+        decode_samples.append(time.perf_counter() - start)
+
+    env.pyboy.stop(save=False)
+
+    phases = profiler.summary()
+    phases["decode_game_stats"] = summarise(decode_samples)
+    return {
+        "mode": "rom",
+        "domain": domain,
+        "task": task,
+        "act_freq": act_freq,
+        "headless": headless,
+        "steps": steps,
+        "steps_per_sec": steps / elapsed,
+        "ticks_per_sec": frames / elapsed,
+        "reset_latency": summarise(reset_samples),
+        "phases": phases,
+    }
+
+
+def record_trace(
+    domain: str, task: str, act_freq: int, steps: int, path: str, seed: int = 0
+) -> None:
+    if (domain, task) not in TRACE_TASKS:
+        raise ValueError(f"RAM traces are not supported for {domain} {task}")
+
+    env = suite.make(domain, task, act_freq, headless=True)
+    actions = _actions(env, steps, seed)
+
+    env.reset()
+    frames = np.empty((steps, len(capture(env.pyboy))), dtype=np.uint8)
+    for i, action in enumerate(actions):
+        _, _, done, truncated = env.step(action)
+        frames[i] = capture(env.pyboy)
+        if done or truncated:
+            env.reset()
+
+    env.pyboy.stop(save=False)
+    save_trace(path, frames, domain, task)
+
+
+def _trace_environment(task_class, pyboy: TracePyBoy, act_freq: int = 24):
+    # Built through the normal __init__, with the trace in place of the emulator
+    class TraceTask(task_class):
+        def _create_pyboy(self, headless: bool) -> TracePyBoy:
+            return pyboy
+
+        def _load_init_state(self) -> None:
+            # The trace has no savestate to return to
+            self._invalidate_frame_cache()
+
+    return TraceTask(act_freq, headless=True)
+
+
+def benchmark_trace(path: str, repeats: int = 1) -> dict:
+    frames, domain, task = load_trace(path)
+    if (domain, task) not in TRACE_TASKS:
+        raise ValueError(f"RAM traces are not supported for {domain} {task}")
+
+    pyboy = TracePyBoy(frames)
+    env = _trace_environment(TRACE_TASKS[(domain, task)], pyboy)
+    reader = RamReader(list(FIELDS))
+
+    samples = {
+        "read_ram": [],
+        "decode_game_stats": [],
+        "event_flags": [],
+        "schema_all_fields": [],
+        "reward_helpers": [],
+    }
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        samples[name].append(time.perf_counter() - start)
+        return result
+
+    for _ in range(repeats * len(frames)):
+        pyboy.tick()
+        ram = timed("read_ram", env._read_ram)
+        stats = timed("decode_game_stats", env._generate_game_stats)
+        timed("event_flags", env._read_event_flags)
+        timed("schema_all_fields", lambda: reader.read(ram))
+        timed(
+            "reward_helpers",
+            lambda: sum(getattr(env, name)(stats) for name in REWARD_HELPERS),
+        )
+        env.prior_game_stats = stats
+
+    return {
+        "mode": "trace",
+        "domain": domain,
+        "task": task,
+        "frames": int(len(frames)) * repeats,
+        "phases": {name: summarise(values) for name, values in samples.items()},
+    }
+
+
+def _result_key(result: dict) -> tuple:
+    return (
+        result["mode"],
+        result["domain"],
+        result["task"],
+        result.get("act_freq"),
+        result.get("headless"),
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[str]:
+    """
+    Returns a description of every metric in current that is more than threshold
+    (as a fraction) worse than the matching run in baseline.
+    """
+    baseline_results = {_result_key(r): r for r in baseline["results"]}
+
+    regressions = []
+    for result in current["results"]:
+        key = _result_key(result)
+        if key not in baseline_results:
+            continue
+        old = baseline_results[key]
+
+        # Higher is better
+        for metric in ["steps_per_sec", "ticks_per_sec"]:
+            if metric in result and result[metric] < old[metric] * (1 - threshold):
+                regressions.append(
+                    f"{key} {metric}: {old[metric]:.1f} -> {result[metric]:.1f}"
+                )
+
+        # Lower is better
+        timings = dict(result["phases"])
+        old_timings = dict(old["phases"])
+        if "reset_latency" in result:
+            timings["reset_latency"] = result["reset_latency"]
+            old_timings["reset_latency"] = old["reset_latency"]
+        for name, timing in timings.items():
+            if name not in old_timings or old_timings[name]["count"] == 0:
+                continue
+            before = old_timings[name]["mean_us"]
+            if timing["mean_us"] > before * (1 + threshold):
+                regressions.append(
+                    f"{key} {name}: {before:.1f}us -> {timing['mean_us']:.1f}us"
+                )
+
+    return regressions
@@ -0,0 +1,14 @@
+import numpy as np
+
+
+def summarise(samples: list[float]) -> dict[str, float]:
+    # Seconds in, microseconds out
+    values = np.asarray(samples, dtype=np.float64) * 1e6
+    if values.size == 0:
+        return {"count": 0, "mean_us": 0.0, "p50_us": 0.0, "p95_us": 0.0}
+    return {
+        "count": int(values.size),
+        "mean_us": float(values.mean()),
+        "p50_us": float(np.percentile(values, 50)),
+        "p95_us": float(np.percentile(values, 95)),
+    }
@@ -1,10 +1,9 @@
 import argparse
-import glob
-import json
 import logging
-from functools import cmp_to_key
 
 import numpy as np
+from pyboy_environment.leaderboard import Leaderboard
+from pyboy_environment.statistical_ranking import METRICS, bootstrap_ranking, load_runs
 
 logging.basicConfig(level=logging.INFO)
 
@@ -52,32 +51,55 @@ def get_args():
 
     parse_args.add_argument("-r", "--results_path", type=str, required=True)
 
+    # Defaults to results_path/leaderboard.sqlite
+    parse_args.add_argument("--database_path", type=str, default=None)
+
+    # Rank every results*.json run of each UPI with this many bootstrap resamples
+    parse_args.add_argument("--bootstrap", type=int, default=0)
+
+    parse_args.add_argument("--confidence", type=float, default=0.95)
+
+    parse_args.add_argument("--seed", type=int, default=None)
+
     return parse_args.parse_args()
 
 
+def log_bootstrap_ranking(results_path, samples, confidence, seed):
+    runs = load_runs(results_path)
+    logging.info(
+        f"Found {sum(len(rows) for rows in runs.values())} runs of {len(runs)} UPIs"
+    )
+
+    for result in bootstrap_ranking(runs, samples, confidence, seed):
+        low, high = result["rank_interval"]
+        metrics = " ".join(
+            f"{name}: {result['means'][name]:.2f} "
+            f"[{result['intervals'][name][0]:.2f}, {result['intervals'][name][1]:.2f}]"
+            for name in METRICS
+        )
+        tied = " (tied with next)" if result["tied_with_next"] else ""
+        logging.info(
+            f"Rank {result['rank']} [{low}, {high}]: {result['upi']} "
+            f"- Runs: {result['runs']} {metrics}{tied}"
+        )
+
+
 def main():
     args = get_args()
 
     results_path = args.results_path
 
-    result_directories = glob.glob(f"{results_path}/*")
-    logging.info(f"Found {len(result_directories)} results directories")
-    logging.info(f"Results directories: {result_directories}")
-
     logging.info(f"Comparing results in {results_path}")
 
-    results = []
-    for result_directory in result_directories:
-        upi = result_directory.split("/")[-1]
-        logging.info(f"Reading results for UPI: {upi}")
-
-        with open(f"{result_directory}/results.json", "r", encoding="utf-8") as file:
-            result = json.load(file)
-            result["upi"] = upi
+    if args.bootstrap > 0:
+        log_bootstrap_ranking(results_path, args.bootstrap, args.confidence, args.seed)
+        return
 
-            results.append(result)
+    with Leaderboard(results_path, args.database_path) as leaderboard:
+        changed = leaderboard.update()
+        results = leaderboard.ranking()
 
-    results = sorted(results, key=cmp_to_key(compare_performance))
+    logging.info(f"Found {len(results)} results, {changed} new or changed")
 
     for i, result in enumerate(results):
         logging.info(
@@ -1,3 +1,6 @@
 from .pyboy_environment import PyboyEnvironment
+from .vec_pyboy_environment import VecPyboyEnvironment
+from .recorder import EpisodeRecorder, Recording
+from .task_loader import load_task
 from .mario import MarioEnvironment
 from .pokemon import PokemonEnvironment
@@ -0,0 +1,48 @@
+from bisect import bisect_right
+
+import numpy as np
+
+
+class ButtonBins:
+    """
+    Maps a continuous action in [0, 1] to one of num_buttons buttons.
+
+    The bins are the ones np.digitize used over np.linspace(0, 1, num_buttons + 1),
+    built once per environment instead of on every step. Actions above upper fall
+    into the last bin and actions below 0 into the first.
+    """
+
+    def __init__(self, num_buttons: int, upper: float = 0.99) -> None:
+        self.num_buttons = num_buttons
+        self.upper = upper
+        self.bins = np.linspace(0, 1, num_buttons + 1)
+        self._edges = self.bins.tolist()
+
+    def __call__(self, action: float) -> int:
+        button = bisect_right(self._edges, min(action, self.upper)) - 1
+        return min(max(button, 0), self.num_buttons - 1)
+
+    def batch(self, actions: np.ndarray) -> np.ndarray:
+        # (n,) or (n, 1) actions to (n,) button indices
+        actions = np.asarray(actions, dtype=np.float64).reshape(len(actions), -1)
+        actions = np.minimum(actions[:, 0], self.upper)
+        buttons = np.searchsorted(self.bins, actions, side="right") - 1
+        return np.clip(buttons, 0, self.num_buttons - 1)
+
+
+class ButtonToggles:
+    """
+    Maps one value per button to held (>= threshold) or released, as used by Mario
+    where any combination of buttons can be pressed at once.
+    """
+
+    def __init__(self, num_buttons: int, threshold: float = 0.5) -> None:
+        self.num_buttons = num_buttons
+        self.threshold = threshold
+
+    def __call__(self, action) -> list[bool]:
+        return [toggle >= self.threshold for toggle in action]
+
+    def batch(self, actions: np.ndarray) -> np.ndarray:
+        # (n, num_buttons) actions to (n, num_buttons) held flags
+        return np.asarray(actions, dtype=np.float64) >= self.threshold
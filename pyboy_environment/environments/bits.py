@@ -0,0 +1,13 @@
+import numpy as np
+
+# Number of set bits in every possible byte value
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values: np.ndarray, axis: int = None) -> np.ndarray:
+    return POPCOUNT[values].sum(axis=axis, dtype=np.int64)
+
+
+def unpack_flags(values: np.ndarray) -> np.ndarray:
+    # Flag i is bit (i % 8) of byte (i // 8), least significant bit first
+    return np.unpackbits(values, bitorder="little").view(bool)
@@ -0,0 +1,54 @@
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class EpisodeEvents:
+    """
+    Counts named reward-shaping events (battle started, move selected, ...) over
+    one episode in place of printing them from the reward functions.
+
+    Up to sample_limit records per event are kept with their fields. Events are
+    also logged at DEBUG level, at most once every log_interval seconds per event,
+    so turning on logging does not put terminal I/O back on every step.
+    """
+
+    def __init__(self, sample_limit: int = 0, log_interval: float = 10.0) -> None:
+        self.sample_limit = sample_limit
+        self.log_interval = log_interval
+
+        self.counts = Counter()
+        self.samples = []
+        self.last_episode = {"counts": {}, "samples": []}
+        self._last_logged = {}
+
+    def emit(self, name: str, step: int, **fields) -> None:
+        self.counts[name] += 1
+
+        if self.counts[name] <= self.sample_limit:
+            self.samples.append({"event": name, "step": step, **fields})
+
+        if logger.isEnabledFor(logging.DEBUG):
+            now = time.monotonic()
+            if (
+                now - self._last_logged.get(name, -self.log_interval)
+                >= self.log_interval
+            ):
+                self._last_logged[name] = now
+                logger.debug(
+                    "%s at step %d (%d this episode) %s",
+                    name,
+                    step,
+                    self.counts[name],
+                    fields,
+                )
+
+    def summary(self) -> dict:
+        return {"counts": dict(self.counts), "samples": list(self.samples)}
+
+    def end_episode(self) -> None:
+        self.last_episode = self.summary()
+        self.counts = Counter()
+        self.samples = []
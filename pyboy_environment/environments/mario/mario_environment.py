@@ -13,6 +13,7 @@ from abc import ABCMeta
 import numpy as np
 from pyboy.utils import WindowEvent
 
+from pyboy_environment.environments.actions import ButtonToggles
 from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
 
 
@@ -25,6 +26,8 @@ class MarioEnvironment(PyboyEnvironment, metaclass=ABCMeta):
         emulation_speed: int = 0,
         headless: bool = False,
     ) -> None:
+        # One held/released flag per button
+        self.action_decoder = ButtonToggles(len(valid_actions))
 
         super().__init__(
             task="mario",
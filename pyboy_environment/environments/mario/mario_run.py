@@ -65,6 +65,9 @@ class MarioRun(MarioEnvironment):
         return len(self.valid_actions)
 
     def sample_action(self) -> np.ndarray:
+        if self.discrete_actions:
+            return np.random.randint(0, 2, self.action_num).tolist()
+
         action = []
         for _ in range(self.action_num):
             action.append(np.random.rand())
@@ -72,14 +75,11 @@ class MarioRun(MarioEnvironment):
 
     def _run_action_on_emulator(self, action: List[float]) -> None:
         # Toggles the buttons being on or off
-        for i, toggle in enumerate(action):
-            if toggle >= 0.5:
-                self.pyboy.send_input(self.valid_actions[i])
-            else:
-                self.pyboy.send_input(self.release_button[i])
-
-        for i in range(self.act_freq):
-            self.pyboy.tick()
+        held = action if self.discrete_actions else self.action_decoder(action)
+        for press, release, on in zip(self.valid_actions, self.release_button, held):
+            self.pyboy.send_input(press if on else release)
+
+        self._tick_action()
 
     def _calculate_reward(self, new_state: Dict[str, int]) -> float:
         reward_stats = {
@@ -0,0 +1,72 @@
+# Walkable-tile grid for the visible screen, built from the background tilemap in
+# VRAM and the collision tile list of the current tileset.
+#
+# https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/home/overworld.asm
+
+import numpy as np
+from pyboy import PyBoy
+
+LCDC = 0xFF40
+SCY = 0xFF42
+SCX = 0xFF43
+LOW_TILEMAP = 0x9800
+HIGH_TILEMAP = 0x9C00
+TILEMAP_SIZE = 32
+
+SCREEN_TILES = (18, 20)
+
+# Tile identifiers follow pyboy's TileMap - signed indexes are moved up by 0x100
+TILE_IDS = 0x200
+MAX_COLLISION_TILES = 0x180
+
+# Bottom-left 8x8 tile of every 16x16 block on screen
+BLOCK_ROWS = np.arange(1, SCREEN_TILES[0], 2)
+BLOCK_COLS = np.arange(0, SCREEN_TILES[1], 2)
+
+
+def background_tile_ids(pyboy: PyBoy) -> np.ndarray:
+    # Same identifiers as pyboy.tilemap_background[:, :] read straight from VRAM
+    lcdc = pyboy.memory[LCDC]
+    start = HIGH_TILEMAP if lcdc & 0x08 else LOW_TILEMAP
+    tiles = np.array(
+        pyboy.memory[start : start + TILEMAP_SIZE * TILEMAP_SIZE], dtype=np.int32
+    ).reshape(TILEMAP_SIZE, TILEMAP_SIZE)
+
+    if not lcdc & 0x10:
+        tiles = ((tiles ^ 0x80) - 128) + 0x100
+    return tiles
+
+
+def _visible(pyboy: PyBoy, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    # The screen wraps around the 32x32 tilemap
+    rows = (pyboy.memory[SCY] // 8 + rows) % TILEMAP_SIZE
+    cols = (pyboy.memory[SCX] // 8 + cols) % TILEMAP_SIZE
+    return background_tile_ids(pyboy)[np.ix_(rows, cols)]
+
+
+def screen_tiles(pyboy: PyBoy) -> np.ndarray:
+    return _visible(pyboy, np.arange(SCREEN_TILES[0]), np.arange(SCREEN_TILES[1]))
+
+
+def screen_block_tiles(pyboy: PyBoy) -> np.ndarray:
+    # (9, 10) tile ids, one per 16x16 block on screen
+    return _visible(pyboy, BLOCK_ROWS, BLOCK_COLS)
+
+
+def walkable_lut(
+    pyboy: PyBoy, tileset_type: int, collision_ptr: int, grass_tile: int
+) -> np.ndarray:
+    lut = np.zeros(TILE_IDS, dtype=np.uint8)
+
+    # Collision list is terminated by 0xFF
+    tiles = np.array(
+        pyboy.memory[collision_ptr : collision_ptr + MAX_COLLISION_TILES],
+        dtype=np.int32,
+    )
+    end = np.flatnonzero(tiles == 0xFF)
+    tiles = tiles[: end[0]] if end.size else tiles
+    lut[tiles + 0x100] = 1
+
+    if tileset_type > 0 and grass_tile != 0xFF:
+        lut[grass_tile + 0x100] = 1
+    return lut
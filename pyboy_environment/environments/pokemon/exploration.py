@@ -0,0 +1,86 @@
+# Visit counts for every tile of every map, indexed by (map_id, y, x).
+#
+# Map ids and coordinates are single bytes in RAM (map_constants.json names the
+# used map ids), so each map gets one uint8 plane of 256x256 tiles. Planes are
+# allocated the first time a map is visited, so an episode only holds the maps it
+# has been on - a handful of 64 KB planes rather than every possible map.
+
+import numpy as np
+
+NUM_MAPS = 0x100
+MAP_SIZE = 0x100
+
+
+class ExplorationMemory:
+    def __init__(self) -> None:
+        # map_id -> (MAP_SIZE, MAP_SIZE) counts, for the maps visited so far
+        self.planes = {}
+        # Maps entered through visit_map
+        self.visited_maps = np.zeros(NUM_MAPS, dtype=bool)
+
+    def visit(self, map_id: int, x: int, y: int) -> int:
+        # Returns the count before this visit - 0 for a new tile
+        plane = self.planes.get(map_id)
+        if plane is None:
+            plane = self.planes[map_id] = np.zeros((MAP_SIZE, MAP_SIZE), np.uint8)
+        count = int(plane[y, x])
+        if count < 0xFF:
+            plane[y, x] = count + 1
+        return count
+
+    def count(self, map_id: int, x: int, y: int) -> int:
+        plane = self.planes.get(map_id)
+        return 0 if plane is None else int(plane[y, x])
+
+    def visit_map(self, map_id: int) -> bool:
+        # True the first time map_id is entered
+        new = not self.visited_maps[map_id]
+        self.visited_maps[map_id] = True
+        return new
+
+    def tiles_visited(self) -> int:
+        return sum(int(np.count_nonzero(plane)) for plane in self.planes.values())
+
+    def reset(self) -> None:
+        self.planes = {}
+        self.visited_maps[:] = False
+
+    def window(
+        self, map_id: int, x: int, y: int, radius: int = 4, scale: int = 2
+    ) -> np.ndarray:
+        """
+        (2 * radius + 1) square of visit counts centred on (x, y), where each cell is
+        the highest count of a scale x scale group of tiles. Tiles off the map read 0.
+        """
+        size = (2 * radius + 1) * scale
+        top = y - radius * scale - scale // 2
+        left = x - radius * scale - scale // 2
+
+        cells = 2 * radius + 1
+        plane = self.planes.get(map_id)
+        if plane is None:
+            return np.zeros((cells, cells), dtype=np.uint8)
+
+        window = np.zeros((size, size), dtype=np.uint8)
+        rows = slice(max(top, 0), min(top + size, MAP_SIZE))
+        cols = slice(max(left, 0), min(left + size, MAP_SIZE))
+        window[
+            rows.start - top : rows.stop - top, cols.start - left : cols.stop - left
+        ] = plane[rows, cols]
+
+        return window.reshape(cells, scale, cells, scale).max(axis=(1, 3))
+
+    def __getstate__(self) -> dict:
+        # Pickled the same way, e.g. for recorder savestates
+        return {"visited_maps": self.visited_maps, "planes": self.planes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.planes = state["planes"]
+        self.visited_maps = state["visited_maps"]
+
+    def __deepcopy__(self, memo) -> "ExplorationMemory":
+        # Only the planes allocated so far are copied, one per map walked on
+        copy = ExplorationMemory()
+        copy.visited_maps[:] = self.visited_maps
+        copy.planes = {map_id: plane.copy() for map_id, plane in self.planes.items()}
+        return copy
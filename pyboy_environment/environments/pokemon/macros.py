@@ -0,0 +1,58 @@
+# Macro actions for the Pokemon environments - one agent action that presses a
+# button several times inside the environment and returns the summed reward:
+#
+#   env = suite.make("pokemon", "brock", 24, macros=macros.DEFAULT_MACROS)
+#
+# The agent then chooses between every single button and every macro.
+
+from typing import Callable, NamedTuple
+
+from pyboy.utils import WindowEvent
+
+ARROWS = {
+    "down": WindowEvent.PRESS_ARROW_DOWN,
+    "left": WindowEvent.PRESS_ARROW_LEFT,
+    "right": WindowEvent.PRESS_ARROW_RIGHT,
+    "up": WindowEvent.PRESS_ARROW_UP,
+}
+
+
+class MacroAction(NamedTuple):
+    name: str
+    # Press event of the button, one of the task's valid_actions
+    button: WindowEvent
+    # Most presses, each act_freq frames long and rewarded as a normal step
+    repeat: int = 1
+    # Ends the macro early once true after a press, e.g. a dialog has closed
+    until: Callable | None = None
+
+
+def dialog_closed(env) -> bool:
+    return env.dialog_closed()
+
+
+def walk(direction: str, tiles: int) -> MacroAction:
+    # One tile per press when act_freq covers the 16 frame walk animation
+    if direction not in ARROWS:
+        raise ValueError(f"Unknown direction: {direction}")
+    return MacroAction(f"walk_{direction}_{tiles}", ARROWS[direction], tiles)
+
+
+def press_until_dialog_closed(
+    button: WindowEvent = WindowEvent.PRESS_BUTTON_A, max_presses: int = 10
+) -> MacroAction:
+    return MacroAction("advance_dialog", button, max_presses, dialog_closed)
+
+
+def repeat(button: WindowEvent, times: int) -> MacroAction:
+    name = str(WindowEvent(button)).lower()
+    return MacroAction(f"repeat_{name}_{times}", button, times)
+
+
+DEFAULT_MACROS = [
+    walk("down", 4),
+    walk("left", 4),
+    walk("right", 4),
+    walk("up", 4),
+    press_until_dialog_closed(),
+]
@@ -5,11 +5,29 @@ from abc import abstractmethod
 import numpy as np
 from pyboy.utils import WindowEvent
 
+from pyboy_environment.environments.actions import ButtonBins
 from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
 from pyboy_environment.environments.pokemon import pokemon_constants as pkc
+from pyboy_environment.environments.pokemon import collision
+from pyboy_environment.environments.pokemon import pokemon_ram as pkr
+from pyboy_environment.environments.pokemon.macros import MacroAction
+from pyboy_environment.environments.pokemon.ram_schema import RamReader
+
+SETTLE_READER = RamReader(
+    ["walk_counter", "joy_ignore", "in_battle", "menu_watched_keys"]
+)
+
+DIALOG_READER = RamReader(["font_loaded", "in_battle", "menu_watched_keys"])
 
 
 class PokemonEnvironment(PyboyEnvironment):
+    _snapshot_exclude = PyboyEnvironment._snapshot_exclude | {
+        "_walkable_lut",
+        "_walkable_lut_key",
+        "button_bins",
+        "macros",
+    }
+
     def __init__(
         self,
         act_freq: int,
@@ -20,6 +38,16 @@ class PokemonEnvironment(PyboyEnvironment):
         headless: bool = False,
         init_name: str = "has_pokedex.state",
     ) -> None:
+        self._walkable_lut = None
+        self._walkable_lut_key = None
+
+        # Continuous action in [0, 1] to the index of the button to press
+        self.button_bins = ButtonBins(len(valid_actions))
+        self.action_decoder = self.button_bins
+
+        # (macro, button index) pairs chosen after the single buttons, see set_macros
+        self.macros = []
+
         super().__init__(
             task=task,
             rom_name="PokemonRed.gb",
@@ -38,6 +66,8 @@ class PokemonEnvironment(PyboyEnvironment):
 
     @cached_property
     def max_action_value(self) -> float:
+        if self.discrete_actions:
+            return self.action_decoder.num_buttons - 1
         return 1
 
     @cached_property
@@ -51,6 +81,8 @@ class PokemonEnvironment(PyboyEnvironment):
         return 1
 
     def sample_action(self) -> int:
+        if self.discrete_actions:
+            return random.randrange(self.action_decoder.num_buttons)
         return random.uniform(0, 1)
 
     def _get_state(self) -> np.ndarray:
@@ -60,40 +92,126 @@ class PokemonEnvironment(PyboyEnvironment):
         )
 
     def _run_action_on_emulator(self, action_array: np.ndarray) -> None:
-        action = action_array[0]
-        action = min(action, 0.99)
-
         # Continuous Action is a float between 0 - 1 from Value based methods
         # We need to convert this to an action that the emulator can understand
-        bins = np.linspace(0, 1, len(self.valid_actions) + 1)
-        button = np.digitize(action, bins) - 1
+        if self.discrete_actions:
+            button = int(action_array[0])
+        else:
+            button = self.button_bins(action_array[0])
 
         # Push the button for a few frames
         self.pyboy.send_input(self.valid_actions[button])
 
-        for _ in range(self.act_freq):
-            self.pyboy.tick()
+        self._tick_action()
 
         # Release the button
         self.pyboy.send_input(self.release_button[button])
 
+    def set_macros(self, macros: list[MacroAction]) -> None:
+        """
+        Adds the macros as extra choices after the single buttons, so action i picks
+        valid_actions[i] and action len(valid_actions) + j picks macros[j].
+        """
+        self.macros = []
+        for macro in macros:
+            if macro.button not in self.valid_actions:
+                raise ValueError(
+                    f"Macro {macro.name} presses a button {self.task} does not use"
+                )
+            self.macros.append((macro, self.valid_actions.index(macro.button)))
+
+        self.action_decoder = ButtonBins(len(self.valid_actions) + len(self.macros))
+        # Recomputed for the larger discrete action range
+        self.__dict__.pop("max_action_value", None)
+
+    def step(self, action) -> tuple:
+        if not self.macros:
+            return super().step(action)
+
+        if self.discrete_actions:
+            choice = int(action[0])
+        else:
+            choice = self.action_decoder(action[0])
+
+        if choice < len(self.valid_actions):
+            return super().step(self._button_action(choice))
+        return self._run_macro(*self.macros[choice - len(self.valid_actions)])
+
+    def _button_action(self, button: int) -> list:
+        # The action _run_action_on_emulator decodes back to button - the centre of
+        # its bin, so tasks that bin the action themselves see the same button
+        if self.discrete_actions:
+            return [button]
+        return [(button + 0.5) / len(self.valid_actions)]
+
+    def _run_macro(self, macro: MacroAction, button: int) -> tuple:
+        # Every press is a full step - rewards, done checks and the step count
+        # advance as if the agent had chosen the button each time
+        total_reward = 0
+        for _ in range(macro.repeat):
+            state, reward, done, truncated = super().step(self._button_action(button))
+            total_reward += reward
+            if done or truncated or (macro.until is not None and macro.until(self)):
+                break
+
+        self._emit_event("macro", macro=macro.name)
+        return state, total_reward, done, truncated
+
+    def dialog_closed(self) -> bool:
+        # Back at a battle menu, or no text box open in the overworld
+        font_loaded, in_battle, menu_keys = self._read_fields(DIALOG_READER)
+        if in_battle:
+            return menu_keys != 0
+        return font_loaded == 0
+
+    def input_settled(self) -> bool:
+        # Early-exit predicate for set_early_exit: the walk animation has finished
+        # in the overworld, or a battle menu is waiting for a button
+        walk_counter, joy_ignore, in_battle, menu_keys = self._read_fields(
+            SETTLE_READER
+        )
+        if in_battle:
+            return menu_keys != 0
+        return walk_counter == 0 and joy_ignore == 0
+
+    def _read_ram(self) -> np.ndarray:
+        # Single bulk copy of WRAM 0xCC00-0xD900 per frame - see pokemon_ram
+        return self._cached("ram", lambda: pkr.read_ram(self.pyboy))
+
+    def _read_fields(self, reader: RamReader) -> np.ndarray:
+        # Flat vector of the reader's fields for the current frame
+        return reader.read(self._read_ram())
+
     def _generate_game_stats(self) -> dict[str, any]:
+        fields = pkr.game_stats_fields(self._read_ram())
+        map_n = fields["map_id"][0]
+        ids = fields["party_species"]
+        types = [
+            type_id
+            for pair in zip(fields["party_type1"], fields["party_type2"])
+            for type_id in pair
+        ]
         return {
-            "location": self._get_location(),
-            "party_size": self._get_party_size(),
-            "ids": self._read_party_id(),
-            "pokemon": [pkc.get_pokemon(id) for id in self._read_party_id()],
-            "levels": self._read_party_level(),
-            "type_id": self._read_party_type(),
-            "type": [pkc.get_type(id) for id in self._read_party_type()],
-            "hp": self._read_party_hp(),
-            "xp": self._read_party_xp(),
-            "status": self._read_party_status(),
-            "badges": self._get_badge_count(),
-            "caught_pokemon": self._read_caught_pokemon_count(),
-            "seen_pokemon": self._read_seen_pokemon_count(),
-            "money": self._read_money(),
-            "events": self._read_events(),
+            "location": {
+                "x": fields["player_x"][0],
+                "y": fields["player_y"][0],
+                "map_id": map_n,
+                "map": pkc.get_map_location(map_n),
+            },
+            "party_size": fields["party_count"][0],
+            "ids": ids,
+            "pokemon": [pkc.get_pokemon(id) for id in ids],
+            "levels": fields["party_level"],
+            "type_id": types,
+            "type": [pkc.get_type(id) for id in types],
+            "hp": {"current": fields["party_hp"], "max": fields["party_max_hp"]},
+            "xp": fields["party_xp"],
+            "status": fields["party_status"],
+            "badges": fields["badges"][0],
+            "caught_pokemon": fields["pokedex_owned"][0],
+            "seen_pokemon": fields["pokedex_seen"][0],
+            "money": fields["money"][0],
+            "events": fields["event_flags"],
         }
 
     @abstractmethod
@@ -110,9 +228,7 @@ class PokemonEnvironment(PyboyEnvironment):
         return False
 
     def _get_location(self) -> dict[str, any]:
-        x_pos = self._read_m(0xD362)
-        y_pos = self._read_m(0xD361)
-        map_n = self._read_m(0xD35E)
+        x_pos, y_pos, map_n = pkr.location(self._read_ram())
 
         return {
             "x": x_pos,
@@ -122,10 +238,10 @@ class PokemonEnvironment(PyboyEnvironment):
         }
 
     def _get_party_size(self) -> int:
-        return self._read_m(0xD163)
+        return pkr.party_size(self._read_ram())
 
     def _get_badge_count(self) -> int:
-        return self._bit_count(self._read_m(0xD356))
+        return pkr.badge_count(self._read_ram())
 
     def _is_grass_tile(self) -> bool:
         grass_tile_index = self._read_m(0xD535)
@@ -140,134 +256,76 @@ class PokemonEnvironment(PyboyEnvironment):
 
     def _read_party_id(self) -> list[int]:
         # https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/constants/pokemon_constants.asm
-        return [
-            self._read_m(addr)
-            for addr in [0xD164, 0xD165, 0xD166, 0xD167, 0xD168, 0xD169]
-        ]
+        return pkr.party_ids(self._read_ram())
 
     def _read_party_type(self) -> list[int]:
         # https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/constants/type_constants.asm
-        return [
-            self._read_m(addr)
-            for addr in [
-                0xD170,
-                0xD171,
-                0xD19C,
-                0xD19D,
-                0xD1C8,
-                0xD1C9,
-                0xD1F4,
-                0xD1F5,
-                0xD220,
-                0xD221,
-                0xD24C,
-                0xD24D,
-            ]
-        ]
+        return pkr.party_types(self._read_ram())
 
     def _read_party_level(self) -> list[int]:
-        return [
-            self._read_m(addr)
-            for addr in [0xD18C, 0xD1B8, 0xD1E4, 0xD210, 0xD23C, 0xD268]
-        ]
+        return pkr.party_levels(self._read_ram())
 
     def _read_party_status(self) -> list[int]:
         # https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/constants/status_constants.asm
-        return [
-            self._read_m(addr)
-            for addr in [0xD16F, 0xD19B, 0xD1C7, 0xD1F3, 0xD21F, 0xD24B]
-        ]
+        return pkr.party_status(self._read_ram())
 
     def _read_party_hp(self) -> dict[str, list[int]]:
-        hp = [
-            self._read_hp(addr)
-            for addr in [0xD16C, 0xD198, 0xD1C4, 0xD1F0, 0xD21C, 0xD248]
-        ]
-        max_hp = [
-            self._read_hp(addr)
-            for addr in [0xD18D, 0xD1B9, 0xD1E5, 0xD211, 0xD23D, 0xD269]
-        ]
-        return {"current": hp, "max": max_hp}
+        return pkr.party_hp(self._read_ram())
 
     def _read_party_xp(self) -> list[int]:
-        return [
-            self._read_triple(addr)
-            for addr in [0xD179, 0xD1A5, 0xD1D1, 0xD1FD, 0xD229, 0xD255]
-        ]
+        return pkr.party_xp(self._read_ram())
 
     def _read_hp(self, start: int) -> int:
         return 256 * self._read_m(start) + self._read_m(start + 1)
 
     def _read_caught_pokemon_count(self) -> int:
-        return sum(
-            list(self._bit_count(self._read_m(i)) for i in range(0xD2F7, 0xD30A))
-        )
+        return pkr.caught_count(self._read_ram())
 
     def _read_seen_pokemon_count(self) -> int:
-        return sum(
-            list(self._bit_count(self._read_m(i)) for i in range(0xD30A, 0xD31D))
-        )
+        return pkr.seen_count(self._read_ram())
 
     def _read_money(self) -> int:
-        return (
-            100 * 100 * self._read_bcd(self._read_m(0xD347))
-            + 100 * self._read_bcd(self._read_m(0xD348))
-            + self._read_bcd(self._read_m(0xD349))
-        )
+        return pkr.money(self._read_ram())
 
     def _read_events(self) -> list[int]:
-        event_flags_start = 0xD747
-        event_flags_end = 0xD886
         # museum_ticket = (0xD754, 0)
         # base_event_flags = 13
-        return [
-            self._bit_count(self._read_m(i))
-            for i in range(event_flags_start, event_flags_end)
-        ]
-
-    def _get_screen_background_tilemap(self):
-        ### SIMILAR TO CURRENT pyboy.game_wrapper()._game_area_np(), BUT ONLY FOR BACKGROUND TILEMAP, SO NPC ARE SKIPPED
-        bsm = self.pyboy.botsupport_manager()
-        ((scx, scy), (wx, wy)) = bsm.screen().tilemap_position()
-        tilemap = np.array(bsm.tilemap_background()[:, :])
-        return np.roll(np.roll(tilemap, -scy // 8, axis=0), -scx // 8, axis=1)[:18, :20]
-
-    def _get_screen_walkable_matrix(self):
-        walkable_tiles_indexes = []
-        collision_ptr = self.pyboy.get_memory_value(0xD530) + (
-            self.pyboy.get_memory_value(0xD531) << 8
+        return pkr.event_counts(self._read_ram())
+
+    def _read_event_flags(self) -> np.ndarray:
+        return pkr.event_flags(self._read_ram())
+
+    def _get_screen_background_tilemap(self) -> np.ndarray:
+        # Background tilemap only, so NPCs are skipped
+        return collision.screen_tiles(self.pyboy)
+
+    def _get_walkable_lut(self) -> np.ndarray:
+        ram = self._read_ram()
+        map_id = pkr.read_field(ram, "map_id")[0]
+        collision_ptr = pkr.read_field(ram, "collision_ptr")[0]
+        tileset_type = self._read_m(0xFFD7)
+        grass_tile = pkr.read_field(ram, "grass_tile")[0]
+
+        # Rebuilt only when the map or its collision data changes
+        key = (map_id, tileset_type, collision_ptr, grass_tile)
+        if key != self._walkable_lut_key:
+            self._walkable_lut = collision.walkable_lut(
+                self.pyboy, tileset_type, collision_ptr, grass_tile
+            )
+            self._walkable_lut_key = key
+        return self._walkable_lut
+
+    def _get_screen_walkable_matrix(self) -> np.ndarray:
+        return self._get_walkable_lut()[collision.screen_block_tiles(self.pyboy)]
+
+    def game_area_collision(self) -> np.ndarray:
+        # Each 16x16 block covers 2x2 tiles of the 18x20 game area
+        return self._cached(
+            "game_area_collision",
+            lambda: np.repeat(
+                np.repeat(self._get_screen_walkable_matrix(), 2, axis=0), 2, axis=1
+            ).astype(np.uint32),
         )
-        tileset_type = self.pyboy.get_memory_value(0xFFD7)
-        if tileset_type > 0:
-            grass_tile_index = self.pyboy.get_memory_value(0xD535)
-            if grass_tile_index != 0xFF:
-                walkable_tiles_indexes.append(grass_tile_index + 0x100)
-        for i in range(0x180):
-            tile_index = self.pyboy.get_memory_value(collision_ptr + i)
-            if tile_index == 0xFF:
-                break
-            else:
-                walkable_tiles_indexes.append(tile_index + 0x100)
-        screen_tiles = self._get_screen_background_tilemap()
-        bottom_left_screen_tiles = screen_tiles[1 : 1 + screen_tiles.shape[0] : 2, ::2]
-        walkable_matrix = np.isin(
-            bottom_left_screen_tiles, walkable_tiles_indexes
-        ).astype(np.uint8)
-        return walkable_matrix
-
-    def game_area_collision(self):
-        shape = (20, 18)
-        game_area_section = (0, 0) + shape
-        width = game_area_section[2]
-        height = game_area_section[3]
-
-        game_area = np.ndarray(shape=(height, width), dtype=np.uint32)
-        _collision = self._get_screen_walkable_matrix()
-        for i in range(height // 2):
-            for j in range(width // 2):
-                game_area[i * 2][j * 2 : j * 2 + 2] = _collision[i][j]
-                game_area[i * 2 + 1][j * 2 : j * 2 + 2] = _collision[i][j]
-        return game_area
 
     # Note: These are all examples of rewards we can calculate based on the stats, you can implement and modify your own as you please
 
@@ -0,0 +1,137 @@
+# https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/ram/wram.asm
+#
+# Decodes the game stats from one bulk copy of WRAM instead of reading each byte
+# from the emulator separately. The addresses and encodings live in ram_schema and
+# every function here takes the uint8 buffer returned by read_ram.
+
+import numpy as np
+from pyboy import PyBoy
+
+from pyboy_environment.environments.bits import unpack_flags
+from pyboy_environment.environments.pokemon.ram_schema import (
+    FIELDS,
+    WRAM_END,
+    WRAM_START,
+    RamReader,
+)
+
+GAME_STATS_READER = RamReader(
+    [
+        "player_x",
+        "player_y",
+        "map_id",
+        "party_count",
+        "party_species",
+        "party_hp",
+        "party_max_hp",
+        "party_status",
+        "party_type1",
+        "party_type2",
+        "party_xp",
+        "party_level",
+        "badges",
+        "money",
+        "pokedex_owned",
+        "pokedex_seen",
+        "event_flags",
+    ]
+)
+
+LOCATION_READER = RamReader(["player_x", "player_y", "map_id"])
+
+_field_readers: dict[str, RamReader] = {}
+
+
+def read_ram(pyboy: PyBoy) -> np.ndarray:
+    return np.array(pyboy.memory[WRAM_START:WRAM_END], dtype=np.uint8)
+
+
+def offset(addr: int) -> int:
+    return addr - WRAM_START
+
+
+def read_range(ram: np.ndarray, start: int, end: int) -> np.ndarray:
+    return ram[offset(start) : offset(end)]
+
+
+def read_u16(ram: np.ndarray, addr: int) -> int:
+    i = offset(addr)
+    return (int(ram[i]) << 8) | int(ram[i + 1])
+
+
+def read_field(ram: np.ndarray, name: str) -> np.ndarray:
+    if name not in _field_readers:
+        _field_readers[name] = RamReader([name])
+    return _field_readers[name].read(ram)
+
+
+def game_stats_fields(ram: np.ndarray) -> dict[str, list[int]]:
+    return {
+        name: values.tolist()
+        for name, values in GAME_STATS_READER.read_dict(ram).items()
+    }
+
+
+def location(ram: np.ndarray) -> tuple[int, int, int]:
+    return tuple(LOCATION_READER.read(ram).tolist())
+
+
+def party_size(ram: np.ndarray) -> int:
+    return int(read_field(ram, "party_count")[0])
+
+
+def party_ids(ram: np.ndarray) -> list[int]:
+    return read_field(ram, "party_species").tolist()
+
+
+def party_types(ram: np.ndarray) -> list[int]:
+    # Type 1 and type 2 of each slot in order
+    types = np.stack(
+        [read_field(ram, "party_type1"), read_field(ram, "party_type2")], axis=1
+    )
+    return types.reshape(-1).tolist()
+
+
+def party_levels(ram: np.ndarray) -> list[int]:
+    return read_field(ram, "party_level").tolist()
+
+
+def party_status(ram: np.ndarray) -> list[int]:
+    return read_field(ram, "party_status").tolist()
+
+
+def party_hp(ram: np.ndarray) -> dict[str, list[int]]:
+    return {
+        "current": read_field(ram, "party_hp").tolist(),
+        "max": read_field(ram, "party_max_hp").tolist(),
+    }
+
+
+def party_xp(ram: np.ndarray) -> list[int]:
+    return read_field(ram, "party_xp").tolist()
+
+
+def badge_count(ram: np.ndarray) -> int:
+    return int(read_field(ram, "badges")[0])
+
+
+def caught_count(ram: np.ndarray) -> int:
+    return int(read_field(ram, "pokedex_owned")[0])
+
+
+def seen_count(ram: np.ndarray) -> int:
+    return int(read_field(ram, "pokedex_seen")[0])
+
+
+def money(ram: np.ndarray) -> int:
+    return int(read_field(ram, "money")[0])
+
+
+def event_counts(ram: np.ndarray) -> list[int]:
+    return read_field(ram, "event_flags").tolist()
+
+
+def event_flags(ram: np.ndarray) -> np.ndarray:
+    # One boolean per event flag - 2552 flags from 0xD747 to 0xD886
+    field = FIELDS["event_flags"]
+    return unpack_flags(read_range(ram, field.address, field.address + field.count))
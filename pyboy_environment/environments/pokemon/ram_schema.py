@@ -0,0 +1,157 @@
+# https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/ram/wram.asm
+#
+# Declarative description of the Pokemon Red RAM fields used by the environments.
+# A RamReader compiles any subset of the fields into gather indices over the WRAM
+# copy from pokemon_ram.read_ram, so a whole observation is decoded in one pass:
+#
+#   reader = RamReader(["player_x", "player_y", "map_id", "enemy_hp"])
+#   state = reader.read(self._read_ram())
+
+from typing import NamedTuple
+
+import numpy as np
+
+from pyboy_environment.environments.bits import popcount
+
+WRAM_START = 0xCC00
+WRAM_END = 0xD900
+
+PARTY_SIZE = 6
+PARTY_MON_STRIDE = 0x2C
+
+ENCODINGS = ("uint", "bcd", "bitcount", "bit")
+
+
+class RamField(NamedTuple):
+    name: str
+    address: int
+    # Bytes per value
+    width: int = 1
+    # uint: unsigned integer, bcd: two decimal digits per byte,
+    # bitcount: number of set bits across the bytes, bit: a single flag bit
+    encoding: str = "uint"
+    endian: str = "big"
+    # Repeated values such as the six party slots
+    count: int = 1
+    stride: int = 1
+    bit: int = 0
+
+
+FIELDS: dict[str, RamField] = {
+    field.name: field
+    for field in [
+        # Player and map
+        RamField("player_x", 0xD362),
+        RamField("player_y", 0xD361),
+        RamField("map_id", 0xD35E),
+        RamField("map_tileset", 0xD367),
+        RamField("grass_tile", 0xD535),
+        RamField("collision_ptr", 0xD530, width=2, endian="little"),
+        RamField("walk_counter", 0xCFC5),
+        RamField("joy_ignore", 0xCD6B),
+        # Set while a text box has the font loaded over the walking sprites
+        RamField("font_loaded", 0xCFC4, encoding="bit", bit=0),
+        # Party
+        RamField("party_count", 0xD163),
+        RamField("party_species", 0xD164, count=PARTY_SIZE),
+        RamField("party_hp", 0xD16C, width=2, count=PARTY_SIZE, stride=0x2C),
+        RamField("party_status", 0xD16F, count=PARTY_SIZE, stride=0x2C),
+        RamField("party_type1", 0xD170, count=PARTY_SIZE, stride=0x2C),
+        RamField("party_type2", 0xD171, count=PARTY_SIZE, stride=0x2C),
+        RamField("party_xp", 0xD179, width=3, count=PARTY_SIZE, stride=0x2C),
+        RamField("party_level", 0xD18C, count=PARTY_SIZE, stride=0x2C),
+        RamField("party_max_hp", 0xD18D, width=2, count=PARTY_SIZE, stride=0x2C),
+        # Progress
+        RamField("badges", 0xD356, encoding="bitcount"),
+        RamField("money", 0xD347, width=3, encoding="bcd"),
+        RamField("pokedex_owned", 0xD2F7, width=0x13, encoding="bitcount"),
+        RamField("pokedex_seen", 0xD30A, width=0x13, encoding="bitcount"),
+        RamField("event_flags", 0xD747, encoding="bitcount", count=0x13F),
+        RamField("bag_count", 0xD31D),
+        # Battle
+        RamField("in_battle", 0xD057),
+        RamField("battle_turn", 0xCCD5),
+        RamField("enemy_hp", 0xCFE6, width=2),
+        RamField("enemy_max_hp", 0xCFF4, width=2),
+        RamField("enemy_level", 0xCFF3),
+        RamField("battle_mon_hp", 0xD015, width=2),
+        RamField("battle_mon_max_hp", 0xD023, width=2),
+        # Menus
+        RamField("menu_item", 0xCC26),
+        RamField("menu_watched_keys", 0xCC29),
+    ]
+}
+
+
+def _decode(values: np.ndarray, encoding: str, bit: int) -> np.ndarray:
+    # values is (n, width) with the most significant byte first
+    width = values.shape[1]
+    if encoding == "uint":
+        weights = 1 << (8 * np.arange(width - 1, -1, -1, dtype=np.int64))
+        return values.astype(np.int64) @ weights
+    if encoding == "bcd":
+        values = values.astype(np.int64)
+        digits = 10 * (values >> 4) + (values & 0x0F)
+        return digits @ (100 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+    if encoding == "bitcount":
+        return popcount(values, axis=1)
+    if encoding == "bit":
+        return ((values[:, 0] >> bit) & 1).astype(np.int64)
+    raise ValueError(f"Unknown RAM field encoding: {encoding}")
+
+
+class RamReader:
+    """
+    Reads a fixed set of RAM fields from a WRAM buffer in one vectorised pass.
+
+    Fields that share an encoding and width are gathered with a single fancy index
+    and decoded together. read() returns a flat int64 vector in field order and
+    read_structured() a record with one (count,) entry per field.
+    """
+
+    def __init__(self, fields: list, base: int = WRAM_START) -> None:
+        self.fields = [FIELDS[f] if isinstance(f, str) else f for f in fields]
+        self.base = base
+
+        self.slices = {}
+        groups = {}
+        position = 0
+        for field in self.fields:
+            if field.encoding not in ENCODINGS:
+                raise ValueError(f"Unknown RAM field encoding: {field.encoding}")
+
+            starts = field.address - base + field.stride * np.arange(field.count)
+            indices = starts[:, None] + np.arange(field.width)[None, :]
+            if field.endian == "little":
+                indices = indices[:, ::-1]
+
+            key = (field.encoding, field.width, field.bit)
+            group = groups.setdefault(key, ([], []))
+            group[0].append(np.arange(position, position + field.count))
+            group[1].append(indices)
+
+            self.slices[field.name] = slice(position, position + field.count)
+            position += field.count
+
+        self.size = position
+        self._groups = [
+            (encoding, bit, np.concatenate(positions), np.concatenate(indices))
+            for (encoding, _, bit), (positions, indices) in groups.items()
+        ]
+
+        self.dtype = np.dtype(
+            [(field.name, np.int64, (field.count,)) for field in self.fields]
+        )
+
+    def read(self, ram: np.ndarray) -> np.ndarray:
+        values = np.empty(self.size, dtype=np.int64)
+        for encoding, bit, positions, indices in self._groups:
+            values[positions] = _decode(ram[indices], encoding, bit)
+        return values
+
+    def read_structured(self, ram: np.ndarray) -> np.ndarray:
+        return self.read(ram).view(self.dtype)[0]
+
+    def read_dict(self, ram: np.ndarray) -> dict[str, np.ndarray]:
+        values = self.read(ram)
+        return {name: values[index] for name, index in self.slices.items()}
@@ -6,10 +6,14 @@ from pyboy.utils import WindowEvent
 from pyboy_environment.environments.pokemon.pokemon_environment import (
     PokemonEnvironment,
 )
+from pyboy_environment.environments.pokemon.exploration import ExplorationMemory
 from pyboy_environment.environments.pokemon import pokemon_constants as pkc
 
 
 class PokemonBrock(PokemonEnvironment):
+    # _get_state below only reads RAM - remove this if your state uses the screen
+    screen_observation = False
+
     def __init__(
         self,
         act_freq: int,
@@ -37,6 +41,9 @@ class PokemonBrock(PokemonEnvironment):
             #WindowEvent.RELEASE_BUTTON_START,
         ]
 
+        # Visited tiles and maps, cleared by reset
+        self.explored = ExplorationMemory()
+
         super().__init__(
             act_freq=act_freq, #original is 24
             task="brock",
@@ -51,8 +58,6 @@ class PokemonBrock(PokemonEnvironment):
         self.turn_unreward = 0 
         self.y_reward = 0
         self.prev_turn = -1
-        self.prev_loc = set()
-        self.prev_spot = set()
         self.no_move = 0
         self.prev_enemy_hp = 0
         self.prev_menu = 0
@@ -66,18 +71,17 @@ class PokemonBrock(PokemonEnvironment):
 
     def reset(self) -> np.ndarray:
         self.steps = 0
+        self.events.end_episode()
 
-        with open(self.init_path, "rb") as f:
-            self.pyboy.load_state(f)
+        self._load_init_state()
 
-        self.prior_game_stats = self._generate_game_stats()
+        self.prior_game_stats = self._game_stats()
 
         self.same_loc = 0
         self.turn_unreward = 0 
         self.y_reward = 0
         self.prev_turn = -1
-        self.prev_loc = set()
-        self.prev_spot = set()
+        self.explored.reset()
         self.no_move = 0
         self.prev_enemy_hp = 0
         self.prev_menu = 0
@@ -92,19 +96,17 @@ class PokemonBrock(PokemonEnvironment):
         return self._get_state()
 
     def _run_action_on_emulator(self, action_array: np.ndarray) -> None:
-        action = action_array[0]
-        action = min(action, 0.99)
-
         # Continuous Action is a float between 0 - 1 from Value based methods
         # We need to convert this to an action that the emulator can understand
-        bins = np.linspace(0, 1, len(self.valid_actions) + 1)
-        button = np.digitize(action, bins) - 1
+        if self.discrete_actions:
+            button = int(action_array[0])
+        else:
+            button = self.button_bins(action_array[0])
         self.button_pressed = button
         # Push the button for a few frames
         self.pyboy.send_input(self.valid_actions[button])
 
-        for _ in range(self.act_freq):
-            self.pyboy.tick()
+        self._tick_action()
 
         # Release the button
         self.pyboy.send_input(self.release_button[button])
@@ -139,12 +141,12 @@ class PokemonBrock(PokemonEnvironment):
 
         if (new_state["location"]["x"], new_state["location"]["y"]) != (self.prior_game_stats["location"]["x"], self.prior_game_stats["location"]["y"]) and self._read_m(0xD057) == 0:
             #new coordinate unlocked
-            if (new_state["location"]["x"], new_state["location"]["y"]) not in self.prev_spot:
+            location = new_state["location"]
+            if self.explored.visit(location["map_id"], location["x"], location["y"]) == 0:
                 # if self._grass_reward(new_state) and not (self.prior_game_stats["location"]["map"] == 'ROUTE_1,' and new_state["location"]["map"] == "PALLET_TOWN,") :
                 #     reward += 1.5
                 # else:
                 reward += 1
-                self.prev_spot.add((new_state["location"]["x"], new_state["location"]["y"]))
                 if new_state["location"]["map"] == "PALLET_TOWN,":
                     reward += 2
                 elif new_state["location"]["map"] == "ROUTE_1,":
@@ -184,8 +186,7 @@ class PokemonBrock(PokemonEnvironment):
         if self.in_battle:
             return reward
         #New area 
-        if new_state["location"]["map"] not in self.prev_loc:
-            self.prev_loc.add(new_state["location"]["map"])
+        if self.explored.visit_map(new_state["location"]["map_id"]):
             reward += 20
             if new_state["location"]["map"] == "PALLET_TOWN,":
                 reward += 4
@@ -212,7 +213,7 @@ class PokemonBrock(PokemonEnvironment):
         reward = 0
         enemy_hp_df = 0
         if self._read_m(0xD057) != 0 and self.in_battle == False:
-            print("Triggered")
+            self._emit_event("battle_started")
             self.in_battle = True
             reward += 5
         else:
@@ -240,14 +241,14 @@ class PokemonBrock(PokemonEnvironment):
 
                 #Ensure that its either 33 or 17:
                 if battle_left_right in [17, 33] and self.button_pressed == 4:
-                    print("In fight")
+                    self._emit_event("battle_menu", menu=battle_left_right)
                     reward += 2
                     if self.no_attack > 0:
                         reward -= 2
                     pokeball_count = self._get_pokeball_count(self._read_items())
                     if pokeball_count == 0:
                         if battle_left_right == 17 and battle_button == 0:
-                            print("Fight button has been pressed")
+                            self._emit_event("fight_selected")
                             reward += 2
                             self.no_attack += 1
                             if self.no_attack > 25:
@@ -256,36 +257,36 @@ class PokemonBrock(PokemonEnvironment):
                     else:
                         #Impossible to reach here unless pokeball is available
                         if battle_left_right == 17 and battle_button == 1:
-                            print("Item has been pressed")
+                            self._emit_event("item_selected")
                             reward += 3
                             
                 elif battle_left_right == 199 and self.button_pressed == 4 :
-                    print("entered move selection")
+                    self._emit_event("move_menu")
                     reward += 3
                     if self.no_attack > 0:
                         reward -= 3
                     if battle_button == 0:
-                        print("Tackle selected")
+                        self._emit_event("move_selected", move="tackle")
                         enemy_hp_df = enemy_max_hp - enemy_curr_hp
                         reward += 3
                         if (turn_num != self.prev_turn):
-                            print("action made")
+                            self._emit_event("action_made", turn=turn_num)
                             reward += 5
                         else:
                             reward -= 3
                             self.no_attack += 1
                         
                     elif battle_button == 1:
-                        print("Tail whip selected")
+                        self._emit_event("move_selected", move="tail_whip")
                         reward += 2
                         if (turn_num != self.prev_turn):
-                            print("action made")
+                            self._emit_event("action_made", turn=turn_num)
                             reward += 5
                         else:
                             reward -= 2
                             self.no_attack += 1
                     else:
-                        print("no button has been pressed")
+                        self._emit_event("move_selected", move=None)
                         self.no_attack += 1
                     
                     if self._xp_reward(new_state) > 0:
@@ -293,9 +294,9 @@ class PokemonBrock(PokemonEnvironment):
                         self.battle_win +=1
 
                     if turn_num != self.prev_turn:
-                        print("action made reward applied")
+                        self._emit_event("turn_rewarded", turn=turn_num)
                         if self.battle_win > 2:
-                            print("Has won 2")
+                            self._emit_event("battle_win_limit", wins=self.battle_win)
                             reward += 1.5 + 1.5*(enemy_hp_df)
                         else:
                             reward += 30 + 1.5*(enemy_hp_df)
@@ -304,7 +305,7 @@ class PokemonBrock(PokemonEnvironment):
                 self.prev_turn = turn_num  
             elif self._read_m(0xD057) == 0 and self.in_battle == True:
                 if self.battle_win == 0:
-                    print("ran away in shame")
+                    self._emit_event("ran_away")
                     reward -= 50
                     self.ran_away = 1
                 self.in_battle = False
@@ -315,9 +316,17 @@ class PokemonBrock(PokemonEnvironment):
         return reward + self.battle_win*2
 
 
+    def exploration_window(self, radius: int = 4, scale: int = 2) -> np.ndarray:
+        # Visit counts around the player on the current map, for exploration-aware
+        # observations - see ExplorationMemory.window
+        location = self._game_stats()["location"]
+        return self.explored.window(
+            location["map_id"], location["x"], location["y"], radius, scale
+        )
+
     def _get_state(self) -> np.ndarray:
         # Implement your state retrieval logic here
-        game_stats = self._generate_game_stats()
+        game_stats = self._game_stats()
 
         x = np.array([game_stats["location"]["x"]])
         y = np.array([game_stats["location"]["y"]])
@@ -332,8 +341,8 @@ class PokemonBrock(PokemonEnvironment):
         num_caught = np.array([game_stats["caught_pokemon"]])
         battle_left_right = np.array([self._read_m(0xCC29)]) #battle menu cursor on left or right
         battle_button = np.array([self._read_m(0xCC26)])
-        xp = np.array([self._read_party_xp()])
-        seen = np.array([self._read_seen_pokemon_count()])
+        xp = np.array([game_stats["xp"]])
+        seen = np.array([game_stats["seen_pokemon"]])
 
         state = np.concatenate([x, y, 
                                 location,
@@ -0,0 +1,175 @@
+import json
+import math
+import os
+import re
+from collections import deque
+from time import perf_counter_ns
+
+# Phases of PyboyEnvironment.step (and reset) that are timed when profiling is on
+STEP_PHASES = [
+    "step",
+    "reset",
+    "_run_action_on_emulator",
+    "_get_state",
+    "_generate_game_stats",
+    "_calculate_reward",
+    "_check_if_done",
+    "_check_if_truncated",
+]
+
+REWARD_COMPONENT = re.compile(r"^_\w+_reward$")
+
+
+def reward_components(env) -> list[str]:
+    # Every _<name>_reward method of the task, e.g. PokemonBrock._movement_reward
+    return sorted(
+        name
+        for name in dir(type(env))
+        if REWARD_COMPONENT.match(name) and name != "_calculate_reward"
+    )
+
+
+class Histogram:
+    """
+    Log-linear histogram of durations in nanoseconds.
+
+    Each power of two is split into SUB_BUCKETS buckets, so percentiles are within
+    about 9% of the true value while add() stays a couple of integer operations.
+    """
+
+    SUB_BUCKETS = 8
+
+    def __init__(self) -> None:
+        self.counts = [0] * (64 * self.SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, ns: int) -> None:
+        index = int(math.log2(ns) * self.SUB_BUCKETS) if ns > 0 else 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+
+    def _upper_bound(self, index: int) -> float:
+        return 2 ** ((index + 1) / self.SUB_BUCKETS)
+
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+
+        target = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return float(self.max)
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total / 1e6,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+            "min_us": (self.min or 0) / 1e3,
+            "max_us": self.max / 1e3,
+            "p50_us": self.percentile(50) / 1e3,
+            "p90_us": self.percentile(90) / 1e3,
+            "p95_us": self.percentile(95) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "buckets_ns": {
+                int(self._upper_bound(index)): count
+                for index, count in enumerate(self.counts)
+                if count
+            },
+        }
+
+
+class StepProfiler:
+    """
+    Times methods of an environment by shadowing them with timing wrappers.
+
+    The wrappers are set on the instance only, so nothing is paid while profiling
+    is off and detach() restores the class methods. With trace_events > 0 the most
+    recent calls are also kept for a Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, trace_events: int = 0) -> None:
+        self.histograms: dict[str, Histogram] = {}
+        self.events = deque(maxlen=trace_events) if trace_events > 0 else None
+        self._wrapped = []
+
+    def attach(self, target, names: list[str]) -> None:
+        for name in names:
+            if not hasattr(target, name):
+                continue
+            setattr(target, name, self._wrap(name, getattr(target, name)))
+            self._wrapped.append((target, name))
+
+    def detach(self) -> None:
+        for target, name in self._wrapped:
+            target.__dict__.pop(name, None)
+        self._wrapped = []
+
+    def _wrap(self, name: str, method):
+        # Looked up per call so reset() also applies to wrappers already installed
+        histograms = self.histograms
+        histograms.setdefault(name, Histogram())
+        events = self.events
+
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                end = perf_counter_ns()
+                histograms[name].add(end - start)
+                if events is not None:
+                    events.append((name, start, end))
+
+        return timed
+
+    def reset(self) -> None:
+        for name in self.histograms:
+            self.histograms[name] = Histogram()
+        if self.events is not None:
+            self.events.clear()
+
+    def summary(self) -> dict[str, dict]:
+        return {name: h.summary() for name, h in self.histograms.items() if h.count}
+
+    def dump_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def chrome_trace(self) -> dict:
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start / 1e3,
+                    "dur": (end - start) / 1e3,
+                    "pid": pid,
+                    "tid": 0,
+                }
+                for name, start, end in (self.events or [])
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def dump_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+    def __getstate__(self) -> dict:
+        # The wrapped environment stays behind when sent to another process
+        state = dict(self.__dict__)
+        state["_wrapped"] = []
+        return state
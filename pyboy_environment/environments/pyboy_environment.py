@@ -1,3 +1,5 @@
+import copy
+import io
 from abc import ABCMeta, abstractmethod
 from functools import cached_property
 from pathlib import Path
@@ -6,8 +8,46 @@ import cv2
 import numpy as np
 from pyboy import PyBoy
 
+from pyboy_environment.environments import state_cache
+from pyboy_environment.environments.events import EpisodeEvents
+from pyboy_environment.environments.profiling import (
+    STEP_PHASES,
+    StepProfiler,
+    reward_components,
+)
+from pyboy_environment.environments.snapshots import SnapshotRing
+
 
 class PyboyEnvironment(metaclass=ABCMeta):
+    # Whether _get_state may read the screen. Tasks that only read RAM can opt out,
+    # so headless environments skip rendering until grab_frame is first used.
+    screen_observation = True
+
+    # Attributes that are not part of an episode and so are left alone by restore
+    _snapshot_exclude = {
+        "pyboy",
+        "screen",
+        "snapshots",
+        "task",
+        "domain",
+        "rom_path",
+        "init_path",
+        "check_init_state",
+        "valid_actions",
+        "release_button",
+        "act_freq",
+        "_frame_cache",
+        "_frame_cache_key",
+        "_load_count",
+        "profiler",
+        "render_frames",
+        "settled",
+        "settle_min_frames",
+        "settle_check_every",
+        "discrete_actions",
+        "action_decoder",
+        "reset_jitter",
+    }
 
     def __init__(
         self,
@@ -28,6 +68,11 @@ class PyboyEnvironment(metaclass=ABCMeta):
         self.rom_path = f"{path}/{rom_name}"
         self.init_path = f"{path}/task_init_states/{init_state_file_name}"
 
+        # Re-read the init state from disk if it has changed since it was cached
+        self.check_init_state = False
+
+        self.snapshots = SnapshotRing()
+
         self.combo_actions = 0
 
         self.valid_actions = valid_actions
@@ -36,11 +81,33 @@ class PyboyEnvironment(metaclass=ABCMeta):
 
         self.act_freq = act_freq
 
-        head = "null" if headless else "SDL2"
-        self.pyboy = PyBoy(
-            self.rom_path,
-            window=head,
-        )
+        # Integer button indices instead of continuous actions, see action_decoder
+        self.discrete_actions = False
+
+        # Up to this many frames are run after loading the init state, drawn from
+        # the seed, so seeded copies of a task do not all play out the same way
+        self.reset_jitter = 0
+        self._rng = np.random.default_rng(0)
+
+        # Values derived from emulator memory, kept until the next tick or load_state
+        self._frame_cache = {}
+        self._frame_cache_key = None
+        self._load_count = 0
+
+        # Set by enable_profiling - step and reset are untouched while this is None
+        self.profiler = None
+
+        # See _tick_action and set_early_exit
+        self.render_frames = self.screen_observation or not headless
+        self.settled = None
+        self.settle_min_frames = 8
+        self.settle_check_every = 4
+
+        # Reward-shaping diagnostics, see episode_events
+        self.events = EpisodeEvents()
+
+        self.pyboy = self._create_pyboy(headless)
+        self._count_loads(self.pyboy)
 
         self.prior_game_stats = self._generate_game_stats()
         self.screen = self.pyboy.screen
@@ -53,21 +120,168 @@ class PyboyEnvironment(metaclass=ABCMeta):
 
         self.reset()
 
+    def _create_pyboy(self, headless: bool) -> PyBoy:
+        # Overridden to run the task on something other than the ROM, e.g. a RAM trace
+        head = "null" if headless else "SDL2"
+        return PyBoy(
+            self.rom_path,
+            window=head,
+        )
+
+    def _count_loads(self, pyboy: PyBoy) -> None:
+        # Tasks may call pyboy.load_state themselves, as the PokemonBrock template does
+        # in reset, so the frame cache is invalidated by every load, not only _load_state
+        load_state = pyboy.load_state
+
+        def counted_load_state(file_like_object) -> None:
+            load_state(file_like_object)
+            self._invalidate_frame_cache()
+
+        pyboy.load_state = counted_load_state
+
     def set_seed(self, seed: int) -> None:
         self.seed = seed
-        # There isn't a random element to set that I am aware of...
+        # The game itself has no seed - only reset_jitter draws from this
+        self._rng = np.random.default_rng(seed)
 
     def reset(self) -> np.ndarray:
         self.steps = 0
+        self.events.end_episode()
 
-        with open(self.init_path, "rb") as f:
-            self.pyboy.load_state(f)
+        self._load_init_state()
 
-        self.prior_game_stats = self._generate_game_stats()
+        self.prior_game_stats = self._game_stats()
 
         return self._get_state()
 
+    def _load_init_state(self) -> None:
+        self._load_state(state_cache.load_state(self.init_path, self.check_init_state))
+
+        if self.reset_jitter > 0:
+            frames = int(self._rng.integers(0, self.reset_jitter + 1))
+            if frames > 0:
+                self.pyboy.tick(frames, False)
+
+    def _load_state(self, file_like_object) -> None:
+        self.pyboy.load_state(file_like_object)
+
+    def _invalidate_frame_cache(self) -> None:
+        # pyboy.frame_count is not part of a savestate, so loads are counted separately
+        self._load_count += 1
+        self._frame_cache = {}
+
+    def _cached(self, name: str, compute):
+        key = (self.pyboy.frame_count, self._load_count)
+        if key != self._frame_cache_key:
+            self._frame_cache = {}
+            self._frame_cache_key = key
+
+        if name not in self._frame_cache:
+            self._frame_cache[name] = compute()
+        return self._frame_cache[name]
+
+    def _game_stats(self) -> dict:
+        # Decoded once per emulator frame and shared by state, reward and done checks
+        return self._cached("game_stats", self._generate_game_stats)
+
+    def snapshot(self) -> int:
+        return self.snapshots.save(self.pyboy, self._episode_state())
+
+    def restore(self, handle: int) -> None:
+        episode_state = self.snapshots.load(self.pyboy, handle)
+        # Copied again so the same snapshot can be restored any number of times
+        self.__dict__.update(copy.deepcopy(episode_state))
+
+    def snapshot_stats(self) -> dict[str, int]:
+        return self.snapshots.stats()
+
+    def _episode_state(self) -> dict:
+        # Callables are the profiler's per-instance wrappers, never episode state
+        return copy.deepcopy(
+            {
+                name: value
+                for name, value in vars(self).items()
+                if name not in self._snapshot_exclude and not callable(value)
+            }
+        )
+
+    def enable_profiling(self, trace_events: int = 0) -> StepProfiler:
+        """
+        Times every phase of step and reset plus each _<name>_reward component of the
+        task. trace_events > 0 also keeps that many recent calls for dump_chrome_trace.
+        """
+        self.disable_profiling()
+        self.profiler = StepProfiler(trace_events)
+        self.profiler.attach(self, STEP_PHASES + reward_components(self))
+        return self.profiler
+
+    def disable_profiling(self) -> StepProfiler | None:
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.detach()
+        self.profiler = None
+        return profiler
+
+    def episode_events(self, last: bool = False) -> dict:
+        """
+        Event counts and sampled records of the running episode, or with last=True
+        of the episode that ended at the most recent reset.
+        """
+        return self.events.last_episode if last else self.events.summary()
+
+    def _emit_event(self, name: str, **fields) -> None:
+        self.events.emit(name, self.steps, **fields)
+
+    def decode_actions(self, actions: np.ndarray) -> np.ndarray:
+        # Batched form of the per-step decoding, one row per agent action
+        return self.action_decoder.batch(actions)
+
+    def set_early_exit(
+        self, settled=None, min_frames: int = 8, check_every: int = 4
+    ) -> None:
+        """
+        Ends an action before act_freq frames once settled(env) is true, checked every
+        check_every frames after the first min_frames. settled=None always runs the
+        full act_freq frames.
+        """
+        self.settled = settled
+        self.settle_min_frames = min_frames
+        self.settle_check_every = check_every
+
+    def _tick_action(self) -> None:
+        # All frames of an action in one tick call, rendering only the last one
+        if self.settled is None:
+            self.pyboy.tick(self.act_freq, self.render_frames)
+            return
+
+        frames = min(self.settle_min_frames, self.act_freq)
+        self.pyboy.tick(frames, self.render_frames)
+        while frames < self.act_freq and not self.settled(self):
+            count = min(self.settle_check_every, self.act_freq - frames)
+            self.pyboy.tick(count, self.render_frames)
+            frames += count
+
+    def enable_rendering(self) -> None:
+        # The screen buffer only holds frames that were rendered. If frames were
+        # being skipped, one frame is rendered from a copy of the current state, which
+        # is then loaded back so the game does not move on - the screen shows the
+        # frame that comes next. From then on every action renders its last frame.
+        if self.render_frames:
+            return
+
+        self.render_frames = True
+        state = io.BytesIO()
+        self.pyboy.save_state(state)
+        self.pyboy.tick(1, True)
+        frame = self.screen.ndarray.copy()
+        state.seek(0)
+        # Savestates include the screen buffer, so the frame is put back afterwards
+        self.pyboy.load_state(state)
+        self.screen.ndarray[:] = frame
+
     def grab_frame(self, height: int = 240, width: int = 300) -> np.ndarray:
+        self.enable_rendering()
+
         frame = np.array(self.screen.image)
         frame = cv2.resize(frame, (width, height))
         # Convert to BGR for use with OpenCV
@@ -84,7 +298,7 @@ class PyboyEnvironment(metaclass=ABCMeta):
 
         state = self._get_state()
 
-        current_game_stats = self._generate_game_stats()
+        current_game_stats = self._game_stats()
         reward = self._calculate_reward(current_game_stats)
 
         done = self._check_if_done(current_game_stats)
@@ -98,12 +312,11 @@ class PyboyEnvironment(metaclass=ABCMeta):
         return self.pyboy.memory[addr]
 
     def _read_bit(self, addr: int, bit: int) -> bool:
-        # add padding so zero will read '0b100000000' instead of '0b0'
-        return bin(256 + self._read_m(addr))[-bit - 1] == "1"
+        return (self._read_m(addr) >> bit) & 1 == 1
 
-    # built-in since python 3.10
+    # built-in since python 3.10 - use bits.popcount for NumPy slices of memory
     def _bit_count(self, bits: int) -> int:
-        return bin(bits).count("1")
+        return int(bits).bit_count()
 
     def _read_triple(self, start_add: int) -> int:
         return (
@@ -0,0 +1,247 @@
+"""
+Step-by-step recordings of an environment on disk.
+
+EpisodeRecorder wraps a PyboyEnvironment and writes every step into chunks of
+chunk_size steps:
+
+    run/meta.json
+    run/chunk_00000/actions.npy, states.npy, rewards.npy, dones.npy,
+                    truncateds.npy, episodes.npy
+    run/chunk_00000/ram.npz       compressed RAM deltas for the chunk
+    run/savestates/00000000.state emulator savestate before that step
+    run/savestates/00000000.pkl   episode state of the environment at that point
+
+The per-step arrays are plain .npy files so Recording memory-maps them instead of
+reading whole runs. RAM is stored as the full WRAM/HRAM image after the first step
+of each chunk followed by the bytes that changed on every later step.
+"""
+
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+from pyboy import PyBoy
+
+from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
+
+RAM_RANGES = ((0xC000, 0xE000), (0xFF80, 0x10000))
+
+STEP_FIELDS = ["actions", "states", "rewards", "dones", "truncateds", "episodes"]
+
+
+def capture_ram(pyboy: PyBoy) -> np.ndarray:
+    return np.concatenate(
+        [np.array(pyboy.memory[start:end], dtype=np.uint8) for start, end in RAM_RANGES]
+    )
+
+
+class EpisodeRecorder:
+    """
+    Records every reset and step of env under path. A savestate and the episode
+    state are written before every savestate_every-th step so that any step can be
+    reached again by restoring the closest one and stepping the recorded actions.
+
+    Any other attribute is passed through to the wrapped environment.
+    """
+
+    def __init__(
+        self,
+        env: PyboyEnvironment,
+        path: str,
+        chunk_size: int = 1000,
+        savestate_every: int = 100,
+    ) -> None:
+        if chunk_size < 1 or savestate_every < 1:
+            raise ValueError("chunk_size and savestate_every must be at least 1")
+
+        self.env = env
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.savestate_every = savestate_every
+
+        (self.path / "savestates").mkdir(parents=True, exist_ok=True)
+
+        self.num_steps = 0
+        self.episode = -1
+        self.chunks = []
+        self._rows = {name: [] for name in STEP_FIELDS}
+        self._ram = []
+        self._previous_ram = None
+        self.closed = False
+
+    def __getattr__(self, name: str):
+        return getattr(self.env, name)
+
+    def reset(self) -> np.ndarray:
+        self.episode += 1
+        return self.env.reset()
+
+    def step(self, action) -> tuple:
+        if self.episode < 0:
+            raise RuntimeError("reset must be called before the first step")
+
+        if self.num_steps % self.savestate_every == 0:
+            self._write_savestate(self.num_steps)
+
+        state, reward, done, truncated = self.env.step(action)
+
+        self._rows["actions"].append(np.asarray(action, dtype=np.float64))
+        self._rows["states"].append(np.asarray(state))
+        self._rows["rewards"].append(reward)
+        self._rows["dones"].append(bool(done))
+        self._rows["truncateds"].append(bool(truncated))
+        self._rows["episodes"].append(self.episode)
+        self._record_ram()
+        self.num_steps += 1
+
+        if len(self._rows["rewards"]) == self.chunk_size:
+            self.flush()
+
+        return state, reward, done, truncated
+
+    def _record_ram(self) -> None:
+        ram = capture_ram(self.env.pyboy)
+        if self._previous_ram is None:
+            self._ram.append(ram)
+        else:
+            changed = np.flatnonzero(ram != self._previous_ram).astype(np.uint16)
+            self._ram.append((changed, ram[changed]))
+        self._previous_ram = ram
+
+    def _write_savestate(self, step: int) -> None:
+        with open(self.path / "savestates" / f"{step:08d}.state", "wb") as file:
+            self.env.pyboy.save_state(file)
+        with open(self.path / "savestates" / f"{step:08d}.pkl", "wb") as file:
+            pickle.dump(self.env._episode_state(), file)
+
+    def flush(self) -> None:
+        # Writes the steps since the last flush as a new chunk
+        count = len(self._rows["rewards"])
+        if count == 0:
+            return
+
+        chunk = self.path / f"chunk_{len(self.chunks):05d}"
+        chunk.mkdir(exist_ok=True)
+        for name, rows in self._rows.items():
+            np.save(chunk / f"{name}.npy", np.asarray(rows))
+
+        # Step i of the chunk is base with the first offsets[i] changes applied
+        deltas = self._ram[1:]
+        indices = [np.empty(0, dtype=np.uint16)] + [changed for changed, _ in deltas]
+        values = [np.empty(0, dtype=np.uint8)] + [value for _, value in deltas]
+        np.savez_compressed(
+            chunk / "ram.npz",
+            base=self._ram[0],
+            offsets=np.cumsum([len(changed) for changed in indices]),
+            indices=np.concatenate(indices),
+            values=np.concatenate(values),
+        )
+
+        self.chunks.append({"name": chunk.name, "start": self.num_steps - count})
+        self._rows = {name: [] for name in STEP_FIELDS}
+        self._ram = []
+        self._previous_ram = None
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        meta = {
+            "domain": self.env.domain,
+            "task": self.env.task,
+            "act_freq": self.env.act_freq,
+            "num_steps": self.num_steps,
+            "chunk_size": self.chunk_size,
+            "savestate_every": self.savestate_every,
+            "ram_ranges": RAM_RANGES,
+            "chunks": self.chunks,
+        }
+        with open(self.path / "meta.json", "w", encoding="utf-8") as file:
+            json.dump(meta, file, indent=2)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.flush()
+            self._write_meta()
+            self.closed = True
+
+    def __enter__(self) -> "EpisodeRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Recording:
+    """
+    Read side of an EpisodeRecorder run. Per-step arrays are memory-mapped a chunk
+    at a time, and RAM is rebuilt from the chunk's deltas on request.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        with open(self.path / "meta.json", encoding="utf-8") as file:
+            self.meta = json.load(file)
+
+        self.chunks = self.meta["chunks"]
+        self.starts = np.array([chunk["start"] for chunk in self.chunks], dtype=int)
+        self._ram_chunk = None
+        self._ram_cache = None
+
+    def __len__(self) -> int:
+        return self.meta["num_steps"]
+
+    def chunk(self, index: int) -> dict[str, np.ndarray]:
+        directory = self.path / self.chunks[index]["name"]
+        return {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in STEP_FIELDS
+        }
+
+    def iter_chunks(self):
+        for index in range(len(self.chunks)):
+            yield self.chunk(index)
+
+    def _locate(self, step: int) -> tuple[int, int]:
+        if not 0 <= step < len(self):
+            raise IndexError(f"Step {step} is not in a recording of {len(self)} steps")
+        index = int(np.searchsorted(self.starts, step, side="right")) - 1
+        return index, step - self.chunks[index]["start"]
+
+    def step(self, step: int) -> dict:
+        index, row = self._locate(step)
+        return {name: values[row] for name, values in self.chunk(index).items()}
+
+    def _chunk_ram(self, index: int) -> dict[str, np.ndarray]:
+        if self._ram_chunk != index:
+            with np.load(self.path / self.chunks[index]["name"] / "ram.npz") as data:
+                self._ram_cache = {name: data[name] for name in data.files}
+            self._ram_chunk = index
+        return self._ram_cache
+
+    def ram(self, step: int) -> np.ndarray:
+        # WRAM followed by HRAM (RAM_RANGES) after the given step
+        index, row = self._locate(step)
+        data = self._chunk_ram(index)
+        end = data["offsets"][row]
+        # Only the latest change of each byte counts - found first in reverse order
+        indices, latest = np.unique(data["indices"][:end][::-1], return_index=True)
+        ram = data["base"].copy()
+        ram[indices] = data["values"][:end][::-1][latest]
+        return ram
+
+    def iter_ram(self, index: int):
+        # RAM after each step of chunk index in turn, one array updated in place
+        data = self._chunk_ram(index)
+        ram = data["base"].copy()
+        yield ram
+        offsets = data["offsets"]
+        for row in range(1, len(offsets)):
+            changed = slice(offsets[row - 1], offsets[row])
+            ram[data["indices"][changed]] = data["values"][changed]
+            yield ram
+
+    def savestate(self, step: int) -> tuple[int, Path, Path]:
+        # The savestate at or before step, as (its step, .state path, .pkl path)
+        saved = step - step % self.meta["savestate_every"]
+        directory = self.path / "savestates"
+        return saved, directory / f"{saved:08d}.state", directory / f"{saved:08d}.pkl"
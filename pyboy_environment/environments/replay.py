@@ -0,0 +1,101 @@
+"""
+Replays the actions of an EpisodeRecorder run through the emulator alone.
+
+Only _run_action_on_emulator is called for each recorded action - there is no
+observation, reward or done check and nothing is rendered. Game stats are only
+generated for the requested checkpoints and at the end, which is enough to rebuild
+the results.json of an evaluation:
+
+    env = PokemonBrock(act_freq=24, headless=True)
+    result = replay(env, Recording("results/recording"), checkpoints=[5000])
+    result["final_stats"], result["mismatches"]
+
+With verify the RAM after every step is hashed and compared with the recording,
+so any step where the replay diverged is reported.
+"""
+
+import hashlib
+from itertools import islice
+
+import numpy as np
+
+from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
+from pyboy_environment.environments.recorder import Recording, capture_ram
+
+
+def ram_hash(ram: np.ndarray) -> str:
+    return hashlib.blake2b(ram.tobytes(), digest_size=16).hexdigest()
+
+
+def replay(
+    env: PyboyEnvironment,
+    recording: Recording,
+    checkpoints: list[int] = (),
+    start: int = 0,
+    stop: int | None = None,
+    verify: bool = True,
+) -> dict:
+    """
+    Replays steps start to stop (exclusive) of recording on env, beginning from the
+    savestate at or before start. Returns the game stats after each checkpoint step
+    and after the last step, and the steps whose RAM did not match the recording.
+    """
+    meta = recording.meta
+    for key in ["domain", "task", "act_freq"]:
+        if meta[key] != getattr(env, key):
+            raise ValueError(f"Recording {key} does not match: {meta[key]}")
+    if getattr(env, "macros", None):
+        raise ValueError("Actions of an environment with macros can not be replayed")
+
+    stop = len(recording) if stop is None else min(stop, len(recording))
+    checkpoints = set(checkpoints)
+
+    saved, state_path, _ = recording.savestate(start)
+    with open(state_path, "rb") as file:
+        env._load_state(file)
+
+    render_frames = env.render_frames
+    env.render_frames = False
+
+    result = {"checkpoints": {}, "mismatches": []}
+    previous_episode = None
+    done = False
+    try:
+        for index, chunk in enumerate(recording.chunks):
+            arrays = recording.chunk(index)
+            first = chunk["start"]
+            length = len(arrays["rewards"])
+            if first + length <= saved or first >= stop:
+                continue
+
+            rows = range(max(saved - first, 0), min(stop - first, length))
+            rams = islice(recording.iter_ram(index), rows.start, None)
+            for row, recorded_ram in zip(rows, rams):
+                step = first + row
+                episode = arrays["episodes"][row]
+                # The savestate already holds any reset before its own step
+                if previous_episode is not None and episode != previous_episode:
+                    env._load_init_state()
+                previous_episode = episode
+
+                env._run_action_on_emulator(np.asarray(arrays["actions"][row]))
+                done = bool(arrays["dones"][row])
+
+                if verify:
+                    replayed_ram = capture_ram(env.pyboy)
+                    if ram_hash(replayed_ram) != ram_hash(recorded_ram):
+                        result["mismatches"].append(step)
+                if step in checkpoints and step >= start:
+                    result["checkpoints"][step] = env._generate_game_stats()
+    finally:
+        env.render_frames = render_frames
+
+    # run_agent resets straight after a done step, before reading its final stats
+    if done:
+        env._load_init_state()
+
+    result["steps"] = stop - saved
+    result["final_stats"] = env._generate_game_stats()
+    # Same as evaluate.run_agent, which counts the index of the last step
+    result["final_stats"]["actions"] = stop - 1
+    return result
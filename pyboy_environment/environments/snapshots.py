@@ -0,0 +1,96 @@
+import io
+from collections import OrderedDict
+
+from pyboy import PyBoy
+
+# Released buffers kept for reuse - they are emptied, so only the objects are kept
+MAX_FREE_BUFFERS = 4
+
+
+class SnapshotRing:
+    """
+    Bounded LRU store of emulator savestates held in RAM.
+
+    Each snapshot keeps the bytes from pyboy.save_state together with the Python-side
+    episode state of the environment. When either limit is exceeded the least recently
+    used snapshots are evicted and a few of their emptied buffers are reused.
+    """
+
+    def __init__(self, max_snapshots: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        if max_snapshots < 1:
+            raise ValueError(f"max_snapshots must be at least 1: {max_snapshots}")
+
+        self.max_snapshots = max_snapshots
+        self.max_bytes = max_bytes
+
+        self._snapshots: OrderedDict[int, tuple[io.BytesIO, int, dict]] = OrderedDict()
+        self._free_buffers: list[io.BytesIO] = []
+        self._next_handle = 0
+        self._bytes = 0
+        self.evictions = 0
+
+    def save(self, pyboy: PyBoy, episode_state: dict) -> int:
+        while len(self._snapshots) >= self.max_snapshots:
+            self._evict()
+
+        buffer = self._free_buffers.pop() if self._free_buffers else io.BytesIO()
+        buffer.seek(0)
+        buffer.truncate()
+        pyboy.save_state(buffer)
+
+        handle = self._next_handle
+        self._next_handle += 1
+        size = buffer.tell()
+        self._snapshots[handle] = (buffer, size, episode_state)
+        self._bytes += size
+
+        # Never evict the snapshot that was just taken, even if it alone is over the cap
+        while self._bytes > self.max_bytes and len(self._snapshots) > 1:
+            self._evict()
+
+        return handle
+
+    def load(self, pyboy: PyBoy, handle: int) -> dict:
+        if handle not in self._snapshots:
+            raise ValueError(f"Unknown or evicted snapshot: {handle}")
+
+        self._snapshots.move_to_end(handle)
+        buffer, _, episode_state = self._snapshots[handle]
+        buffer.seek(0)
+        pyboy.load_state(buffer)
+        return episode_state
+
+    def discard(self, handle: int) -> None:
+        self._release(*self._snapshots.pop(handle))
+
+    def clear(self) -> None:
+        while self._snapshots:
+            self._release(*self._snapshots.popitem(last=False)[1])
+
+    def _evict(self) -> None:
+        _, snapshot = self._snapshots.popitem(last=False)
+        self._release(*snapshot)
+        self.evictions += 1
+
+    def _release(self, buffer: io.BytesIO, size: int, _: dict) -> None:
+        self._bytes -= size
+        # Emptied so memory held outside the snapshots does not escape max_bytes
+        buffer.seek(0)
+        buffer.truncate(0)
+        if len(self._free_buffers) < MAX_FREE_BUFFERS:
+            self._free_buffers.append(buffer)
+
+    def __contains__(self, handle: int) -> bool:
+        return handle in self._snapshots
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "snapshots": len(self._snapshots),
+            "bytes": self._bytes,
+            "max_snapshots": self.max_snapshots,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,29 @@
+import io
+import os
+
+# Savestates keyed by path - shared by every environment in the process
+_states: dict[str, tuple[tuple[int, int], bytes]] = {}
+
+
+def load_state(path: str, check_for_changes: bool = False) -> io.BytesIO:
+    """
+    Returns an in-memory copy of the savestate at path, reading the file only once.
+
+    With check_for_changes the file is stat'ed on every call and re-read if its
+    modification time or size differ from the cached copy.
+    """
+    cached = _states.get(path)
+
+    if cached is None or check_for_changes:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if cached is None or cached[0] != signature:
+            with open(path, "rb") as f:
+                cached = (signature, f.read())
+            _states[path] = cached
+
+    return io.BytesIO(cached[1])
+
+
+def clear() -> None:
+    _states.clear()
@@ -0,0 +1,55 @@
+"""
+Loads a task class, such as a submission's PokemonBrock, from any file.
+
+The file is imported as its own module - named after its resolved path - rather
+than as pyboy_environment.environments.pokemon.tasks.brock, so several submissions
+can be loaded side by side without writing over the task in the source tree:
+
+    PokemonBrock = load_task("submissions/upi123/brock.py")
+    env = suite.make("pokemon", "brock", 24, task_class=PokemonBrock)
+
+Classes loaded this way can not be pickled by reference, so workers of a
+VecPyboyEnvironment load the file again themselves - see task_source.
+"""
+
+import hashlib
+import importlib.util
+import sys
+from pathlib import Path
+
+from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
+
+# (path, class name) of every class returned by load_task
+_sources = {}
+
+
+def load_task(path: str, class_name: str = "PokemonBrock") -> type[PyboyEnvironment]:
+    path = Path(path).resolve()
+    digest = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    module_name = f"_pyboy_task_{path.stem}_{digest}"
+
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        if spec is None:
+            raise ImportError(f"Can not load a task from {path}")
+        module = importlib.util.module_from_spec(spec)
+        # Registered first so the module can refer to itself while it is executed
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+
+    task_class = getattr(module, class_name, None)
+    if not (isinstance(task_class, type) and issubclass(task_class, PyboyEnvironment)):
+        raise TypeError(f"{path} has no PyboyEnvironment named {class_name}")
+
+    _sources[task_class] = (str(path), class_name)
+    return task_class
+
+
+def task_source(task_class: type) -> tuple[str, str] | None:
+    # The arguments to load task_class again, or None if it is importable as is
+    return _sources.get(task_class)
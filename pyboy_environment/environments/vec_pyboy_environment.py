@@ -0,0 +1,342 @@
+import multiprocessing as mp
+from functools import cached_property
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+
+import numpy as np
+
+from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
+
+SCREEN_SHAPE = (144, 160, 3)
+
+
+class _SharedBuffers:
+    """
+    NumPy views over named shared memory blocks - one row per sub-environment.
+
+    The parent process creates the blocks, the workers attach to them by name.
+    Only the workers write - the parent hands out the read-only views.
+    """
+
+    def __init__(self, specs: dict[str, tuple], names: dict[str, str] = None) -> None:
+        self.specs = specs
+        self.owner = names is None
+        self.blocks = {}
+        self.arrays = {}
+        self.views = {}
+
+        for key, (shape, dtype) in specs.items():
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            if self.owner:
+                block = SharedMemory(create=True, size=nbytes)
+            else:
+                block = SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            self.views[key] = self.arrays[key].view()
+            self.views[key].flags.writeable = False
+
+    @property
+    def names(self) -> dict[str, str]:
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.arrays[key]
+
+    def close(self) -> None:
+        # Views must be dropped before the underlying buffer can be released
+        self.arrays = {}
+        self.views = {}
+        for block in self.blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # A caller still holds a view - the mapping goes when that does
+                pass
+            if self.owner:
+                block.unlink()
+        self.blocks = {}
+
+
+def _write_frame(env: PyboyEnvironment, frames: np.ndarray, index: int) -> None:
+    # pyboy's screen buffer is RGBA - the alpha channel is dropped to match grab_frame
+    env.enable_rendering()
+    frames[index] = env.screen.ndarray[:, :, :3]
+
+
+def _worker(
+    remote: Connection,
+    parent_remote: Connection,
+    env_fn: Callable[[], PyboyEnvironment],
+    reset_on_truncated: bool = True,
+) -> None:
+    parent_remote.close()
+    env = env_fn()
+    buffers = None
+    index = 0
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == "step":
+                state, reward, done, truncated = env.step(data)
+                if done or (truncated and reset_on_truncated):
+                    state = env.reset()
+                if buffers is None:
+                    remote.send((state, reward, done, truncated))
+                else:
+                    buffers["states"][index] = state
+                    buffers["rewards"][index] = reward
+                    buffers["dones"][index] = done
+                    buffers["truncateds"][index] = truncated
+                    remote.send(None)
+            elif command == "reset":
+                if buffers is None:
+                    remote.send(env.reset())
+                else:
+                    buffers["states"][index] = env.reset()
+                    remote.send(None)
+            elif command == "attach":
+                index, specs, names = data
+                buffers = _SharedBuffers(specs, names)
+                remote.send(None)
+            elif command == "grab_frame":
+                if buffers is None:
+                    env.enable_rendering()
+                    remote.send(env.screen.ndarray[:, :, :3].copy())
+                else:
+                    _write_frame(env, buffers["frames"], index)
+                    remote.send(None)
+            elif command == "set_seed":
+                remote.send(env.set_seed(data))
+            elif command == "spaces":
+                remote.send(
+                    (
+                        env.observation_space,
+                        env.action_num,
+                        env.min_action_value,
+                        env.max_action_value,
+                        np.asarray(env._get_state()).dtype.str,
+                        None if env.discrete_actions else env.action_decoder,
+                    )
+                )
+            elif command == "discrete_actions":
+                env.discrete_actions = data
+                remote.send(None)
+            elif command == "set_attr":
+                name, value = data
+                setattr(env, name, value)
+                remote.send(None)
+            elif command == "call":
+                name, args, kwargs = data
+                remote.send(getattr(env, name)(*args, **kwargs))
+            elif command == "close":
+                break
+            else:
+                raise ValueError(f"Unknown worker command: {command}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if buffers is not None:
+            buffers.close()
+        env.pyboy.stop(save=False)
+        remote.close()
+
+
+class VecPyboyEnvironment:
+    """
+    Runs one PyboyEnvironment per worker process and steps them in lockstep.
+
+    Sub-environments that finish (done or truncated) are reset inside their worker,
+    so the state returned for that index is the first state of the next episode.
+    With reset_on_truncated=False only done resets, as in evaluate.run_agent.
+
+    Continuous actions are decoded for all sub-environments at once in step_async
+    and the workers receive the button indices (or held flags for Mario).
+
+    With shared_memory the workers write states, rewards, done flags and screen frames
+    straight into preallocated shared NumPy blocks and only a small control message
+    goes through the pipe each step. reset, step and grab_frames then return
+    read-only views of those blocks, valid until the next call that writes them -
+    copy anything kept across steps, such as states added to a replay buffer.
+    """
+
+    def __init__(
+        self,
+        env_fns: list[Callable[[], PyboyEnvironment]],
+        start_method: str = "spawn",
+        shared_memory: bool = False,
+        reset_on_truncated: bool = True,
+    ) -> None:
+        self.num_envs = len(env_fns)
+        self.closed = False
+        self.buffers = None
+
+        ctx = mp.get_context(start_method)
+        if shared_memory:
+            # Started before the workers so forked ones share it rather than each
+            # starting their own, which would unlink the blocks when the worker exits
+            resource_tracker.ensure_running()
+        self.remotes, work_remotes = zip(*[ctx.Pipe() for _ in range(self.num_envs)])
+
+        self.processes = []
+        for work_remote, remote, env_fn in zip(work_remotes, self.remotes, env_fns):
+            process = ctx.Process(
+                target=_worker,
+                args=(work_remote, remote, env_fn, reset_on_truncated),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        self.remotes[0].send(("spaces", None))
+        (
+            self._observation_space,
+            self._action_num,
+            self._min_action_value,
+            self._max_action_value,
+            state_dtype,
+            self.action_decoder,
+        ) = self.remotes[0].recv()
+
+        # Discrete sub-environments send no decoder and actions are passed on as they
+        # are. Otherwise actions are decoded here and the workers take the result.
+        self.discrete_actions = self.action_decoder is None
+        if not self.discrete_actions:
+            for remote in self.remotes:
+                remote.send(("discrete_actions", True))
+            for remote in self.remotes:
+                remote.recv()
+
+        if shared_memory:
+            self._attach_buffers(state_dtype)
+
+    def _attach_buffers(self, state_dtype: str) -> None:
+        specs = {
+            "states": ((self.num_envs, self._observation_space), state_dtype),
+            "rewards": ((self.num_envs,), np.float64),
+            "dones": ((self.num_envs,), bool),
+            "truncateds": ((self.num_envs,), bool),
+            "frames": ((self.num_envs, *SCREEN_SHAPE), np.uint8),
+        }
+        self.buffers = _SharedBuffers(specs)
+
+        for i, remote in enumerate(self.remotes):
+            remote.send(("attach", (i, specs, self.buffers.names)))
+        for remote in self.remotes:
+            remote.recv()
+
+    @cached_property
+    def min_action_value(self) -> float:
+        return self._min_action_value
+
+    @cached_property
+    def max_action_value(self) -> float:
+        return self._max_action_value
+
+    @cached_property
+    def observation_space(self) -> int:
+        return self._observation_space
+
+    @cached_property
+    def action_num(self) -> int:
+        return self._action_num
+
+    def sample_action(self) -> np.ndarray:
+        if self.discrete_actions:
+            # Every integer from min_action_value to max_action_value inclusive
+            return np.random.randint(
+                int(self.min_action_value),
+                int(self.max_action_value) + 1,
+                size=(self.num_envs, self.action_num),
+            )
+        return np.random.uniform(
+            self.min_action_value,
+            self.max_action_value,
+            size=(self.num_envs, self.action_num),
+        )
+
+    def set_seed(self, seed: int) -> None:
+        # Each sub-environment gets its own seed so the copies do not run in sync
+        for i, remote in enumerate(self.remotes):
+            remote.send(("set_seed", seed + i))
+        for remote in self.remotes:
+            remote.recv()
+
+    def reset(self) -> np.ndarray:
+        for remote in self.remotes:
+            remote.send(("reset", None))
+        states = [remote.recv() for remote in self.remotes]
+
+        if self.buffers is not None:
+            return self.buffers.views["states"]
+        return np.stack([np.asarray(state) for state in states])
+
+    def step(self, actions) -> tuple:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions) -> None:
+        if self.action_decoder is not None:
+            actions = self.action_decoder.batch(actions)
+            if actions.ndim == 1:
+                actions = actions[:, None]
+        for remote, action in zip(self.remotes, actions):
+            remote.send(("step", action))
+
+    def step_wait(self) -> tuple:
+        results = [remote.recv() for remote in self.remotes]
+
+        if self.buffers is not None:
+            views = self.buffers.views
+            return (
+                views["states"],
+                views["rewards"],
+                views["dones"],
+                views["truncateds"],
+            )
+
+        states, rewards, dones, truncateds = zip(*results)
+        return (
+            np.stack([np.asarray(state) for state in states]),
+            np.array(rewards, dtype=np.float64),
+            np.array(dones, dtype=bool),
+            np.array(truncateds, dtype=bool),
+        )
+
+    def grab_frames(self) -> np.ndarray:
+        for remote in self.remotes:
+            remote.send(("grab_frame", None))
+        frames = [remote.recv() for remote in self.remotes]
+
+        if self.buffers is not None:
+            return self.buffers.views["frames"]
+        return np.stack(frames)
+
+    def call(self, name: str, *args, **kwargs) -> list:
+        for remote in self.remotes:
+            remote.send(("call", (name, args, kwargs)))
+        return [remote.recv() for remote in self.remotes]
+
+    def set_attr(self, name: str, values: list) -> None:
+        # values[i] is set on sub-environment i
+        for remote, value in zip(self.remotes, values, strict=True):
+            remote.send(("set_attr", (name, value)))
+        for remote in self.remotes:
+            remote.recv()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        if self.buffers is not None:
+            self.buffers.close()
+        self.closed = True
+
+    def __len__(self) -> int:
+        return self.num_envs
@@ -5,14 +5,26 @@ Do NOT edit this file as it runs the evaluation methodology for the Trained Poke
 import argparse
 import json
 import logging
+import resource
 from pathlib import Path
 
 import cares_reinforcement_learning.util.configurations as configurations
+import numpy as np
+import torch
 from cares_reinforcement_learning.util.network_factory import NetworkFactory
+from pyboy_environment import suite
 from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.recorder import EpisodeRecorder
+from pyboy_environment.environments.task_loader import load_task
 
 logging.basicConfig(level=logging.INFO)
 
+# Reported per copy and aggregated by run_agent_batched
+AGGREGATE_STATS = ["badges", "caught_pokemon", "seen_pokemon", "levels", "xp"]
+
+# Frames of start-up jitter so the copies of run_agent_batched diverge
+RESET_JITTER = 60
+
 
 def get_args():
     parse_args = argparse.ArgumentParser()
@@ -25,10 +37,29 @@ def get_args():
 
     parse_args.add_argument("-r", "--results_path", type=str, required=True)
 
-    return parse_args.parse_args()
+    # Keeps every step under <results_path>/recording - see environments.recorder
+    parse_args.add_argument("--record", action="store_true")
+
+    # Copies of the task stepped together by run_agent_batched - 1 is run_agent
+    parse_args.add_argument("--num_envs", type=int, default=1)
+
+    parse_args.add_argument("--seed", type=int, default=0)
+
+    # The submission's brock.py - defaults to the PokemonBrock of this repository
+    parse_args.add_argument("--task_path", type=str, default=None)
+
+    # Address-space cap in bytes, set before the submission is loaded
+    parse_args.add_argument("--memory_limit", type=int, default=None)
+
+    args = parse_args.parse_args()
+    if args.record and args.num_envs > 1:
+        parse_args.error("--record can only be used with --num_envs 1")
+    return args
 
 
-def run_agent(env, agent, num_episodes, results_path):
+def run_agent(env, agent, num_episodes, results_path, recording_path=None):
+    if recording_path is not None:
+        env = EpisodeRecorder(env, recording_path)
 
     state = env.reset()
     for step in range(0, num_episodes):
@@ -44,13 +75,119 @@ def run_agent(env, agent, num_episodes, results_path):
 
     final_stats["actions"] = step
 
+    if recording_path is not None:
+        env.close()
+
     logging.info(f"Final Stats: {final_stats}")
 
     with open(f"{results_path}/results.json", "w", encoding="utf-8") as file:
         json.dump(final_stats, file)
 
 
-def run(results_path, model_file_path, model_file_name):
+def select_actions(agent, states):
+    # One call per state - for agents that can not be asked for a batch
+    return np.stack(
+        [
+            np.asarray(agent.select_action_from_policy(state, evaluation=True))
+            for state in states
+        ]
+    )
+
+
+def actor_actions(agent, states):
+    # One forward pass of the actor for every state, as select_action_from_policy
+    # does for a single state. SAC style actors return (sample, log_pi, mean) and
+    # evaluation uses the mean.
+    actor = agent.actor_net
+    actor.eval()
+    with torch.no_grad():
+        batch = torch.as_tensor(np.asarray(states), dtype=torch.float32)
+        output = actor(batch.to(agent.device))
+        if isinstance(output, tuple):
+            output = output[-1]
+    actor.train()
+    return output.cpu().numpy().reshape(len(states), -1)
+
+
+def batch_policy(agent, states):
+    """
+    Returns a function from a batch of states to their actions in one inference
+    call - the agent's own select_actions_batch if it has one, or else one pass of
+    its actor_net. The actor pass is only used if it picks the same actions as
+    select_action_from_policy for states, and select_actions is the fallback.
+    """
+    if hasattr(agent, "select_actions_batch"):
+        return lambda batch: np.asarray(
+            agent.select_actions_batch(batch, evaluation=True)
+        )
+
+    if hasattr(agent, "actor_net") and hasattr(agent, "device"):
+        try:
+            batched = actor_actions(agent, states)
+        except (RuntimeError, TypeError, ValueError) as error:
+            logging.warning(f"Batched inference failed, asking per state: {error}")
+        else:
+            expected = select_actions(agent, states).reshape(len(states), -1)
+            if np.allclose(batched, expected, atol=1e-5):
+                return lambda batch: actor_actions(agent, batch)
+            logging.warning("Batched actions differ from the policy, asking per state")
+
+    return lambda batch: select_actions(agent, batch)
+
+
+def aggregate_stats(copies):
+    aggregate = {}
+    for name in AGGREGATE_STATS:
+        # Levels and xp are per party slot - each copy counts as its mean
+        values = np.array([np.mean(stats[name]) for stats in copies], dtype=float)
+        aggregate[name] = {
+            "mean": float(values.mean()),
+            "min": float(values.min()),
+            "p10": float(np.percentile(values, 10)),
+            "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)),
+            "max": float(values.max()),
+        }
+    return aggregate
+
+
+def run_agent_batched(env, agent, num_episodes, results_path):
+    """
+    run_agent over a VecPyboyEnvironment, stepping every copy at once. The first
+    copy runs without reset jitter, so the top level of results.json is what
+    run_agent would write, followed by every copy and the aggregate over the copies.
+    """
+    states = env.reset()
+    policy = batch_policy(agent, states)
+    for step in range(0, num_episodes):
+        if step % 100 == 0:
+            logging.info(f"Step: {step}")
+        actions = policy(states)
+        states, _, _, _ = env.step(actions)
+
+    copies = env.call("_generate_game_stats")
+    for stats in copies:
+        stats["actions"] = step
+
+    final_stats = dict(copies[0])
+    final_stats["copies"] = copies
+    final_stats["aggregate"] = aggregate_stats(copies)
+
+    logging.info(f"Final Stats: {final_stats['aggregate']}")
+
+    with open(f"{results_path}/results.json", "w", encoding="utf-8") as file:
+        json.dump(final_stats, file)
+
+
+def run(
+    results_path,
+    model_file_path,
+    model_file_name,
+    record=False,
+    num_envs=1,
+    seed=0,
+    task_class=PokemonBrock,
+):
     algorithm = model_file_name.split("-")[0]
 
     class_ = getattr(configurations, f"{algorithm}Config")
@@ -58,7 +195,21 @@ def run(results_path, model_file_path, model_file_name):
 
     network_factory = NetworkFactory()
 
-    brock_task = PokemonBrock(act_freq=24, headless=True)
+    if num_envs > 1:
+        # Only done resets a copy, as in run_agent
+        brock_task = suite.make_vec(
+            "pokemon",
+            "brock",
+            num_envs,
+            act_freq=24,
+            reset_on_truncated=False,
+            task_class=task_class,
+        )
+        brock_task.set_seed(seed)
+        # The first copy stays comparable with a run_agent evaluation
+        brock_task.set_attr("reset_jitter", [0] + [RESET_JITTER] * (num_envs - 1))
+    else:
+        brock_task = task_class(act_freq=24, headless=True)
 
     agent = network_factory.create_network(
         brock_task.observation_space, brock_task.action_num, algorithm_config
@@ -66,13 +217,31 @@ def run(results_path, model_file_path, model_file_name):
 
     agent.load_models(model_file_path, model_file_name)
 
-    run_agent(brock_task, agent, 10000, results_path)
+    if num_envs > 1:
+        run_agent_batched(brock_task, agent, 10000, results_path)
+        brock_task.close()
+    else:
+        recording_path = f"{results_path}/recording" if record else None
+        run_agent(brock_task, agent, 10000, results_path, recording_path)
 
 
 def main():
     args = get_args()
 
-    run(args.results_path, args.model_path, args.model_name)
+    if args.memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (args.memory_limit, args.memory_limit))
+
+    task_class = load_task(args.task_path) if args.task_path else PokemonBrock
+
+    run(
+        args.results_path,
+        args.model_path,
+        args.model_name,
+        args.record,
+        args.num_envs,
+        args.seed,
+        task_class,
+    )
 
 
 if __name__ == "__main__":
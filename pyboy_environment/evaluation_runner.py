@@ -0,0 +1,199 @@
+"""
+Runs evaluate.py for many submissions at once.
+
+Each job is its own evaluate.py process, so every submission gets its own emulator
+and a crash, hang or runaway allocation only fails that job. Jobs are limited by
+a timeout and an address-space cap, and at most max_workers (the CPU count by
+default) run at the same time. results.json is written to a temporary directory
+first and moved into results/<upi>/ only once the run has finished successfully.
+
+python3 evaluation_runner.py -r ../results --workers 16 --timeout 3600
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+logging.basicConfig(level=logging.INFO)
+
+EVALUATE = Path(__file__).parent / "evaluate.py"
+
+
+class EvaluationJob(NamedTuple):
+    upi: str
+    # Interpreter of the submission's virtual environment
+    python_bin: str
+    model_path: str
+    model_name: str
+    # results.json and evaluate.log are written here
+    results_path: str
+    # The submission's brock.py, loaded by evaluate.py without touching the tree
+    task_path: str | None = None
+
+
+def write_json_atomic(path: str, data) -> None:
+    # Readers see either the old file or the complete new one, never a partial write
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def run_job(job: EvaluationJob, timeout: float, memory_limit: int = None) -> dict:
+    os.makedirs(job.results_path, exist_ok=True)
+    run_path = tempfile.mkdtemp(dir=job.results_path, prefix=".evaluate-")
+
+    command = [
+        job.python_bin,
+        str(EVALUATE),
+        "--upi",
+        job.upi,
+        "--model_path",
+        job.model_path,
+        "--model_name",
+        job.model_name,
+        "--results_path",
+        run_path,
+    ]
+    if job.task_path:
+        command += ["--task_path", job.task_path]
+    if memory_limit:
+        # Set by evaluate.py itself before the submission is loaded - Popen is called
+        # from pool threads, where a preexec_fn could deadlock the forked child
+        command += ["--memory_limit", str(memory_limit)]
+
+    start = time.perf_counter()
+    status = "failed"
+    exit_code = None
+    with open(f"{job.results_path}/evaluate.log", "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            command,
+            cwd=EVALUATE.parent,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            # Own process group so a timeout also stops anything it started
+            start_new_session=True,
+        )
+        try:
+            exit_code = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+            status = "timeout"
+
+    results_file = f"{run_path}/results.json"
+    if exit_code == 0 and os.path.exists(results_file):
+        os.replace(results_file, f"{job.results_path}/results.json")
+        status = "ok"
+    shutil.rmtree(run_path, ignore_errors=True)
+
+    return {
+        "upi": job.upi,
+        "status": status,
+        "exit_code": exit_code,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def log_outcome(outcome: dict) -> None:
+    logging.info(
+        f"{outcome['upi']}: {outcome['status']} "
+        f"(exit code {outcome['exit_code']}) in {outcome['seconds']:.0f}s"
+    )
+
+
+def run_jobs(
+    jobs: list[EvaluationJob],
+    max_workers: int = None,
+    timeout: float = 3600,
+    memory_limit: int = None,
+) -> dict[str, dict]:
+    """
+    Runs every job with at most max_workers at once and returns the outcome of each
+    job by UPI. Each outcome is logged as soon as that job finishes.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_job, job, timeout, memory_limit) for job in jobs]
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes[outcome["upi"]] = outcome
+            log_outcome(outcome)
+    return outcomes
+
+
+def find_jobs(results_root: str, venv_root: str) -> list[EvaluationJob]:
+    # Layout left by pull_results: <results_root>/<upi>/models/<algorithm>_...
+    # and optionally the submission's <results_root>/<upi>/brock.py
+    jobs = []
+    for upi_path in sorted(Path(results_root).iterdir()):
+        models = upi_path / "models"
+        if not models.is_dir() or not any(models.iterdir()):
+            continue
+
+        upi = upi_path.name
+        model_name = sorted(models.iterdir())[0].name.split("_")[0]
+        python_bin = Path(venv_root) / upi / "bin" / "python3"
+        task_path = upi_path / "brock.py"
+        jobs.append(
+            EvaluationJob(
+                upi=upi,
+                python_bin=str(python_bin) if python_bin.exists() else sys.executable,
+                model_path=str(upi_path),
+                model_name=model_name,
+                results_path=str(upi_path),
+                task_path=str(task_path) if task_path.exists() else None,
+            )
+        )
+    return jobs
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-r", "--results_path", type=str, required=True)
+
+    parse_args.add_argument(
+        "--venv_path", type=str, default=f"{os.path.expanduser('~')}/venv"
+    )
+
+    parse_args.add_argument("--workers", type=int, default=None)
+
+    parse_args.add_argument("--timeout", type=float, default=3600)
+
+    parse_args.add_argument("--memory_limit_gb", type=float, default=None)
+
+    return parse_args.parse_args()
+
+
+def main():
+    args = get_args()
+
+    jobs = find_jobs(args.results_path, args.venv_path)
+    logging.info(f"Evaluating {len(jobs)} submissions")
+
+    memory_limit = int(args.memory_limit_gb * 1024**3) if args.memory_limit_gb else None
+    outcomes = run_jobs(jobs, args.workers, args.timeout, memory_limit)
+
+    write_json_atomic(f"{args.results_path}/evaluation_runs.json", outcomes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Persistent ranking of the results/<upi>/results.json files.
+
+Each result is reduced once to the columns of sort_key and kept in an SQLite
+database next to the results. update() only re-reads results.json files whose
+size or modification time changed since the last run, and ranking() is an indexed
+ORDER BY, so re-ranking after a batch of grading does not reload the cohort.
+
+The order is the same as sorting with compare_results.compare_performance, with
+ties broken by UPI.
+"""
+
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+DATABASE_NAME = "leaderboard.sqlite"
+
+COLUMNS = ["badges", "actions", "caught_pokemon", "seen_pokemon", "levels", "xp"]
+
+
+def sort_key(result: dict) -> tuple:
+    # Ascending key - best first. Actions only separate results that have a badge.
+    badges = result["badges"]
+    return (
+        -badges,
+        -result["actions"] if badges > 0 else 0,
+        -result["caught_pokemon"],
+        -result["seen_pokemon"],
+        -float(np.mean(result["levels"])),
+        -float(np.mean(result["xp"])),
+    )
+
+
+class Leaderboard:
+    def __init__(self, results_path: str, database_path: str = None) -> None:
+        self.results_path = results_path
+        self.database_path = database_path or os.path.join(results_path, DATABASE_NAME)
+
+        self.connection = sqlite3.connect(self.database_path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                upi TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                key_badges REAL NOT NULL,
+                key_actions REAL NOT NULL,
+                key_caught REAL NOT NULL,
+                key_seen REAL NOT NULL,
+                key_levels REAL NOT NULL,
+                key_xp REAL NOT NULL,
+                summary TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ranking ON results (
+                key_badges, key_actions, key_caught, key_seen, key_levels, key_xp, upi
+            );
+            """)
+
+    def _result_files(self) -> dict[str, os.stat_result]:
+        files = {}
+        with os.scandir(self.results_path) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                try:
+                    files[entry.name] = os.stat(
+                        os.path.join(entry.path, "results.json")
+                    )
+                except FileNotFoundError:
+                    continue
+        return files
+
+    def update(self) -> int:
+        """
+        Brings the index in line with the results directory and returns how many
+        results were added, changed or removed.
+        """
+        known = {
+            upi: (mtime_ns, size)
+            for upi, mtime_ns, size in self.connection.execute(
+                "SELECT upi, mtime_ns, size FROM results"
+            )
+        }
+        files = self._result_files()
+
+        rows = []
+        for upi, stat in files.items():
+            if known.get(upi) == (stat.st_mtime_ns, stat.st_size):
+                continue
+
+            path = os.path.join(self.results_path, upi, "results.json")
+            with open(path, "r", encoding="utf-8") as file:
+                result = json.load(file)
+
+            summary = {name: result[name] for name in COLUMNS}
+            rows.append(
+                (
+                    upi,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    *sort_key(result),
+                    json.dumps(summary),
+                )
+            )
+
+        removed = [(upi,) for upi in known if upi not in files]
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.connection.executemany("DELETE FROM results WHERE upi = ?", removed)
+
+        return len(rows) + len(removed)
+
+    def ranking(self) -> list[dict]:
+        cursor = self.connection.execute("""
+            SELECT upi, summary FROM results ORDER BY
+                key_badges, key_actions, key_caught, key_seen, key_levels, key_xp, upi
+            """)
+        return [{"upi": upi, **json.loads(summary)} for upi, summary in cursor]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "Leaderboard":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
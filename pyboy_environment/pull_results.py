@@ -2,156 +2,172 @@
 Do NOT edit this file as it runs the evaluation methodology for the Trained Pokemon agents.
 """
 
+import argparse
 import logging
 import os
-import subprocess
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-import virtualenv
 from pydrive2.auth import GoogleAuth
 from pydrive2.drive import GoogleDrive
 
-logging.basicConfig(level=logging.INFO)
+from pyboy_environment.evaluation_runner import (
+    EvaluationJob,
+    log_outcome,
+    run_job,
+    write_json_atomic,
+)
+from pyboy_environment.submission_sources import (
+    DriveSource,
+    LocalSource,
+    Submission,
+    fetch_submissions,
+)
+from pyboy_environment.venv_provisioning import InstallStep, VenvProvisioner
 
+logging.basicConfig(level=logging.INFO)
 
-def run_venv(upi, requirement_path, model_path, model_name):
-    path = f"{os.path.expanduser('~')}/venv"
-    venv_dir = os.path.join(path, f"{upi}")
-    virtualenv.cli_run([venv_dir])
+REPOSITORY_PATH = Path(__file__).parent.parent
 
-    python_bin = f"{path}/{upi}/bin/python3"
 
+def run_venv(
+    provisioner: VenvProvisioner,
+    upi,
+    requirement_path,
+    model_path,
+    model_name,
+    repository_wheel: str,
+) -> EvaluationJob:
+    # The submission's requirements.txt is captured here, so the venvs can be built
+    # later by provisioner.provision_all and the evaluations run in parallel with
+    # run_jobs. Its brock.py is loaded by evaluate.py from model_path.
     cares_rl_path = f"{Path.home()}/workspace/cares_reinforcement_learning"
 
-    command = (
-        f". {venv_dir}/bin/activate && pip install -r {cares_rl_path}/requirements.txt"
+    steps = [
+        InstallStep("requirements", f"{cares_rl_path}/requirements.txt"),
+        InstallStep("package", cares_rl_path),
+        InstallStep("requirements", f"{requirement_path}/requirements.txt"),
+    ]
+    # Built once per run by main, so every venv gets the current repository
+    provisioner.add(upi, steps, repository_wheel)
+
+    return EvaluationJob(
+        upi=upi,
+        python_bin=provisioner.python_bin(upi),
+        model_path=model_path,
+        model_name=model_name,
+        results_path=model_path,
+        task_path=f"{model_path}/brock.py",
     )
-    os.system(command)
-
-    command = f". {venv_dir}/bin/activate && pip install {cares_rl_path}"
-    os.system(command)
-
-    command = f". {venv_dir}/bin/activate && pip install -r {requirement_path}/requirements.txt"
-    os.system(command)
-
-    command = f". {venv_dir}/bin/activate && pip install {requirement_path}"
-    os.system(command)
-
-    p = subprocess.Popen(
-        [
-            python_bin,
-            "evaluate.py",
-            "--upi",
-            upi,
-            "--model_path",
-            model_path,
-            "--model_name",
-            model_name,
-            "--results_path",
-            model_path,
-        ]
-    )
-
-    exit_code = p.wait()
-    print(f"Exit code: {exit_code} {upi}")
-
-
-def read_folder(drive, title, file_id):
-    folder = {}
-
-    folder["title"] = title
-    folder["files"] = {}
-    folder["folders"] = []
-
-    drive_list = drive.ListFile(
-        {"q": f"'{file_id}' in parents and trashed=false"}
-    ).GetList()
 
-    for f in drive_list:
-        if f["mimeType"] == "application/vnd.google-apps.folder":
-            folder["folders"].append(read_folder(drive, f["title"], f["id"]))
-        else:
-            folder["files"][f["title"]] = {
-                "id": f["id"],
-                "title": f["title"],
-                "title1": f["alternateLink"],
-            }
 
-    return folder
+def stage_submission(submission: Submission, directory: Path, repository_path: Path):
+    # evaluate.py reads the models from results/<upi>/models and the task from
+    # results/<upi>/brock.py, leaving the source tree untouched
+    results_path = repository_path / "results" / submission.upi
+    logging.info(f"Saving data into: {results_path}")
+    results_path.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(directory / "brock.py", results_path / "brock.py")
 
+    model_path = results_path / "models"
+    model_path.mkdir(parents=True, exist_ok=True)
+    for file in submission.files:
+        if file.name.startswith("models/"):
+            shutil.copyfile(directory / file.name, results_path / file.name)
 
-def print_folders(directory, tab=0):
-    tabs = " " * tab
+    return str(results_path)
 
-    for _, file in directory["files"].items():
-        message = f"{tabs}File: {file['title']}, id: {file['id']}"
-        print(f"{message}")
 
-    for folder in directory["folders"]:
-        message = f"{tabs}Folder: {folder['title']}"
-        print(f"{message}")
-        print_folders(folder, tab=tab + 5)
+def provision_and_run(
+    provisioner: VenvProvisioner, job: EvaluationJob, timeout: float
+) -> dict:
+    if provisioner.provision_upi(job.upi) is None:
+        return {
+            "upi": job.upi,
+            "status": "venv failed",
+            "exit_code": None,
+            "seconds": 0,
+        }
+    return run_job(job, timeout)
 
 
-def main():
-    gauth = GoogleAuth()
-    gauth.LocalWebserverAuth()
-
-    drive = GoogleDrive(gauth)
+def get_args():
+    parse_args = argparse.ArgumentParser()
 
-    # COMPSYS726 - Assignment 1 Folder
-    primary_folder_id = "1OWORBjdzuJjPZYZoCKMs4hI3xemvcDzh"
-
-    directory = read_folder(
-        drive, "COMPSYS726 - Assignments", file_id=primary_folder_id
+    parse_args.add_argument(
+        "--venv_path", type=str, default=f"{os.path.expanduser('~')}/venv"
     )
 
-    print_folders(directory)
-
-    for folders in directory["folders"]:
-        upi = folders["title"]
-        print(f"Title: {upi}")
+    # Defaults to venv_path/.wheelhouse
+    parse_args.add_argument("--wheelhouse", type=str, default=None)
 
-        files = folders["files"]
-        requirements_id = files["requirements.txt"]["id"]
-        brock_task_id = files["brock.py"]["id"]
+    # Install only from the wheelhouse, without network access
+    parse_args.add_argument("--offline", action="store_true")
 
-        model_folder = folders["folders"][0]
-        logging.info(f"{model_folder=}")
+    parse_args.add_argument("--workers", type=int, default=None)
 
-        requirement_path = f"{Path(__file__).parent.parent}"
-        logging.info(f"{requirement_path=}")
+    # Read submissions from this directory instead of Google Drive
+    parse_args.add_argument("--source_path", type=str, default=None)
 
-        brock_path = f"{Path(__file__).parent.parent}/pyboy_environment/environments/pokemon/tasks"
-        logging.info(f"{brock_path=}")
-
-        results_path = f"{Path(__file__).parent.parent}/results/{upi}"
-        logging.info(f"Saving data into: {results_path}")
+    # Downloaded submissions are kept here to skip unchanged files next time
+    parse_args.add_argument(
+        "--download_path", type=str, default=f"{REPOSITORY_PATH}/submissions"
+    )
 
-        if not os.path.exists(results_path):
-            os.makedirs(results_path)
+    parse_args.add_argument("--fetch_workers", type=int, default=8)
 
-        file = drive.CreateFile({"id": requirements_id})
-        file.GetContentFile(f"{requirement_path}/requirements.txt")
+    parse_args.add_argument("--timeout", type=float, default=3600)
 
-        file = drive.CreateFile({"id": brock_task_id})
-        file.GetContentFile(f"{brock_path}/brock.py")
+    return parse_args.parse_args()
 
-        logging.info(f"{type(model_folder['files'])=}")
 
-        for file_name, model_info in model_folder["files"].items():
-            model_name = file_name.split("_")[0]
-            logging.info(f"{file_name=}")
-            logging.info(f"{model_info=}")
-            logging.info(f"{model_name=}")
-            file = drive.CreateFile({"id": model_info["id"]})
+def main():
+    args = get_args()
 
-            model_path = f"{results_path}/models"
-            if not os.path.exists(model_path):
-                os.makedirs(model_path)
-            file.GetContentFile(f"{model_path}/{file_name}")
+    provisioner = VenvProvisioner(
+        args.venv_path, args.wheelhouse, args.offline, args.workers
+    )
 
-        run_venv(upi, requirement_path, results_path, model_name)
+    repository_wheel = provisioner.build_wheel(str(REPOSITORY_PATH), "repository")
+
+    if args.source_path:
+        source = LocalSource(args.source_path)
+    else:
+        gauth = GoogleAuth()
+        gauth.LocalWebserverAuth()
+
+        # COMPSYS726 - Assignment 1 Folder
+        primary_folder_id = "1OWORBjdzuJjPZYZoCKMs4hI3xemvcDzh"
+        source = DriveSource(GoogleDrive(gauth), primary_folder_id)
+
+    # Each submission is provisioned and evaluated as soon as all of its files are
+    # downloaded, while the rest are still being fetched
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=args.workers or os.cpu_count() or 1) as pool:
+        futures = []
+        for submission, directory in fetch_submissions(
+            source, args.download_path, args.fetch_workers
+        ):
+            results_path = stage_submission(submission, directory, REPOSITORY_PATH)
+            job = run_venv(
+                provisioner,
+                submission.upi,
+                str(directory),
+                results_path,
+                submission.model_name,
+                repository_wheel,
+            )
+            futures.append(
+                pool.submit(provision_and_run, provisioner, job, args.timeout)
+            )
+
+        for future in as_completed(futures):
+            outcome = future.result()
+            outcomes[outcome["upi"]] = outcome
+            log_outcome(outcome)
+
+    write_json_atomic(f"{REPOSITORY_PATH}/results/evaluation_runs.json", outcomes)
 
 
 if __name__ == "__main__":
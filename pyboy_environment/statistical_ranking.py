@@ -0,0 +1,144 @@
+"""
+Ranking of submissions with several runs each, with bootstrap confidence intervals.
+
+Every results*.json under results/<upi>/ is a run, and a results.json written by
+evaluate.run_agent_batched counts each of its copies as a run. The runs of every
+submission are resampled with replacement, and in each resample the submissions are
+ranked on the mean of each tier in turn, as compare_results.compare_performance does
+with a single run. The spread of those ranks gives the rank interval of a submission.
+A submission that does not outrank the next one in at least the confidence share of
+resamples is flagged as tied with it.
+
+All resamples of a batch are drawn, averaged and ranked as arrays, so there is no
+Python loop over submissions or pairs of submissions.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+
+# Tiers in the order they are compared - higher is better for each
+METRICS = ["badges", "caught_pokemon", "seen_pokemon", "levels", "xp"]
+
+
+def run_metrics(result: dict) -> list[list[float]]:
+    # One row of METRICS per run held in a results.json
+    runs = result.get("copies", [result])
+    return [[float(np.mean(run[name])) for name in METRICS] for run in runs]
+
+
+def load_runs(results_path: str) -> dict[str, np.ndarray]:
+    """
+    Reads every results/<upi>/results*.json and returns a (runs, len(METRICS))
+    array per UPI.
+    """
+    runs = {}
+    for result_directory in sorted(glob.glob(f"{results_path}/*/")):
+        rows = []
+        for path in sorted(glob.glob(f"{result_directory}results*.json")):
+            with open(path, "r", encoding="utf-8") as file:
+                rows.extend(run_metrics(json.load(file)))
+        if rows:
+            runs[os.path.basename(os.path.normpath(result_directory))] = np.array(rows)
+    return runs
+
+
+def rank_rows(values: np.ndarray) -> np.ndarray:
+    """
+    Ranks of (batch, submissions, metrics) values within each batch row, 0 for the
+    best. Metrics are compared in order and equal submissions keep their order.
+    """
+    batch, count, num_metrics = values.shape
+    replicate = np.repeat(np.arange(batch), count)
+    flat = values.reshape(batch * count, num_metrics)
+    # lexsort sorts by the last key first
+    keys = [-flat[:, m] for m in reversed(range(num_metrics))] + [replicate]
+    order = np.lexsort(keys).reshape(batch, count) - (np.arange(batch) * count)[:, None]
+
+    ranks = np.empty((batch, count), dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(count, dtype=np.int32)[None, :], axis=1)
+    return ranks
+
+
+def bootstrap_ranking(
+    runs: dict[str, np.ndarray],
+    samples: int = 1000,
+    confidence: float = 0.95,
+    seed: int | None = None,
+    batch_size: int | None = None,
+) -> list[dict]:
+    """
+    Ranks the submissions of load_runs on the mean of their runs and bootstraps
+    samples resamples of those runs. Returns one entry per submission, best first,
+    with the mean and interval of each metric, the rank interval and whether the
+    submission is tied with the next one.
+    """
+    upis = list(runs)
+    if not upis:
+        return []
+
+    count = len(upis)
+    lengths = np.array([len(runs[upi]) for upi in upis])
+    longest = int(lengths.max())
+
+    # Runs padded to the longest submission - padding is never drawn
+    padded = np.zeros((count, longest, len(METRICS)))
+    for i, upi in enumerate(upis):
+        padded[i, : lengths[i]] = runs[upi]
+
+    means = padded.sum(axis=1) / lengths[:, None]
+    point_rank = rank_rows(means[None])[0]
+    order = np.argsort(point_rank)
+
+    # Bounded so a batch holds roughly 4M drawn values
+    batch_size = batch_size or max(1, 2**22 // (count * longest * len(METRICS)))
+    rng = np.random.default_rng(seed)
+    # Submission i only keeps its first lengths[i] draws
+    used = np.arange(longest)[None, :] < lengths[:, None]
+
+    ranks = np.empty((samples, count), dtype=np.int32)
+    sample_means = np.empty((samples, count, len(METRICS)))
+    for start in range(0, samples, batch_size):
+        batch = min(batch_size, samples - start)
+        draws = (rng.random((batch, count, longest)) * lengths[:, None]).astype(int)
+        drawn = padded[np.arange(count)[None, :, None], draws]
+        drawn *= used[None, :, :, None]
+        sample_means[start : start + batch] = drawn.sum(axis=2) / lengths[:, None]
+        ranks[start : start + batch] = rank_rows(sample_means[start : start + batch])
+
+    tail = (1 - confidence) / 2 * 100
+    rank_low, rank_high = np.percentile(ranks, [tail, 100 - tail], axis=0)
+    value_low, value_high = np.percentile(sample_means, [tail, 100 - tail], axis=0)
+
+    # Share of resamples in which each submission is strictly better than the next
+    # best one on the first metric where the two differ
+    difference = sample_means[:, order[:-1]] - sample_means[:, order[1:]]
+    first = np.argmax(difference != 0, axis=2)[..., None]
+    above = np.mean(np.take_along_axis(difference, first, axis=2)[..., 0] > 0, axis=0)
+    separated = np.append(above >= confidence, True)
+
+    ranking = []
+    group = 0
+    for position, i in enumerate(order):
+        ranking.append(
+            {
+                "upi": upis[i],
+                "rank": position + 1,
+                "rank_interval": (int(rank_low[i]) + 1, int(rank_high[i]) + 1),
+                "runs": int(lengths[i]),
+                "means": dict(zip(METRICS, means[i].tolist())),
+                "intervals": {
+                    name: (float(value_low[i, m]), float(value_high[i, m]))
+                    for m, name in enumerate(METRICS)
+                },
+                "above_next": float(above[position]) if position < count - 1 else None,
+                "tied_with_next": not bool(separated[position]),
+                # Submissions that can not be told apart share a tie group
+                "tie_group": group,
+            }
+        )
+        if separated[position]:
+            group += 1
+    return ranking
@@ -0,0 +1,202 @@
+"""
+Where pull_results gets the submissions from.
+
+A SubmissionSource lists one Submission per UPI - its requirements.txt, its brock.py
+and its model files under models/ - and copies single files out. DriveSource reads
+the assignment folder on Google Drive and LocalSource a directory with the same
+layout, so the pipeline runs offline:
+
+    <root>/<upi>/requirements.txt
+    <root>/<upi>/brock.py
+    <root>/<upi>/<any folder>/<model files>
+
+fetch_submissions downloads every submission into <destination>/<upi>/ with a thread
+pool and yields each one as soon as all of its files are there. The checksum of
+every downloaded file is kept in <destination>/checksums.json and files whose
+checksum has not changed since then are not downloaded again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from pyboy_environment.evaluation_runner import write_json_atomic
+
+CHECKSUMS = "checksums.json"
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+
+class SubmissionFile(NamedTuple):
+    # Path within the submission, e.g. "brock.py" or "models/SAC_actor.pht"
+    name: str
+    # Backend specific reference passed back to download - a file id or a path
+    source: str
+    # MD5 of the content, as Google Drive reports it
+    checksum: str
+
+
+class Submission(NamedTuple):
+    upi: str
+    files: list[SubmissionFile]
+
+    @property
+    def model_name(self) -> str | None:
+        # None for a submission without model files
+        models = sorted(f.name for f in self.files if f.name.startswith("models/"))
+        return Path(models[0]).name.split("_")[0] if models else None
+
+
+def file_md5(path: str) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SubmissionSource(metaclass=ABCMeta):
+    @abstractmethod
+    def submissions(self) -> Iterator[Submission]:
+        pass
+
+    @abstractmethod
+    def download(self, file: SubmissionFile, path: str) -> None:
+        pass
+
+
+class LocalSource(SubmissionSource):
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def submissions(self) -> Iterator[Submission]:
+        for upi_path in sorted(self.root.iterdir()):
+            if not upi_path.is_dir():
+                continue
+
+            files = [
+                SubmissionFile(path.name, str(path), file_md5(path))
+                for path in sorted(upi_path.iterdir())
+                if path.is_file()
+            ]
+            folders = sorted(path for path in upi_path.iterdir() if path.is_dir())
+            if folders:
+                files += [
+                    SubmissionFile(f"models/{path.name}", str(path), file_md5(path))
+                    for path in sorted(folders[0].iterdir())
+                    if path.is_file()
+                ]
+            yield Submission(upi_path.name, files)
+
+    def download(self, file: SubmissionFile, path: str) -> None:
+        shutil.copyfile(file.source, path)
+
+
+class DriveSource(SubmissionSource):
+    def __init__(self, drive, folder_id: str) -> None:
+        self.drive = drive
+        self.folder_id = folder_id
+
+    def _list(self, folder_id: str) -> list[dict]:
+        return self.drive.ListFile(
+            {"q": f"'{folder_id}' in parents and trashed=false"}
+        ).GetList()
+
+    def submissions(self) -> Iterator[Submission]:
+        for folder in self._list(self.folder_id):
+            if folder["mimeType"] != FOLDER_MIME_TYPE:
+                continue
+
+            entries = self._list(folder["id"])
+            files = [
+                SubmissionFile(entry["title"], entry["id"], entry.get("md5Checksum"))
+                for entry in entries
+                if entry["mimeType"] != FOLDER_MIME_TYPE
+            ]
+            folders = [
+                entry for entry in entries if entry["mimeType"] == FOLDER_MIME_TYPE
+            ]
+            if folders:
+                files += [
+                    SubmissionFile(
+                        f"models/{entry['title']}",
+                        entry["id"],
+                        entry.get("md5Checksum"),
+                    )
+                    for entry in self._list(folders[0]["id"])
+                    if entry["mimeType"] != FOLDER_MIME_TYPE
+                ]
+            yield Submission(folder["title"], files)
+
+    def download(self, file: SubmissionFile, path: str) -> None:
+        # Each file object authorises its own http connection, so downloads can
+        # run on several threads
+        self.drive.CreateFile({"id": file.source}).GetContentFile(path)
+
+
+def fetch_submissions(
+    source: SubmissionSource, destination: str, max_workers: int = 8
+) -> Iterator[tuple[Submission, Path]]:
+    """
+    Downloads every submission of source into destination/<upi> and yields each
+    submission with its directory once all its files are there, in the order they
+    complete. Files with an unchanged checksum are kept from the last run.
+    """
+    destination = Path(destination)
+    destination.mkdir(parents=True, exist_ok=True)
+    checksums_path = destination / CHECKSUMS
+    checksums = {}
+    if checksums_path.exists():
+        with open(checksums_path, "r", encoding="utf-8") as file:
+            checksums = json.load(file)
+
+    def fetch(submission: Submission) -> tuple[Submission, Path, int]:
+        directory = destination / submission.upi
+        downloads = 0
+        for file in submission.files:
+            path = directory / file.name
+            key = f"{submission.upi}/{file.name}"
+            if file.checksum and checksums.get(key) == file.checksum and path.exists():
+                continue
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            source.download(file, f"{path}.part")
+            os.replace(f"{path}.part", path)
+            downloads += 1
+        return submission, directory, downloads
+
+    def fetched(future, upi: str) -> tuple[Submission, Path] | None:
+        try:
+            submission, directory, downloads = future.result()
+        except OSError as error:
+            logging.error(f"{upi}: fetching failed: {error}")
+            return None
+
+        logging.info(f"{upi}: {downloads} of {len(submission.files)} files downloaded")
+        for file in submission.files:
+            checksums[f"{upi}/{file.name}"] = file.checksum
+        write_json_atomic(str(checksums_path), checksums)
+        return submission, directory
+
+    pending = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Finished submissions are handed on while the rest are still being listed
+        for submission in source.submissions():
+            if submission.model_name is None:
+                logging.error(f"{submission.upi}: skipped - no model files")
+                continue
+
+            pending[executor.submit(fetch, submission)] = submission.upi
+            for future in [future for future in pending if future.done()]:
+                if result := fetched(future, pending.pop(future)):
+                    yield result
+
+        for future in as_completed(pending):
+            if result := fetched(future, pending[future]):
+                yield result
@@ -1,6 +1,10 @@
-from pyboy_environment.environments import PyboyEnvironment
+from functools import partial
+
+from pyboy_environment.environments import PyboyEnvironment, VecPyboyEnvironment
 from pyboy_environment.environments.mario.mario_run import MarioRun
+from pyboy_environment.environments.pokemon.macros import MacroAction
 from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.task_loader import load_task, task_source
 
 
 def make(
@@ -9,9 +13,17 @@ def make(
     act_freq: int,
     emulation_speed: int = 0,
     headless: bool = False,
+    check_init_state: bool = False,
+    discrete_actions: bool = False,
+    macros: list[MacroAction] | None = None,
+    reset_jitter: int = 0,
+    task_class: type[PyboyEnvironment] | None = None,
 ) -> PyboyEnvironment:
 
-    if domain == "mario":
+    if task_class is not None:
+        # e.g. a submission's PokemonBrock from load_task
+        env = task_class(act_freq, emulation_speed, headless)
+    elif domain == "mario":
         if task == "run":
             env = MarioRun(act_freq, emulation_speed, headless)
         else:
@@ -23,4 +35,63 @@ def make(
             raise ValueError(f"Unknown Pokemon task: {task}")
     else:
         raise ValueError(f"Unknown pyboy environment: {task}")
+
+    env.check_init_state = check_init_state
+    env.discrete_actions = discrete_actions
+    env.reset_jitter = reset_jitter
+
+    if macros:
+        if domain != "pokemon":
+            raise ValueError(f"Macro actions are not supported for {domain}")
+        env.set_macros(macros)
     return env
+
+
+def make_vec(
+    domain: str,
+    task: str,
+    num_envs: int,
+    act_freq: int,
+    emulation_speed: int = 0,
+    headless: bool = True,
+    start_method: str = "spawn",
+    shared_memory: bool = False,
+    check_init_state: bool = False,
+    discrete_actions: bool = False,
+    macros: list[MacroAction] | None = None,
+    reset_jitter: int = 0,
+    reset_on_truncated: bool = True,
+    task_class: type[PyboyEnvironment] | None = None,
+) -> VecPyboyEnvironment:
+    if num_envs < 1:
+        raise ValueError(f"num_envs must be at least 1: {num_envs}")
+
+    source = task_source(task_class)
+    if source is not None:
+        # Each worker loads the task file into its own namespace
+        env_fn = partial(_make_loaded, source)
+    else:
+        env_fn = partial(make, task_class=task_class)
+
+    env_fn = partial(
+        env_fn,
+        domain,
+        task,
+        act_freq,
+        emulation_speed,
+        headless,
+        check_init_state=check_init_state,
+        discrete_actions=discrete_actions,
+        macros=macros,
+        reset_jitter=reset_jitter,
+    )
+    return VecPyboyEnvironment(
+        [env_fn] * num_envs,
+        start_method=start_method,
+        shared_memory=shared_memory,
+        reset_on_truncated=reset_on_truncated,
+    )
+
+
+def _make_loaded(source: tuple[str, str], *args, **kwargs) -> PyboyEnvironment:
+    return make(*args, task_class=load_task(*source), **kwargs)
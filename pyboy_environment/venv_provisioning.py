@@ -0,0 +1,340 @@
+"""
+Virtual environments for evaluating submissions, shared between submissions with
+the same requirements.
+
+A submission needs the same installs as before - the cares_reinforcement_learning
+requirements and package, its own requirements.txt and then this repository. All but
+the last step are keyed by a hash of the requirements (comments and order ignored)
+and the local packages, and built once per key into a base environment under
+<venv_root>/.base/<key>. The venv of each UPI holds a .pth file that puts the
+site-packages of its base environment on the path, so identical submissions share
+one install, and a wheel of this repository built once with build_wheel.
+
+Requirement files are installed as written, from a copy in which the files and
+local paths they refer to (-r, -c, -e and ./ paths) are made absolute. Those, like
+local packages, are keyed by path only - remove <venv_root>/.base after updating
+one.
+
+Requirements are installed from a local wheelhouse with --no-index. Unless offline
+is set, missing wheels are first built or downloaded into it with pip wheel, so
+later builds - and offline builds - only need the wheelhouse:
+
+    provisioner = VenvProvisioner("~/venv", wheelhouse="~/wheelhouse", offline=True)
+    wheel = provisioner.build_wheel(repo_path, "repository")
+    provisioner.add("upi123", [("requirements", ".../requirements.txt")], wheel)
+    provisioner.provision_all()
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+import virtualenv
+
+# Installed into every base environment before any other step
+BUILD_REQUIREMENTS = ["setuptools", "wheel"]
+
+# Printed by an interpreter to find its site-packages
+SITE_PACKAGES = (
+    "import sysconfig; "
+    "print(sysconfig.get_path('purelib'), sysconfig.get_path('platlib'))"
+)
+
+
+class InstallStep(NamedTuple):
+    # "requirements" for a requirements.txt file, "package" for a local package
+    kind: str
+    path: str
+
+
+class Submission(NamedTuple):
+    upi: str
+    key: str
+    # Wheel installed into this submission's venv only
+    package_wheel: str | None
+
+
+# As pip reads them - "#" only starts a comment at the start of a line or after
+# whitespace, so URL fragments such as #egg= are kept
+COMMENT = re.compile(r"(^|\s+)#.*$")
+
+# Another requirements or constraints file, relative to the file that names it
+INCLUDE = re.compile(r"^(\s*(?:-r|--requirement|-c|--constraint)\s*=?\s*)(\S+)(.*)$")
+
+# A local path, relative to the directory pip runs in, e.g. "-e ." or "../package"
+LOCAL_PATH = re.compile(
+    r"^(\s*(?:(?:-e|--editable)\s+)?)(\.\.?(?:[/\\]\S*)?)(?=$|[\s\[])(.*)$"
+)
+
+
+def normalise_requirements(text: str) -> list[str]:
+    # Only used for the key - continuation lines are joined as pip joins them
+    text = re.sub(r"\\\r?\n", "", text)
+    lines = (COMMENT.sub("", line).strip() for line in text.splitlines())
+    return sorted(line for line in lines if line)
+
+
+def absolute_requirements(text: str, directory: str) -> str:
+    """
+    text with the files and local paths it refers to made absolute, so that a copy
+    of it installs the same anywhere.
+    """
+    lines = []
+    for line in text.splitlines():
+        include = INCLUDE.match(line)
+        local = LOCAL_PATH.match(line)
+        if include and "://" not in include.group(2):
+            start, path, end = include.groups()
+        elif local:
+            start, path, end = local.groups()
+        else:
+            lines.append(line)
+            continue
+        path = os.path.normpath(os.path.join(directory, path))
+        lines.append(f"{start}{path}{end}")
+    return "\n".join(lines) + "\n"
+
+
+def run_logged(command: list[str], log) -> None:
+    log.write(f"$ {' '.join(command)}\n")
+    log.flush()
+    subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, check=True)
+
+
+class VenvProvisioner:
+    def __init__(
+        self,
+        venv_root: str,
+        wheelhouse: str = None,
+        offline: bool = False,
+        max_workers: int = None,
+    ) -> None:
+        self.venv_root = Path(venv_root).expanduser().resolve()
+        self.wheelhouse = Path(
+            wheelhouse or self.venv_root / ".wheelhouse"
+        ).expanduser()
+        self.offline = offline
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self.wheelhouse.mkdir(parents=True, exist_ok=True)
+        for name in [".base", ".requirements", ".packages"]:
+            (self.venv_root / name).mkdir(parents=True, exist_ok=True)
+
+        # Snapshotted install steps of each key, and the submissions to provision
+        self.steps = {}
+        self.submissions = []
+        # Base environments are built in parallel but fill the wheelhouse in turn
+        self._wheelhouse_lock = threading.Lock()
+        # One lock per key, so a base environment is only built once at a time
+        self._base_locks = {}
+        self._base_locks_lock = threading.Lock()
+
+    def python_bin(self, upi: str) -> str:
+        return str(self.venv_root / upi / "bin" / "python3")
+
+    def base_path(self, key: str) -> Path:
+        return self.venv_root / ".base" / key
+
+    def _snapshot(self, steps: list[InstallStep]) -> tuple[str, list[InstallStep]]:
+        # Requirement files are copied by content as the caller may overwrite them
+        digest = hashlib.sha256(f"{sys.version_info[:2]}".encode())
+        snapshot = []
+        for step in steps:
+            if step.kind == "requirements":
+                with open(step.path, "r", encoding="utf-8") as file:
+                    text = absolute_requirements(
+                        file.read(), os.path.dirname(os.path.abspath(step.path))
+                    )
+                content = hashlib.sha256(text.encode()).hexdigest()
+                path = self.venv_root / ".requirements" / f"{content}.txt"
+                if not path.exists():
+                    path.write_text(text, encoding="utf-8")
+                lines = "\n".join(normalise_requirements(text))
+                key = hashlib.sha256(lines.encode()).hexdigest()
+                digest.update(f"requirements:{key}\n".encode())
+                snapshot.append(InstallStep("requirements", str(path)))
+            elif step.kind == "package":
+                path = os.path.abspath(step.path)
+                digest.update(f"package:{path}\n".encode())
+                snapshot.append(InstallStep("package", path))
+            else:
+                raise ValueError(f"Unknown install step: {step.kind}")
+        return digest.hexdigest()[:16], snapshot
+
+    def build_wheel(self, package_path: str, name: str) -> str:
+        """
+        Builds package_path into a wheel under <venv_root>/.packages/<name> and
+        returns its path, to be passed to add for any number of UPIs. The package
+        may change once this returns.
+        """
+        wheel_directory = self.venv_root / ".packages" / name
+        shutil.rmtree(wheel_directory, ignore_errors=True)
+        # The build backend comes from the wheelhouse as well when offline
+        index = ["--no-index"] if self.offline else []
+        subprocess.run(
+            self._pip(sys.executable, "wheel", "--no-deps", *index)
+            + ["--find-links", str(self.wheelhouse)]
+            + ["--wheel-dir", str(wheel_directory), package_path],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        (wheel,) = wheel_directory.glob("*.whl")
+        return str(wheel)
+
+    def add(self, upi: str, steps: list[InstallStep], package_wheel: str = None) -> str:
+        """
+        Queues upi for provision_all and returns its key. steps are snapshotted, so
+        their files may change once this returns. package_wheel, from build_wheel, is
+        installed into the venv of upi only.
+        """
+        key, snapshot = self._snapshot(steps)
+        self.steps[key] = snapshot
+        self.submissions.append(Submission(upi, key, package_wheel))
+        return key
+
+    def _pip(self, python_bin: str, *args: str) -> list[str]:
+        return [python_bin, "-m", "pip", *args]
+
+    def build_base(self, key: str) -> Path:
+        """
+        Builds the base environment of key unless a complete one already exists.
+        """
+        with self._base_locks_lock:
+            lock = self._base_locks.setdefault(key, threading.Lock())
+        with lock:
+            return self._build_base(key)
+
+    def _build_base(self, key: str) -> Path:
+        base = self.base_path(key)
+        complete = base / ".complete"
+        if complete.exists():
+            return base
+
+        shutil.rmtree(base, ignore_errors=True)
+        virtualenv.cli_run([str(base)])
+        python_bin = str(base / "bin" / "python3")
+        find_links = ["--find-links", str(self.wheelhouse)]
+
+        with open(f"{base}.log", "w", encoding="utf-8") as log:
+            requirements = [
+                arg
+                for step in self.steps[key]
+                if step.kind == "requirements"
+                for arg in ["-r", step.path]
+            ]
+            if not self.offline:
+                with self._wheelhouse_lock:
+                    run_logged(
+                        self._pip(python_bin, "wheel", "--wheel-dir")
+                        + [str(self.wheelhouse), *find_links]
+                        + BUILD_REQUIREMENTS
+                        + requirements,
+                        log,
+                    )
+
+            install = self._pip(python_bin, "install", "--no-index", *find_links)
+            run_logged(install + BUILD_REQUIREMENTS, log)
+            for step in self.steps[key]:
+                if step.kind == "requirements":
+                    run_logged(install + ["-r", step.path], log)
+                else:
+                    run_logged(install + ["--no-build-isolation", step.path], log)
+
+        complete.touch()
+        return base
+
+    def site_packages(self, python_bin: str) -> list[str]:
+        output = subprocess.run(
+            [python_bin, "-c", SITE_PACKAGES],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        return list(dict.fromkeys(output.split()))
+
+    def provision(self, submission: Submission) -> str:
+        base = self.base_path(submission.key)
+
+        venv = self.venv_root / submission.upi
+        virtualenv.cli_run([str(venv), "--clear"])
+        python_bin = self.python_bin(submission.upi)
+
+        # addsitedir also processes the .pth files of the base environment
+        lines = [
+            f"import site; site.addsitedir({path!r})"
+            for path in self.site_packages(str(base / "bin" / "python3"))
+        ]
+        for path in self.site_packages(python_bin):
+            Path(path, "_base_environment.pth").write_text("\n".join(lines) + "\n")
+
+        if submission.package_wheel:
+            subprocess.run(
+                self._pip(python_bin, "install", "--no-deps", "--no-index")
+                + ["--force-reinstall", submission.package_wheel],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+        return python_bin
+
+    def _provision_key(self, key: str, submissions: list[Submission]) -> dict:
+        try:
+            self.build_base(key)
+        except (subprocess.CalledProcessError, OSError) as error:
+            logging.error(
+                f"Base environment {key} failed - see {self.base_path(key)}.log: {error}"
+            )
+            return {submission.upi: None for submission in submissions}
+
+        python_bins = {}
+        for submission in submissions:
+            try:
+                python_bins[submission.upi] = self.provision(submission)
+                logging.info(f"{submission.upi}: venv ready ({key})")
+            except (subprocess.CalledProcessError, OSError) as error:
+                python_bins[submission.upi] = None
+                logging.error(f"{submission.upi}: provisioning failed: {error}")
+        return python_bins
+
+    def provision_upi(self, upi: str) -> str | None:
+        """
+        Provisions the queued upi straight away and returns its interpreter, or None
+        if provisioning failed. Safe to call from several threads - UPIs that share
+        a base environment wait while the first one builds it.
+        """
+        submission = next(s for s in self.submissions if s.upi == upi)
+        self.submissions.remove(submission)
+        return self._provision_key(submission.key, [submission])[upi]
+
+    def provision_all(self) -> dict[str, str | None]:
+        """
+        Builds each distinct base environment, and then the venvs of the UPIs that
+        share it, with at most max_workers base environments at once. Returns the
+        interpreter of each UPI, or None where provisioning failed.
+        """
+        by_key = {}
+        for submission in self.submissions:
+            by_key.setdefault(submission.key, []).append(submission)
+        logging.info(
+            f"Provisioning {len(self.submissions)} venvs "
+            f"from {len(by_key)} requirement sets"
+        )
+
+        python_bins = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self._provision_key, key, submissions)
+                for key, submissions in by_key.items()
+            ]
+            for future in as_completed(futures):
+                python_bins.update(future.result())
+
+        self.submissions = []
+        return python_bins
@@ -0,0 +1,93 @@
+"""
+A stand-in for PyBoy so environments can be built and stepped without a ROM.
+
+Every emulated frame moves the player one tile right, and rendering a frame
+writes its frame number into the screen. Savestates are the 64 KB of memory.
+"""
+
+import io
+
+import numpy as np
+
+PLAYER_X = 0xD362
+
+
+class FakeScreen:
+    def __init__(self) -> None:
+        self.ndarray = np.zeros((144, 160, 4), dtype=np.uint8)
+
+
+class FakeMemory:
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = data
+
+    def __getitem__(self, addr):
+        if isinstance(addr, slice):
+            return self.data[addr].tolist()
+        return int(self.data[addr])
+
+    def __setitem__(self, addr, value) -> None:
+        self.data[addr] = value
+
+
+class FakePyBoy:
+    def __init__(self, player_x: int = 5) -> None:
+        self.data = np.zeros(0x10000, dtype=np.uint8)
+        self.data[PLAYER_X] = player_x
+        self.memory = FakeMemory(self.data)
+        self.screen = FakeScreen()
+        self.frame_count = 0
+        self.inputs = []
+
+    def tick(self, count: int = 1, render: bool = True) -> bool:
+        for _ in range(count):
+            self.frame_count += 1
+            self.data[PLAYER_X] = (int(self.data[PLAYER_X]) + 1) % 0x100
+        if render:
+            self.screen.ndarray[:] = self.frame_count % 256
+        return True
+
+    def send_input(self, event) -> None:
+        self.inputs.append(event)
+
+    def set_emulation_speed(self, speed: int) -> None:
+        pass
+
+    def save_state(self, file) -> None:
+        file.write(self.data.tobytes())
+
+    def load_state(self, file) -> None:
+        self.data[:] = np.frombuffer(file.read(), dtype=np.uint8)
+
+    def game_area(self) -> np.ndarray:
+        return np.zeros((18, 20), dtype=np.uint32)
+
+    def stop(self, save: bool = True) -> None:
+        pass
+
+
+def fake_task(task_class: type, player_x: int = 5) -> type:
+    """
+    task_class running on a FakePyBoy, which reset returns to its first state by
+    calling pyboy.load_state directly, as the task template does.
+    """
+
+    class FakeTask(task_class):
+        def _create_pyboy(self, headless: bool) -> FakePyBoy:
+            pyboy = FakePyBoy(player_x)
+            self.init_state = io.BytesIO()
+            pyboy.save_state(self.init_state)
+            return pyboy
+
+        def _load_init_state(self) -> None:
+            self.init_state.seek(0)
+            self.pyboy.load_state(self.init_state)
+
+    return FakeTask
+
+
+def make_env(task_class: type, discrete_actions: bool = False, player_x: int = 5):
+    # Picklable env_fn for VecPyboyEnvironment, e.g. partial(make_env, PokemonBrock)
+    env = fake_task(task_class, player_x)(24, headless=True)
+    env.discrete_actions = discrete_actions
+    return env
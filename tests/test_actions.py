@@ -0,0 +1,45 @@
+import numpy as np
+
+from pyboy_environment.environments.actions import ButtonBins, ButtonToggles
+
+
+def digitize(action: float, num_buttons: int) -> int:
+    # Mapping used before ButtonBins
+    bins = np.linspace(0, 1, num_buttons + 1)
+    button = np.digitize(min(action, 0.99), bins) - 1
+    return min(max(int(button), 0), num_buttons - 1)
+
+
+def test_button_bins_match_digitize():
+    bins = ButtonBins(6)
+    for action in np.linspace(-0.5, 1.5, 401):
+        assert bins(float(action)) == digitize(float(action), 6), action
+
+
+def test_button_bins_edges():
+    bins = ButtonBins(4)
+    assert bins(0.0) == 0
+    assert bins(0.25) == 1
+    assert bins(1.0) == 3
+    assert bins(-1.0) == 0
+    assert bins(2.0) == 3
+
+
+def test_button_bins_batch_matches_single():
+    bins = ButtonBins(5)
+    actions = np.random.default_rng(0).uniform(-0.2, 1.2, 100)
+
+    expected = [bins(float(action)) for action in actions]
+    assert bins.batch(actions).tolist() == expected
+    assert bins.batch(actions[:, None]).tolist() == expected
+
+
+def test_button_toggles():
+    toggles = ButtonToggles(3)
+    assert toggles([0.5, 0.49, 1.0]) == [True, False, True]
+
+
+def test_button_toggles_batch():
+    toggles = ButtonToggles(2, threshold=0.3)
+    actions = np.array([[0.1, 0.3], [0.9, 0.0]])
+    assert toggles.batch(actions).tolist() == [[False, True], [True, False]]
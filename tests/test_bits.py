@@ -0,0 +1,33 @@
+import numpy as np
+
+from pyboy_environment.environments.bits import POPCOUNT, popcount, unpack_flags
+
+
+def test_popcount_table():
+    assert POPCOUNT.tolist() == [bin(i).count("1") for i in range(256)]
+
+
+def test_popcount_sums_all_bytes():
+    values = np.array([0x00, 0x01, 0xFF, 0x0F], dtype=np.uint8)
+    assert popcount(values) == 13
+
+
+def test_popcount_along_axis():
+    values = np.array([[0xFF, 0x01], [0x00, 0x03]], dtype=np.uint8)
+    assert popcount(values, axis=1).tolist() == [9, 2]
+
+
+def test_popcount_does_not_overflow():
+    values = np.full(100, 0xFF, dtype=np.uint8)
+    assert popcount(values) == 800
+
+
+def test_unpack_flags_is_little_endian():
+    flags = unpack_flags(np.array([0b00000001, 0b10000000], dtype=np.uint8))
+    assert flags.dtype == bool
+    assert np.flatnonzero(flags).tolist() == [0, 15]
+
+
+def test_unpack_flags_matches_popcount():
+    values = np.random.default_rng(0).integers(0, 256, 64, dtype=np.uint8)
+    assert np.count_nonzero(unpack_flags(values)) == popcount(values)
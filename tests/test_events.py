@@ -0,0 +1,99 @@
+import logging
+
+import pytest
+
+from pyboy_environment.environments import events
+from pyboy_environment.environments.events import EpisodeEvents
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(events.time, "monotonic", clock)
+    return clock
+
+
+def test_counts_per_event():
+    episode = EpisodeEvents()
+    episode.emit("battle_started", 1)
+    episode.emit("move_selected", 2)
+    episode.emit("move_selected", 3)
+    assert episode.summary()["counts"] == {"battle_started": 1, "move_selected": 2}
+
+
+def test_no_samples_by_default():
+    episode = EpisodeEvents()
+    episode.emit("battle_started", 1, enemy_hp=20)
+    assert episode.summary()["samples"] == []
+
+
+def test_sample_limit_per_event():
+    episode = EpisodeEvents(sample_limit=2)
+    for step in range(4):
+        episode.emit("move_selected", step, move=step)
+    episode.emit("battle_started", 9)
+
+    assert episode.summary()["samples"] == [
+        {"event": "move_selected", "step": 0, "move": 0},
+        {"event": "move_selected", "step": 1, "move": 1},
+        {"event": "battle_started", "step": 9},
+    ]
+
+
+def test_end_episode_keeps_last_summary():
+    episode = EpisodeEvents(sample_limit=1)
+    episode.emit("battle_started", 5)
+    episode.end_episode()
+
+    assert episode.summary() == {"counts": {}, "samples": []}
+    assert episode.last_episode == {
+        "counts": {"battle_started": 1},
+        "samples": [{"event": "battle_started", "step": 5}],
+    }
+
+    # Sample limits start again with the next episode
+    episode.emit("battle_started", 1)
+    assert len(episode.summary()["samples"]) == 1
+
+
+def test_summary_is_a_copy():
+    episode = EpisodeEvents(sample_limit=5)
+    summary = episode.summary()
+    episode.emit("battle_started", 1)
+    assert summary == {"counts": {}, "samples": []}
+
+
+def test_logging_is_rate_limited_per_event(caplog, clock):
+    caplog.set_level(logging.DEBUG, logger=events.__name__)
+    episode = EpisodeEvents(log_interval=10.0)
+
+    episode.emit("move_selected", 1)
+    episode.emit("move_selected", 2)
+    episode.emit("battle_started", 3)
+    clock.now += 9.9
+    episode.emit("move_selected", 4)
+    clock.now += 0.1
+    episode.emit("move_selected", 5)
+
+    assert [record.getMessage().split(" (")[0] for record in caplog.records] == [
+        "move_selected at step 1",
+        "battle_started at step 3",
+        "move_selected at step 5",
+    ]
+    assert "(4 this episode)" in caplog.records[-1].getMessage()
+
+
+def test_nothing_is_logged_above_debug(caplog, clock):
+    caplog.set_level(logging.INFO, logger=events.__name__)
+    episode = EpisodeEvents()
+    episode.emit("battle_started", 1)
+    assert caplog.records == []
+    assert episode.summary()["counts"] == {"battle_started": 1}
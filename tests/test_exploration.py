@@ -0,0 +1,130 @@
+import copy
+import pickle
+
+import numpy as np
+
+from pyboy_environment.environments.pokemon.exploration import (
+    MAP_SIZE,
+    ExplorationMemory,
+)
+
+
+def test_visit_returns_previous_count():
+    explored = ExplorationMemory()
+    assert explored.visit(3, 5, 6) == 0
+    assert explored.visit(3, 5, 6) == 1
+    assert explored.count(3, 5, 6) == 2
+    assert explored.count(3, 6, 5) == 0
+
+
+def test_counts_saturate():
+    explored = ExplorationMemory()
+    for _ in range(300):
+        explored.visit(1, 0, 0)
+    assert explored.count(1, 0, 0) == 0xFF
+
+
+def test_planes_are_allocated_on_first_visit():
+    explored = ExplorationMemory()
+    assert explored.count(7, 1, 1) == 0
+    assert explored.planes == {}
+
+    explored.visit(7, 1, 1)
+    assert list(explored.planes) == [7]
+    assert explored.planes[7].shape == (MAP_SIZE, MAP_SIZE)
+
+
+def test_visit_map_is_new_once():
+    explored = ExplorationMemory()
+    assert explored.visit_map(12)
+    assert not explored.visit_map(12)
+    assert explored.visit_map(13)
+
+
+def test_tiles_visited_across_maps():
+    explored = ExplorationMemory()
+    explored.visit(1, 0, 0)
+    explored.visit(1, 0, 0)
+    explored.visit(1, 2, 0)
+    explored.visit(2, 0, 0)
+    assert explored.tiles_visited() == 3
+
+
+def test_reset():
+    explored = ExplorationMemory()
+    explored.visit(1, 0, 0)
+    explored.visit_map(1)
+
+    explored.reset()
+    assert explored.tiles_visited() == 0
+    assert explored.planes == {}
+    assert explored.visit_map(1)
+
+
+def test_window_takes_highest_count_per_cell():
+    explored = ExplorationMemory()
+    # With scale 2 the cell around (10, 10) covers x and y from 9 to 10
+    explored.visit(1, 9, 9)
+    for _ in range(3):
+        explored.visit(1, 10, 9)
+    explored.visit(1, 12, 10)
+
+    window = explored.window(1, 10, 10, radius=1, scale=2)
+    assert window.shape == (3, 3)
+    assert window.tolist() == [[0, 0, 0], [0, 3, 1], [0, 0, 0]]
+
+
+def test_window_scale_one_matches_counts():
+    explored = ExplorationMemory()
+    rng = np.random.default_rng(0)
+    for x, y in rng.integers(20, 30, (50, 2)):
+        explored.visit(4, int(x), int(y))
+
+    window = explored.window(4, 25, 24, radius=4, scale=1)
+    assert np.array_equal(window, explored.planes[4][20:29, 21:30])
+
+
+def test_window_clips_at_plane_edges():
+    explored = ExplorationMemory()
+    explored.visit(1, 0, 0)
+    explored.visit(1, MAP_SIZE - 1, MAP_SIZE - 1)
+
+    top_left = explored.window(1, 0, 0, radius=2, scale=1)
+    assert top_left[2, 2] == 1
+    assert top_left[:2].sum() == top_left[:, :2].sum() == 0
+
+    bottom_right = explored.window(1, MAP_SIZE - 1, MAP_SIZE - 1, radius=2, scale=1)
+    assert bottom_right[2, 2] == 1
+    assert bottom_right[3:].sum() == bottom_right[:, 3:].sum() == 0
+
+
+def test_window_of_unvisited_map():
+    window = ExplorationMemory().window(9, 10, 10, radius=3, scale=2)
+    assert window.shape == (7, 7)
+    assert not window.any()
+    assert window.dtype == np.uint8
+
+
+def test_deepcopy_is_independent():
+    explored = ExplorationMemory()
+    explored.visit(1, 0, 0)
+    explored.visit_map(1)
+
+    copied = copy.deepcopy(explored)
+    copied.visit(1, 0, 0)
+    copied.visit(2, 0, 0)
+    copied.visit_map(2)
+
+    assert explored.count(1, 0, 0) == 1
+    assert list(explored.planes) == [1]
+    assert explored.visit_map(2)
+
+
+def test_pickle_round_trip():
+    explored = ExplorationMemory()
+    explored.visit(1, 3, 4)
+    explored.visit_map(1)
+
+    loaded = pickle.loads(pickle.dumps(explored))
+    assert loaded.count(1, 3, 4) == 1
+    assert not loaded.visit_map(1)
@@ -0,0 +1,54 @@
+import io
+
+import pytest
+
+from fake_pyboy import PLAYER_X, fake_task
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+
+
+@pytest.fixture
+def env():
+    return fake_task(PokemonBrock)(24, headless=True)
+
+
+def test_stats_follow_ticks(env):
+    assert env._game_stats()["location"]["x"] == 5
+    env.step([0.0])
+    assert env._game_stats()["location"]["x"] == 5 + 24
+
+
+def test_direct_load_state_invalidates_cache(env):
+    env.step([0.0])
+    assert env._game_stats()["location"]["x"] == 29
+
+    # What the task template does in reset - frame_count is not part of a savestate
+    frame_count = env.pyboy.frame_count
+    env.init_state.seek(0)
+    env.pyboy.load_state(env.init_state)
+
+    assert env.pyboy.frame_count == frame_count
+    assert env._game_stats()["location"]["x"] == 5
+    assert env._read_ram()[PLAYER_X - 0xCC00] == 5
+
+
+def test_reset_reads_state_after_load(env):
+    env.step([0.0])
+    state = env.reset()
+
+    assert state[0] == 5
+    assert env.prior_game_stats["location"]["x"] == 5
+
+
+def test_restore_invalidates_cache(env):
+    handle = env.snapshot()
+    env.step([0.0])
+    assert env._game_stats()["location"]["x"] == 29
+
+    env.restore(handle)
+    assert env._game_stats()["location"]["x"] == 5
+
+
+def test_load_state_loads_once(env):
+    loads = env._load_count
+    env._load_state(io.BytesIO(env.pyboy.data.tobytes()))
+    assert env._load_count == loads + 1
@@ -0,0 +1,105 @@
+import json
+import os
+from functools import cmp_to_key
+
+import numpy as np
+
+from pyboy_environment.compare_results import compare_performance
+from pyboy_environment.leaderboard import DATABASE_NAME, Leaderboard, sort_key
+
+
+def result(badges=0, actions=0, caught=0, seen=0, levels=(5,), xp=(100,)) -> dict:
+    return {
+        "badges": badges,
+        "actions": actions,
+        "caught_pokemon": caught,
+        "seen_pokemon": seen,
+        "levels": list(levels),
+        "xp": list(xp),
+    }
+
+
+def write_result(results_path, upi: str, values: dict) -> None:
+    directory = results_path / upi
+    directory.mkdir(exist_ok=True)
+    with open(directory / "results.json", "w", encoding="utf-8") as file:
+        json.dump(values, file)
+
+
+RESULTS = {
+    "a": result(caught=2, seen=3),
+    "b": result(badges=1, actions=5000),
+    "c": result(badges=1, actions=9000),
+    "d": result(caught=2, seen=3, levels=[6, 8]),
+    "e": result(),
+    "f": result(caught=2, seen=1, xp=[500]),
+}
+
+
+def test_sort_key_matches_compare_performance():
+    upis = list(RESULTS)
+    by_key = sorted(upis, key=lambda upi: sort_key(RESULTS[upi]))
+    by_compare = sorted(
+        upis,
+        key=cmp_to_key(lambda a, b: compare_performance(RESULTS[a], RESULTS[b])),
+    )
+    assert by_key == by_compare
+
+
+def test_ranking_matches_compare_performance(tmp_path):
+    for upi, values in RESULTS.items():
+        write_result(tmp_path, upi, values)
+
+    with Leaderboard(str(tmp_path)) as leaderboard:
+        assert leaderboard.update() == len(RESULTS)
+        ranking = [entry["upi"] for entry in leaderboard.ranking()]
+
+    assert ranking == sorted(RESULTS, key=lambda upi: sort_key(RESULTS[upi]))
+    assert os.path.exists(tmp_path / DATABASE_NAME)
+
+
+def test_ties_are_broken_by_upi(tmp_path):
+    for upi in ["z", "m", "a"]:
+        write_result(tmp_path, upi, result())
+
+    with Leaderboard(str(tmp_path)) as leaderboard:
+        leaderboard.update()
+        assert [entry["upi"] for entry in leaderboard.ranking()] == ["a", "m", "z"]
+
+
+def test_update_only_reads_changed_results(tmp_path):
+    write_result(tmp_path, "a", result(caught=1))
+    write_result(tmp_path, "b", result(caught=2))
+
+    with Leaderboard(str(tmp_path)) as leaderboard:
+        leaderboard.update()
+        assert leaderboard.update() == 0
+
+        write_result(tmp_path, "a", result(caught=3, seen=10))
+        assert leaderboard.update() == 1
+        assert [entry["upi"] for entry in leaderboard.ranking()] == ["a", "b"]
+
+
+def test_update_removes_deleted_results(tmp_path):
+    write_result(tmp_path, "a", result())
+    write_result(tmp_path, "b", result())
+
+    with Leaderboard(str(tmp_path)) as leaderboard:
+        leaderboard.update()
+        os.remove(tmp_path / "b" / "results.json")
+        assert leaderboard.update() == 1
+        assert [entry["upi"] for entry in leaderboard.ranking()] == ["a"]
+
+
+def test_index_persists_between_runs(tmp_path):
+    write_result(tmp_path, "a", result(levels=[3, 4]))
+
+    with Leaderboard(str(tmp_path)) as leaderboard:
+        leaderboard.update()
+
+    with Leaderboard(str(tmp_path)) as leaderboard:
+        assert leaderboard.update() == 0
+        (entry,) = leaderboard.ranking()
+
+    assert entry["upi"] == "a"
+    assert np.mean(entry["levels"]) == 3.5
@@ -0,0 +1,108 @@
+import numpy as np
+
+from pyboy_environment.environments.pokemon import pokemon_ram
+from pyboy_environment.environments.pokemon.ram_schema import (
+    PARTY_MON_STRIDE,
+    WRAM_END,
+    WRAM_START,
+)
+
+
+def make_ram(values: dict[int, int]) -> np.ndarray:
+    ram = np.zeros(WRAM_END - WRAM_START, dtype=np.uint8)
+    for address, value in values.items():
+        ram[address - WRAM_START] = value
+    return ram
+
+
+class FakeMemory:
+    def __init__(self, ram: np.ndarray) -> None:
+        self.ram = ram
+
+    def __getitem__(self, addr: slice) -> list[int]:
+        return self.ram[addr.start - WRAM_START : addr.stop - WRAM_START].tolist()
+
+
+class FakePyBoy:
+    def __init__(self, ram: np.ndarray) -> None:
+        self.memory = FakeMemory(ram)
+
+
+def test_read_ram_copies_wram():
+    ram = make_ram({WRAM_START: 1, WRAM_END - 1: 2})
+    assert np.array_equal(pokemon_ram.read_ram(FakePyBoy(ram)), ram)
+
+
+def test_location():
+    ram = make_ram({0xD362: 5, 0xD361: 7, 0xD35E: 12})
+    assert pokemon_ram.location(ram) == (5, 7, 12)
+
+
+def test_party():
+    # Slot 1 is the second party mon, one stride after the first
+    second = PARTY_MON_STRIDE
+    ram = make_ram(
+        {
+            0xD163: 2,
+            0xD164: 0xB1,
+            0xD165: 0x99,
+            0xD16C: 0x01,
+            0xD16D: 0x2C,
+            0xD18D + second: 0x00,
+            0xD18E + second: 0x30,
+            0xD18C: 9,
+            0xD18C + second: 6,
+            0xD170: 0x16,
+            0xD171 + second: 0x03,
+            0xD179 + second: 0x01,
+            0xD17B + second: 0x02,
+        }
+    )
+
+    assert pokemon_ram.party_size(ram) == 2
+    assert pokemon_ram.party_ids(ram)[:2] == [0xB1, 0x99]
+    assert pokemon_ram.party_hp(ram)["current"][0] == 300
+    assert pokemon_ram.party_hp(ram)["max"][1] == 0x30
+    assert pokemon_ram.party_levels(ram) == [9, 6, 0, 0, 0, 0]
+    assert pokemon_ram.party_types(ram)[:4] == [0x16, 0, 0, 0x03]
+    assert pokemon_ram.party_xp(ram)[1] == 0x010002
+
+
+def test_progress():
+    ram = make_ram(
+        {
+            0xD356: 0b00000101,
+            0xD347: 0x01,
+            0xD348: 0x23,
+            0xD349: 0x45,
+            0xD2F7: 0xFF,
+            0xD309: 0x01,
+            0xD30A: 0x03,
+        }
+    )
+
+    assert pokemon_ram.badge_count(ram) == 2
+    assert pokemon_ram.money(ram) == 12345
+    assert pokemon_ram.caught_count(ram) == 9
+    assert pokemon_ram.seen_count(ram) == 2
+
+
+def test_event_flags():
+    ram = make_ram({0xD747: 0b10000001, 0xD748: 0b00000010})
+
+    flags = pokemon_ram.event_flags(ram)
+    assert flags.dtype == bool
+    assert len(flags) == 0x13F * 8
+    assert np.flatnonzero(flags).tolist() == [0, 7, 9]
+    assert pokemon_ram.event_counts(ram)[:3] == [2, 1, 0]
+
+
+def test_game_stats_fields_match_helpers():
+    ram = make_ram({0xD163: 1, 0xD356: 0b11, 0xD18C: 5, 0xD362: 3})
+
+    fields = pokemon_ram.game_stats_fields(ram)
+    assert fields["party_count"] == [1]
+    assert fields["badges"] == [pokemon_ram.badge_count(ram)]
+    assert fields["party_level"] == pokemon_ram.party_levels(ram)
+    assert fields["player_x"] == [3]
+    assert all(isinstance(value, int) for value in fields["party_level"])
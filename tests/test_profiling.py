@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+from fake_pyboy import fake_task
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.profiling import (
+    STEP_PHASES,
+    Histogram,
+    StepProfiler,
+    reward_components,
+)
+
+
+@pytest.fixture
+def env():
+    return fake_task(PokemonBrock)(24, headless=True)
+
+
+def test_empty_histogram():
+    histogram = Histogram()
+    assert histogram.percentile(50) == 0.0
+    assert histogram.summary()["count"] == 0
+
+
+@pytest.mark.parametrize("ns", [1, 7, 1000, 123_456, 10**9])
+def test_percentile_is_within_one_bucket(ns):
+    histogram = Histogram()
+    histogram.add(ns * 2)
+    for _ in range(99):
+        histogram.add(ns)
+
+    # A bucket spans 2 ** (1 / SUB_BUCKETS) - the upper bound is reported
+    assert ns <= histogram.percentile(50) <= ns * 2 ** (1 / Histogram.SUB_BUCKETS)
+    assert histogram.percentile(100) == ns * 2
+
+
+def test_percentiles_follow_distribution():
+    histogram = Histogram()
+    for ns in range(1, 1001):
+        histogram.add(ns * 1000)
+
+    for q in (50, 90, 99):
+        true_value = q * 10 * 1000
+        assert true_value <= histogram.percentile(q) <= true_value * 1.1
+
+
+def test_histogram_summary():
+    histogram = Histogram()
+    for ns in (0, 2000, 4000):
+        histogram.add(ns)
+
+    summary = histogram.summary()
+    assert summary["count"] == 3
+    assert summary["total_ms"] == 0.006
+    assert summary["mean_us"] == 2.0
+    assert (summary["min_us"], summary["max_us"]) == (0.0, 4.0)
+    assert sum(summary["buckets_ns"].values()) == 3
+
+
+def test_profiler_wraps_instance_only(env):
+    env.enable_profiling()
+    names = STEP_PHASES + reward_components(env)
+
+    assert "_movement_reward" in names
+    assert all(name in vars(env) for name in names)
+    assert "step" not in vars(fake_task(PokemonBrock)(24, headless=True))
+
+
+def test_profiler_times_each_phase(env):
+    profiler = env.enable_profiling()
+    env.step([0.0])
+    env.step([0.0])
+    env.reset()
+
+    summary = profiler.summary()
+    assert summary["step"]["count"] == 2
+    assert summary["reset"]["count"] == 1
+    assert summary["_calculate_reward"]["count"] >= 2
+    assert summary["_movement_reward"]["count"] >= 2
+    assert summary["step"]["total_ms"] >= summary["_run_action_on_emulator"]["total_ms"]
+
+
+def test_disable_profiling_restores_methods(env):
+    profiler = env.enable_profiling()
+    assert env.disable_profiling() is profiler
+    assert env.profiler is None
+    assert not any(name in vars(env) for name in STEP_PHASES)
+
+    env.step([0.0])
+    assert profiler.summary() == {}
+
+
+def test_enable_profiling_twice_does_not_nest(env):
+    env.enable_profiling()
+    profiler = env.enable_profiling()
+    env.step([0.0])
+    assert profiler.summary()["step"]["count"] == 1
+
+    env.disable_profiling()
+    assert "step" not in vars(env)
+
+
+def test_attach_skips_missing_methods():
+    class Target:
+        def run(self):
+            return 1
+
+    target = Target()
+    profiler = StepProfiler()
+    profiler.attach(target, ["run", "missing"])
+
+    assert target.run() == 1
+    assert list(profiler.summary()) == ["run"]
+
+
+def test_wrapper_times_raising_calls():
+    class Target:
+        def run(self):
+            raise ValueError
+
+    target = Target()
+    profiler = StepProfiler(trace_events=4)
+    profiler.attach(target, ["run"])
+
+    with pytest.raises(ValueError):
+        target.run()
+    assert profiler.summary()["run"]["count"] == 1
+    assert len(profiler.events) == 1
+
+
+def test_reset_clears_counts(env):
+    profiler = env.enable_profiling(trace_events=8)
+    env.step([0.0])
+    profiler.reset()
+
+    assert profiler.summary() == {}
+    assert not profiler.events
+    env.step([0.0])
+    assert profiler.summary()["step"]["count"] == 1
+
+
+def test_no_events_without_trace(env):
+    profiler = env.enable_profiling()
+    env.step([0.0])
+    assert profiler.events is None
+    assert profiler.chrome_trace()["traceEvents"] == []
+
+
+def test_chrome_trace(env, tmp_path):
+    profiler = env.enable_profiling(trace_events=3)
+    for _ in range(3):
+        env.step([0.0])
+
+    path = tmp_path / "trace.json"
+    profiler.dump_chrome_trace(str(path))
+    with open(path, "r", encoding="utf-8") as file:
+        trace = json.load(file)
+
+    # Only the most recent calls are kept, the last step finishing last
+    events = trace["traceEvents"]
+    assert len(events) == 3
+    assert events[-1]["name"] == "step"
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    step = events[-1]
+    for event in events[:-1]:
+        assert step["ts"] <= event["ts"] <= step["ts"] + step["dur"]
+
+
+def test_dump_json(env, tmp_path):
+    profiler = env.enable_profiling()
+    env.step([0.0])
+
+    path = tmp_path / "profile.json"
+    profiler.dump_json(str(path))
+    with open(path, "r", encoding="utf-8") as file:
+        assert json.load(file)["step"]["count"] == 1
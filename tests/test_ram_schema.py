@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from pyboy_environment.environments.pokemon.ram_schema import (
+    FIELDS,
+    WRAM_END,
+    WRAM_START,
+    RamField,
+    RamReader,
+)
+
+
+def make_ram(values: dict[int, int]) -> np.ndarray:
+    ram = np.zeros(WRAM_END - WRAM_START, dtype=np.uint8)
+    for address, value in values.items():
+        ram[address - WRAM_START] = value
+    return ram
+
+
+def test_fields_are_named_after_their_keys():
+    assert all(name == field.name for name, field in FIELDS.items())
+
+
+def test_fields_lie_within_wram():
+    for field in FIELDS.values():
+        last = field.address + field.stride * (field.count - 1) + field.width
+        assert WRAM_START <= field.address and last <= WRAM_END, field.name
+
+
+def test_uint_big_endian():
+    reader = RamReader([RamField("value", 0xD000, width=2)])
+    assert reader.read(make_ram({0xD000: 0x12, 0xD001: 0x34})).tolist() == [0x1234]
+
+
+def test_uint_little_endian():
+    reader = RamReader(["collision_ptr"])
+    ram = make_ram({0xD530: 0x34, 0xD531: 0x12})
+    assert reader.read(ram).tolist() == [0x1234]
+
+
+def test_bcd():
+    ram = make_ram({0xD347: 0x98, 0xD348: 0x76, 0xD349: 0x54})
+    assert RamReader(["money"]).read(ram).tolist() == [987654]
+
+
+def test_bitcount():
+    ram = make_ram({0xD2F7: 0b1011, 0xD2F7 + 0x12: 0x80})
+    assert RamReader(["pokedex_owned"]).read(ram).tolist() == [4]
+
+
+def test_bit():
+    reader = RamReader([RamField("flag", 0xD000, encoding="bit", bit=3)])
+    assert reader.read(make_ram({0xD000: 0b1000})).tolist() == [1]
+    assert reader.read(make_ram({0xD000: 0b0111})).tolist() == [0]
+
+
+def test_strided_fields():
+    ram = make_ram({0xD18C: 5, 0xD18C + 0x2C: 7, 0xD18C + 5 * 0x2C: 9})
+    assert RamReader(["party_level"]).read(ram).tolist() == [5, 7, 0, 0, 0, 9]
+
+
+def test_read_keeps_field_order_across_groups():
+    reader = RamReader(["money", "player_x", "badges", "player_y"])
+    ram = make_ram({0xD349: 0x42, 0xD362: 3, 0xD356: 0b111, 0xD361: 8})
+    assert reader.read(ram).tolist() == [42, 3, 3, 8]
+
+
+def test_read_dict_and_structured():
+    reader = RamReader(["map_id", "party_species"])
+    ram = make_ram({0xD35E: 1, 0xD164: 0xB1, 0xD169: 0x99})
+
+    values = reader.read_dict(ram)
+    assert values["map_id"].tolist() == [1]
+    assert values["party_species"].tolist() == [0xB1, 0, 0, 0, 0, 0x99]
+
+    record = reader.read_structured(ram)
+    assert record["party_species"].tolist() == values["party_species"].tolist()
+    assert reader.size == 7
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        RamReader([RamField("value", 0xD000, encoding="float")])
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from fake_pyboy import fake_task
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.recorder import (
+    EpisodeRecorder,
+    Recording,
+    capture_ram,
+)
+
+
+def record(path, steps: int, chunk_size: int, savestate_every: int = 4):
+    # Returns the RAM after every step, with a few bytes changed before each one
+    env = fake_task(PokemonBrock)(24, headless=True)
+    rng = np.random.default_rng(0)
+    rams = []
+    with EpisodeRecorder(env, str(path), chunk_size, savestate_every) as recorder:
+        recorder.reset()
+        for step in range(steps):
+            addresses = rng.integers(0xC000, 0xE000, 3)
+            env.pyboy.data[addresses] = rng.integers(0, 256, 3)
+            env.pyboy.data[0xFF90] = step
+            recorder.step([step / steps])
+            rams.append(capture_ram(env.pyboy))
+    return rams
+
+
+def test_round_trip_across_chunks(tmp_path):
+    rams = record(tmp_path, steps=25, chunk_size=10)
+    recording = Recording(str(tmp_path))
+
+    assert len(recording) == 25
+    assert [chunk["start"] for chunk in recording.chunks] == [0, 10, 20]
+    assert [len(data["rewards"]) for data in recording.iter_chunks()] == [10, 10, 5]
+
+    for step, ram in enumerate(rams):
+        assert np.array_equal(recording.ram(step), ram), step
+
+
+def test_iter_ram_matches_ram(tmp_path):
+    rams = record(tmp_path, steps=12, chunk_size=5)
+    recording = Recording(str(tmp_path))
+
+    replayed = []
+    for index in range(len(recording.chunks)):
+        replayed.extend(ram.copy() for ram in recording.iter_ram(index))
+    assert len(replayed) == len(rams)
+    assert all(np.array_equal(a, b) for a, b in zip(replayed, rams))
+
+
+def test_step_fields(tmp_path):
+    record(tmp_path, steps=6, chunk_size=4)
+    recording = Recording(str(tmp_path))
+
+    step = recording.step(5)
+    assert step["actions"].tolist() == [5 / 6]
+    assert step["episodes"] == 0
+    assert not step["dones"]
+    assert len(step["states"]) == recording.step(0)["states"].shape[0]
+
+    with pytest.raises(IndexError):
+        recording.step(6)
+
+
+def test_savestates(tmp_path):
+    record(tmp_path, steps=10, chunk_size=4, savestate_every=4)
+    recording = Recording(str(tmp_path))
+
+    saved, state_path, episode_path = recording.savestate(7)
+    assert saved == 4
+    assert state_path.exists() and episode_path.exists()
+    assert sorted(path.name for path in (tmp_path / "savestates").glob("*.state")) == [
+        "00000000.state",
+        "00000004.state",
+        "00000008.state",
+    ]
+
+
+def test_step_before_reset_is_rejected(tmp_path):
+    env = fake_task(PokemonBrock)(24, headless=True)
+    with pytest.raises(RuntimeError):
+        EpisodeRecorder(env, str(tmp_path)).step([0.0])
@@ -0,0 +1,47 @@
+from fake_pyboy import PLAYER_X, fake_task
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+
+
+class ScreenBrock(PokemonBrock):
+    # A submission whose state is built from the screen
+    screen_observation = True
+
+
+def test_ram_only_task_skips_rendering_when_headless():
+    env = fake_task(PokemonBrock)(24, headless=True)
+    env.step([0.0])
+    assert not env.render_frames
+    assert not env.screen.ndarray.any()
+
+
+def test_tasks_render_by_default():
+    env = fake_task(ScreenBrock)(24, headless=True)
+    env.step([0.0])
+    assert env.render_frames
+    assert env.screen.ndarray[0, 0, 0] == env.pyboy.frame_count
+
+
+def test_windowed_tasks_render():
+    env = fake_task(PokemonBrock)(24, headless=False)
+    assert env.render_frames
+
+
+def test_enable_rendering_does_not_advance_the_game():
+    env = fake_task(PokemonBrock)(24, headless=True)
+    env.step([0.0])
+    ram = env._read_ram().copy()
+
+    env.enable_rendering()
+    assert env.render_frames
+    assert env.screen.ndarray.any()
+    assert (env._read_ram() == ram).all()
+    assert env._game_stats()["location"]["x"] == ram[PLAYER_X - 0xCC00]
+
+
+def test_enable_rendering_renders_once():
+    env = fake_task(PokemonBrock)(24, headless=True)
+    env.enable_rendering()
+    frame_count = env.pyboy.frame_count
+
+    env.enable_rendering()
+    assert env.pyboy.frame_count == frame_count
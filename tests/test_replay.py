@@ -0,0 +1,79 @@
+import pytest
+
+from fake_pyboy import fake_task
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.recorder import EpisodeRecorder, Recording
+from pyboy_environment.environments.replay import replay
+
+
+class EpisodeBrock(PokemonBrock):
+    # Each episode is done after episode_length steps
+    episode_length = 3
+
+    def _check_if_done(self, game_stats: dict) -> bool:
+        return self.steps >= self.episode_length
+
+
+def run_agent(env, steps: int) -> dict:
+    # The loop of evaluate.run_agent, with the final stats it writes
+    state = env.reset()
+    for step in range(steps):
+        state, _, done, _ = env.step([step / steps])
+        if done:
+            state = env.reset()
+    return env._generate_game_stats()
+
+
+def record(path, steps: int) -> dict:
+    env = fake_task(EpisodeBrock)(24, headless=True)
+    with EpisodeRecorder(env, str(path), chunk_size=4, savestate_every=2) as recorder:
+        return run_agent(recorder, steps)
+
+
+@pytest.mark.parametrize("steps", [5, 6, 7])
+def test_final_stats_match_run_agent(tmp_path, steps):
+    # 6 steps end on a done step, which run_agent follows with a reset
+    final_stats = record(tmp_path, steps)
+
+    env = fake_task(EpisodeBrock)(24, headless=True)
+    result = replay(env, Recording(str(tmp_path)))
+
+    assert result["steps"] == steps
+    assert result["mismatches"] == []
+    assert result["final_stats"]["location"] == final_stats["location"]
+    assert result["final_stats"]["actions"] == steps - 1
+
+
+def test_final_done_resets(tmp_path):
+    record(tmp_path, 6)
+
+    env = fake_task(EpisodeBrock)(24, headless=True)
+    result = replay(env, Recording(str(tmp_path)))
+    assert result["final_stats"]["location"]["x"] == 5
+
+
+def test_checkpoints_and_start(tmp_path):
+    record(tmp_path, 7)
+    recording = Recording(str(tmp_path))
+
+    full = replay(fake_task(EpisodeBrock)(24, headless=True), recording, [1, 4])
+    part = replay(fake_task(EpisodeBrock)(24, headless=True), recording, [4], start=3)
+
+    assert sorted(full["checkpoints"]) == [1, 4]
+    assert part["checkpoints"][4] == full["checkpoints"][4]
+    assert part["steps"] == 7 - 2
+
+
+def test_diverging_replay_is_reported(tmp_path):
+    record(tmp_path, 4)
+    recording = Recording(str(tmp_path))
+
+    # One tile further right in the first savestate - the replay only matches again
+    # once step 3 starts the next episode from the init state
+    _, state_path, _ = recording.savestate(0)
+    data = bytearray(state_path.read_bytes())
+    data[0xD362] += 1
+    state_path.write_bytes(data)
+
+    env = fake_task(EpisodeBrock)(24, headless=True)
+    assert replay(env, recording)["mismatches"] == [0, 1, 2]
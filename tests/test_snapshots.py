@@ -0,0 +1,103 @@
+import pytest
+
+from pyboy_environment.environments.snapshots import MAX_FREE_BUFFERS, SnapshotRing
+
+
+class FakePyBoy:
+    # Savestates are the bytes of state
+    def __init__(self, state: bytes = b"") -> None:
+        self.state = state
+
+    def save_state(self, file) -> None:
+        file.write(self.state)
+
+    def load_state(self, file) -> None:
+        self.state = file.read()
+
+
+def test_load_restores_saved_state():
+    pyboy = FakePyBoy(b"first")
+    ring = SnapshotRing()
+    handle = ring.save(pyboy, {"steps": 1})
+
+    pyboy.state = b"second, which is longer"
+    assert ring.load(pyboy, handle) == {"steps": 1}
+    assert pyboy.state == b"first"
+
+
+def test_reused_buffer_holds_only_new_state():
+    pyboy = FakePyBoy(b"a much longer first state")
+    ring = SnapshotRing()
+    ring.discard(ring.save(pyboy, {}))
+
+    pyboy.state = b"short"
+    handle = ring.save(pyboy, {})
+    pyboy.state = b""
+    ring.load(pyboy, handle)
+    assert pyboy.state == b"short"
+    assert ring.stats()["bytes"] == len(b"short")
+
+
+def test_max_snapshots_evicts_least_recently_used():
+    pyboy = FakePyBoy(b"state")
+    ring = SnapshotRing(max_snapshots=2)
+    first = ring.save(pyboy, {})
+    second = ring.save(pyboy, {})
+    ring.load(pyboy, first)
+
+    third = ring.save(pyboy, {})
+    assert first in ring and third in ring
+    assert second not in ring
+    assert ring.evictions == 1
+
+
+def test_max_bytes_keeps_newest_snapshot():
+    pyboy = FakePyBoy(b"0123456789")
+    ring = SnapshotRing(max_bytes=15)
+    first = ring.save(pyboy, {})
+    second = ring.save(pyboy, {})
+
+    assert first not in ring and second in ring
+    assert ring.stats()["bytes"] == 10
+
+    pyboy.state = b"over the byte limit"
+    third = ring.save(pyboy, {})
+    assert list(ring._snapshots) == [third]
+
+
+def test_load_evicted_snapshot_raises():
+    pyboy = FakePyBoy(b"state")
+    ring = SnapshotRing(max_snapshots=1)
+    first = ring.save(pyboy, {})
+    ring.save(pyboy, {})
+
+    with pytest.raises(ValueError):
+        ring.load(pyboy, first)
+
+
+def test_clear_is_not_counted_as_eviction():
+    pyboy = FakePyBoy(b"state")
+    ring = SnapshotRing()
+    for _ in range(3):
+        ring.save(pyboy, {})
+
+    ring.clear()
+    assert len(ring) == 0
+    assert ring.stats()["bytes"] == 0
+    assert ring.evictions == 0
+
+
+def test_free_buffers_are_bounded_and_empty():
+    pyboy = FakePyBoy(b"state")
+    ring = SnapshotRing()
+    for _ in range(MAX_FREE_BUFFERS + 3):
+        ring.save(pyboy, {})
+
+    ring.clear()
+    assert len(ring._free_buffers) == MAX_FREE_BUFFERS
+    assert all(buffer.getvalue() == b"" for buffer in ring._free_buffers)
+
+
+def test_max_snapshots_must_be_positive():
+    with pytest.raises(ValueError):
+        SnapshotRing(max_snapshots=0)
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from pyboy_environment.environments import state_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    state_cache.clear()
+    yield
+    state_cache.clear()
+
+
+def write_state(path, content: bytes, mtime_ns: int) -> None:
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_load_state_returns_file_content(tmp_path):
+    path = tmp_path / "init.state"
+    write_state(path, b"state", 1_000_000_000)
+
+    assert state_cache.load_state(str(path)).read() == b"state"
+
+
+def test_load_state_reads_file_once(tmp_path):
+    path = tmp_path / "init.state"
+    write_state(path, b"state", 1_000_000_000)
+    state_cache.load_state(str(path))
+
+    path.unlink()
+    assert state_cache.load_state(str(path)).read() == b"state"
+
+
+def test_load_state_returns_independent_buffers(tmp_path):
+    path = tmp_path / "init.state"
+    write_state(path, b"state", 1_000_000_000)
+
+    first = state_cache.load_state(str(path))
+    first.read()
+    assert state_cache.load_state(str(path)).read() == b"state"
+
+
+def test_load_state_ignores_changes_by_default(tmp_path):
+    path = tmp_path / "init.state"
+    write_state(path, b"old", 1_000_000_000)
+    state_cache.load_state(str(path))
+
+    write_state(path, b"new state", 2_000_000_000)
+    assert state_cache.load_state(str(path)).read() == b"old"
+
+
+def test_load_state_rereads_changed_file(tmp_path):
+    path = tmp_path / "init.state"
+    write_state(path, b"old", 1_000_000_000)
+    state_cache.load_state(str(path))
+
+    write_state(path, b"new state", 2_000_000_000)
+    assert state_cache.load_state(str(path), check_for_changes=True).read() == (
+        b"new state"
+    )
+
+
+def test_clear_forgets_states(tmp_path):
+    path = tmp_path / "init.state"
+    write_state(path, b"state", 1_000_000_000)
+    state_cache.load_state(str(path))
+
+    state_cache.clear()
+    path.unlink()
+    with pytest.raises(FileNotFoundError):
+        state_cache.load_state(str(path))
@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+
+from pyboy_environment.statistical_ranking import (
+    METRICS,
+    bootstrap_ranking,
+    load_runs,
+    rank_rows,
+)
+
+
+def runs_of(*rows) -> np.ndarray:
+    return np.array(rows, dtype=float).reshape(len(rows), len(METRICS))
+
+
+def test_rank_rows_compares_metrics_in_order():
+    values = np.array(
+        [
+            [[1, 0, 0, 0, 0], [1, 2, 0, 0, 0], [0, 9, 9, 9, 9]],
+            [[0, 0, 0, 0, 0], [0, 0, 0, 0, 1], [0, 0, 0, 0, 1]],
+        ],
+        dtype=float,
+    )
+    # Equal submissions keep their order
+    assert rank_rows(values).tolist() == [[1, 0, 2], [2, 0, 1]]
+
+
+def test_empty_ranking():
+    assert bootstrap_ranking({}) == []
+
+
+def test_separated_submissions():
+    runs = {
+        "low": runs_of([0, 0, 1, 5, 10], [0, 0, 2, 5, 12]),
+        "high": runs_of([1, 1, 3, 8, 50], [1, 2, 3, 9, 60], [1, 1, 4, 9, 55]),
+    }
+
+    ranking = bootstrap_ranking(runs, samples=200, seed=0)
+    assert [entry["upi"] for entry in ranking] == ["high", "low"]
+    assert [entry["rank"] for entry in ranking] == [1, 2]
+    assert ranking[0]["rank_interval"] == (1, 1)
+    assert ranking[0]["runs"] == 3
+    assert ranking[0]["means"]["caught_pokemon"] == 4 / 3
+    assert ranking[0]["above_next"] == 1.0
+    assert not ranking[0]["tied_with_next"]
+    assert ranking[1]["above_next"] is None
+    assert [entry["tie_group"] for entry in ranking] == [0, 1]
+
+
+def test_overlapping_submissions_are_tied():
+    runs = {
+        "a": runs_of([0, 0, 1, 5, 10], [0, 0, 3, 5, 10]),
+        "b": runs_of([0, 0, 2, 5, 10], [0, 0, 2, 5, 10]),
+    }
+
+    ranking = bootstrap_ranking(runs, samples=500, seed=0)
+    assert ranking[0]["tied_with_next"]
+    assert ranking[0]["tie_group"] == ranking[1]["tie_group"]
+    assert ranking[0]["rank_interval"] == (1, 2)
+
+
+def test_intervals_contain_means():
+    rng = np.random.default_rng(1)
+    runs = {upi: rng.uniform(0, 10, (4, len(METRICS))) for upi in "abc"}
+
+    for entry in bootstrap_ranking(runs, samples=300, seed=2):
+        for name in METRICS:
+            low, high = entry["intervals"][name]
+            assert low <= entry["means"][name] <= high
+
+
+def test_batch_size_does_not_change_result():
+    rng = np.random.default_rng(3)
+    runs = {
+        upi: rng.integers(0, 3, (n, len(METRICS))) for upi, n in zip("abc", [2, 5, 3])
+    }
+
+    expected = bootstrap_ranking(runs, samples=100, seed=4)
+    assert bootstrap_ranking(runs, samples=100, seed=4, batch_size=7) == expected
+
+
+def test_load_runs_counts_copies_as_runs(tmp_path):
+    run = {name: 1 for name in METRICS}
+    run["levels"] = [2, 4]
+    (tmp_path / "a").mkdir()
+    with open(tmp_path / "a" / "results.json", "w", encoding="utf-8") as file:
+        json.dump({**run, "copies": [run, {**run, "badges": 2}]}, file)
+    with open(tmp_path / "a" / "results_seed1.json", "w", encoding="utf-8") as file:
+        json.dump(run, file)
+    (tmp_path / "empty").mkdir()
+
+    runs = load_runs(str(tmp_path))
+    assert list(runs) == ["a"]
+    assert runs["a"].tolist() == [[1, 1, 1, 3, 1], [2, 1, 1, 3, 1], [1, 1, 1, 3, 1]]
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from pyboy_environment.submission_sources import (
+    CHECKSUMS,
+    LocalSource,
+    Submission,
+    SubmissionFile,
+    SubmissionSource,
+    fetch_submissions,
+)
+
+
+def make_submission(root, upi: str, models: dict[str, bytes]) -> None:
+    directory = root / upi
+    directory.mkdir(parents=True)
+    (directory / "requirements.txt").write_text("numpy\n")
+    (directory / "brock.py").write_text(f"# {upi}\n")
+    if models:
+        (directory / "my models").mkdir()
+        for name, content in models.items():
+            (directory / "my models" / name).write_bytes(content)
+
+
+class CountingSource(LocalSource):
+    def __init__(self, root: str) -> None:
+        super().__init__(root)
+        self.downloads = []
+
+    def download(self, file: SubmissionFile, path: str) -> None:
+        self.downloads.append(file.source)
+        super().download(file, path)
+
+
+@pytest.fixture
+def source_root(tmp_path):
+    root = tmp_path / "source"
+    make_submission(root, "upi1", {"SAC_actor.pht": b"actor", "SAC_critic.pht": b"c"})
+    make_submission(root, "upi2", {"TD3_actor.pht": b"actor"})
+    make_submission(root, "upi3", {})
+    return root
+
+
+def test_source_is_abstract():
+    with pytest.raises(TypeError):
+        SubmissionSource()
+
+
+def test_local_source_lists_models(source_root):
+    submissions = {s.upi: s for s in LocalSource(str(source_root)).submissions()}
+
+    names = [file.name for file in submissions["upi1"].files]
+    assert names == [
+        "brock.py",
+        "requirements.txt",
+        "models/SAC_actor.pht",
+        "models/SAC_critic.pht",
+    ]
+    assert submissions["upi1"].model_name == "SAC"
+    assert submissions["upi2"].model_name == "TD3"
+
+
+def test_model_name_without_models():
+    assert Submission("upi", [SubmissionFile("brock.py", "", "")]).model_name is None
+
+
+def test_fetch_copies_submissions(source_root, tmp_path):
+    destination = tmp_path / "submissions"
+    source = LocalSource(str(source_root))
+    fetched = {
+        submission.upi: directory
+        for submission, directory in fetch_submissions(source, str(destination))
+    }
+
+    # Submissions without models are skipped
+    assert sorted(fetched) == ["upi1", "upi2"]
+    assert fetched["upi1"] == destination / "upi1"
+    assert (destination / "upi1" / "models" / "SAC_actor.pht").read_bytes() == b"actor"
+    assert (destination / "upi2" / "brock.py").read_text() == "# upi2\n"
+    assert not list(destination.glob("**/*.part"))
+
+    with open(destination / CHECKSUMS, "r", encoding="utf-8") as file:
+        assert "upi1/models/SAC_critic.pht" in json.load(file)
+
+
+def test_fetch_skips_unchanged_files(source_root, tmp_path):
+    destination = tmp_path / "submissions"
+    list(fetch_submissions(CountingSource(str(source_root)), str(destination)))
+
+    (source_root / "upi1" / "brock.py").write_text("# changed\n")
+    source = CountingSource(str(source_root))
+    list(fetch_submissions(source, str(destination)))
+
+    assert source.downloads == [str(source_root / "upi1" / "brock.py")]
+    assert (destination / "upi1" / "brock.py").read_text() == "# changed\n"
+
+
+def test_fetch_downloads_missing_files_again(source_root, tmp_path):
+    destination = tmp_path / "submissions"
+    list(fetch_submissions(LocalSource(str(source_root)), str(destination)))
+
+    (destination / "upi2" / "brock.py").unlink()
+    source = CountingSource(str(source_root))
+    list(fetch_submissions(source, str(destination)))
+
+    assert source.downloads == [str(source_root / "upi2" / "brock.py")]
+
+
+def test_fetch_continues_after_failed_submission(source_root, tmp_path):
+    class FailingSource(LocalSource):
+        def download(self, file: SubmissionFile, path: str) -> None:
+            if "upi1" in file.source:
+                raise OSError("connection reset")
+            super().download(file, path)
+
+    fetched = [
+        submission.upi
+        for submission, _ in fetch_submissions(
+            FailingSource(str(source_root)), str(tmp_path / "submissions")
+        )
+    ]
+    assert fetched == ["upi2"]
@@ -0,0 +1,79 @@
+import pickle
+
+import pytest
+
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.task_loader import load_task, task_source
+
+TASK = """
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock as Base
+
+
+class PokemonBrock(Base):
+    REWARD = {reward}
+
+
+class NotATask:
+    pass
+"""
+
+
+def write_task(directory, reward: int):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "brock.py"
+    path.write_text(TASK.format(reward=reward))
+    return path
+
+
+def test_load_task_returns_class_from_file(tmp_path):
+    task_class = load_task(str(write_task(tmp_path / "upi1", 1)))
+
+    assert task_class.REWARD == 1
+    assert issubclass(task_class, PokemonBrock)
+    assert task_class is not PokemonBrock
+
+
+def test_submissions_load_side_by_side(tmp_path):
+    first = load_task(str(write_task(tmp_path / "upi1", 1)))
+    second = load_task(str(write_task(tmp_path / "upi2", 2)))
+
+    assert (first.REWARD, second.REWARD) == (1, 2)
+    assert first.__module__ != second.__module__
+
+
+def test_load_task_is_cached_per_path(tmp_path):
+    path = str(write_task(tmp_path / "upi1", 1))
+    assert load_task(path) is load_task(path)
+
+
+def test_task_source(tmp_path):
+    path = write_task(tmp_path / "upi1", 1)
+    task_class = load_task(str(path))
+
+    assert task_source(task_class) == (str(path.resolve()), "PokemonBrock")
+    assert task_source(PokemonBrock) is None
+
+
+def test_loaded_class_is_loaded_again_in_workers(tmp_path):
+    # What VecPyboyEnvironment passes to its workers instead of the class
+    task_class = load_task(str(write_task(tmp_path / "upi1", 1)))
+    assert load_task(*pickle.loads(pickle.dumps(task_source(task_class)))) is task_class
+
+
+def test_load_task_rejects_other_classes(tmp_path):
+    path = str(write_task(tmp_path / "upi1", 1))
+    with pytest.raises(TypeError):
+        load_task(path, "NotATask")
+    with pytest.raises(TypeError):
+        load_task(path, "Missing")
+
+
+def test_failed_import_is_not_cached(tmp_path):
+    path = tmp_path / "upi1" / "brock.py"
+    path.parent.mkdir()
+    path.write_text("raise RuntimeError('broken')\n")
+    with pytest.raises(RuntimeError):
+        load_task(str(path))
+
+    write_task(tmp_path / "upi1", 3)
+    assert load_task(str(path)).REWARD == 3
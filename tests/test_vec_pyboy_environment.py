@@ -0,0 +1,161 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from fake_pyboy import make_env
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+from pyboy_environment.environments.vec_pyboy_environment import VecPyboyEnvironment
+
+
+class EpisodeBrock(PokemonBrock):
+    # Episodes end after done_after steps, or are truncated after truncate_after
+    done_after = 3
+    truncate_after = 1000
+
+    def _check_if_done(self, game_stats: dict) -> bool:
+        return self.steps >= self.done_after
+
+    def _check_if_truncated(self, game_stats: dict) -> bool:
+        return self.steps >= self.truncate_after
+
+
+def make_vec(
+    num_envs: int = 2,
+    task_class: type = PokemonBrock,
+    shared_memory: bool = False,
+    reset_on_truncated: bool = True,
+    **kwargs,
+) -> VecPyboyEnvironment:
+    env_fns = [partial(make_env, task_class, **kwargs)] * num_envs
+    return VecPyboyEnvironment(
+        env_fns,
+        start_method="fork",
+        shared_memory=shared_memory,
+        reset_on_truncated=reset_on_truncated,
+    )
+
+
+@pytest.fixture
+def continuous_vec():
+    vec = make_vec()
+    yield vec
+    vec.close()
+
+
+@pytest.fixture
+def discrete_vec():
+    vec = make_vec(discrete_actions=True)
+    yield vec
+    vec.close()
+
+
+def test_continuous_sample_action(continuous_vec):
+    actions = continuous_vec.sample_action()
+    assert not continuous_vec.discrete_actions
+    assert actions.shape == (2, 1)
+    assert actions.dtype == np.float64
+    assert ((actions >= 0) & (actions <= 1)).all()
+
+
+def test_discrete_sample_action_covers_every_button(discrete_vec):
+    num_buttons = discrete_vec.max_action_value + 1
+    actions = np.concatenate([discrete_vec.sample_action() for _ in range(200)])
+
+    assert discrete_vec.discrete_actions
+    assert np.issubdtype(actions.dtype, np.integer)
+    assert set(actions.ravel().tolist()) == set(range(num_buttons))
+
+
+def test_discrete_sample_action_steps(discrete_vec):
+    discrete_vec.reset()
+    states, rewards, dones, truncateds = discrete_vec.step(discrete_vec.sample_action())
+    assert len(states) == len(rewards) == 2
+
+
+@pytest.fixture(params=[False, True], ids=["pipe", "shared_memory"])
+def episode_vec(request):
+    vec = make_vec(task_class=EpisodeBrock, shared_memory=request.param)
+    yield vec
+    vec.close()
+
+
+def locations(states: np.ndarray) -> list[int]:
+    # The player's x position, which the fake emulator moves by one each frame
+    return states[:, 0].tolist()
+
+
+def test_step_resets_finished_envs(episode_vec):
+    assert locations(episode_vec.reset()) == [5, 5]
+
+    for expected in ([29, 29], [53, 53]):
+        states, rewards, dones, truncateds = episode_vec.step(np.zeros((2, 1)))
+        assert locations(states) == expected
+        assert not dones.any() and not truncateds.any()
+        assert rewards.shape == (2,)
+
+    # The done step returns the first state of the next episode
+    states, _, dones, _ = episode_vec.step(np.zeros((2, 1)))
+    assert dones.tolist() == [True, True]
+    assert locations(states) == [5, 5]
+
+    states, _, dones, _ = episode_vec.step(np.zeros((2, 1)))
+    assert not dones.any()
+    assert locations(states) == [29, 29]
+
+
+def test_set_attr_targets_each_env(episode_vec):
+    episode_vec.reset()
+    episode_vec.set_attr("done_after", [1, 3])
+
+    states, _, dones, _ = episode_vec.step(np.zeros((2, 1)))
+    assert dones.tolist() == [True, False]
+    assert locations(states) == [5, 29]
+    assert episode_vec.call("_check_if_done", {}) == [False, False]
+
+
+@pytest.mark.parametrize("shared_memory", [False, True])
+@pytest.mark.parametrize("reset_on_truncated", [False, True])
+def test_truncated_resets_when_asked(shared_memory, reset_on_truncated):
+    vec = make_vec(
+        task_class=EpisodeBrock,
+        shared_memory=shared_memory,
+        reset_on_truncated=reset_on_truncated,
+    )
+    try:
+        vec.reset()
+        vec.set_attr("truncate_after", [1, 1])
+        states, _, dones, truncateds = vec.step(np.zeros((2, 1)))
+
+        assert truncateds.tolist() == [True, True]
+        assert not dones.any()
+        assert locations(states) == ([5, 5] if reset_on_truncated else [29, 29])
+    finally:
+        vec.close()
+
+
+def test_grab_frames(episode_vec):
+    episode_vec.reset()
+    frames = episode_vec.grab_frames()
+
+    assert frames.shape == (2, 144, 160, 3)
+    assert frames.dtype == np.uint8
+    assert frames.any()
+
+
+def test_shared_memory_views_are_read_only():
+    vec = make_vec(task_class=EpisodeBrock, shared_memory=True)
+    try:
+        vec.reset()
+        states, rewards, dones, _ = vec.step(np.zeros((2, 1)))
+        for array in (states, rewards, dones, vec.grab_frames()):
+            with pytest.raises(ValueError):
+                array[0] = 0
+
+        # Valid until the next step, which writes into the same blocks
+        kept = states.copy()
+        vec.step(np.zeros((2, 1)))
+        assert locations(kept) == [29, 29]
+        assert locations(states) == [53, 53]
+    finally:
+        vec.close()
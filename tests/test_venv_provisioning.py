@@ -0,0 +1,102 @@
+import pytest
+
+pytest.importorskip("virtualenv")
+
+from pyboy_environment.venv_provisioning import (
+    InstallStep,
+    VenvProvisioner,
+    absolute_requirements,
+    normalise_requirements,
+)
+
+
+def test_normalise_ignores_comments_and_order():
+    first = "# pinned\nnumpy==1.26.4\n\nscipy  # for ranking\n"
+    second = "scipy\nnumpy==1.26.4\n"
+    assert normalise_requirements(first) == normalise_requirements(second)
+
+
+def test_normalise_keeps_urls_and_fragments():
+    text = (
+        "--index-url https://Example.com/Simple\n"
+        "git+https://github.com/Org/Repo.git#egg=Repo&subdirectory=Sub  # note\n"
+    )
+    assert normalise_requirements(text) == [
+        "--index-url https://Example.com/Simple",
+        "git+https://github.com/Org/Repo.git#egg=Repo&subdirectory=Sub",
+    ]
+
+
+def test_normalise_joins_continuation_lines():
+    assert normalise_requirements("numpy \\\n==1.26.4\n") == ["numpy ==1.26.4"]
+
+
+def test_absolute_includes():
+    text = "-r base.txt\n--requirement=../common.txt\n-c pins.txt\n"
+    assert absolute_requirements(text, "/sub/dir").splitlines() == [
+        "-r /sub/dir/base.txt",
+        "--requirement=/sub/common.txt",
+        "-c /sub/dir/pins.txt",
+    ]
+
+
+def test_absolute_local_paths():
+    text = "-e .\n-e ./package[extra]\n../other\n.hidden\n"
+    assert absolute_requirements(text, "/sub/dir").splitlines() == [
+        "-e /sub/dir",
+        "-e /sub/dir/package[extra]",
+        "/sub/other",
+        ".hidden",
+    ]
+
+
+def test_absolute_leaves_urls_and_names():
+    text = (
+        "-r https://example.com/requirements.txt\n"
+        "--extra-index-url https://Example.com/Simple\n"
+        "Torch==2.2.0\n"
+        "pkg @ file:///opt/Pkg\n"
+    )
+    assert absolute_requirements(text, "/sub/dir") == text
+
+
+@pytest.fixture
+def provisioner(tmp_path):
+    return VenvProvisioner(str(tmp_path / "venv"))
+
+
+def write(path, text: str) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_snapshot_installs_original_text(provisioner, tmp_path):
+    text = "--index-url https://Example.com/Simple\nRepo @ git+https://x/R.git#egg=R\n"
+    path = write(tmp_path / "upi" / "requirements.txt", text)
+
+    _, (step,) = provisioner._snapshot([InstallStep("requirements", path)])
+    with open(step.path, "r", encoding="utf-8") as file:
+        assert file.read() == text
+
+
+def test_snapshot_resolves_includes_from_original_directory(provisioner, tmp_path):
+    path = write(tmp_path / "upi" / "requirements.txt", "-r base.txt\n")
+
+    _, (step,) = provisioner._snapshot([InstallStep("requirements", path)])
+    with open(step.path, "r", encoding="utf-8") as file:
+        assert file.read() == f"-r {tmp_path / 'upi' / 'base.txt'}\n"
+
+
+def test_snapshot_keys(provisioner, tmp_path):
+    def key(path: str) -> str:
+        return provisioner._snapshot([InstallStep("requirements", path)])[0]
+
+    plain = key(write(tmp_path / "a" / "requirements.txt", "numpy\nscipy\n"))
+    same = key(write(tmp_path / "b" / "requirements.txt", "scipy  # x\nnumpy\n"))
+    assert plain == same
+
+    # The same relative include names a different file in each directory
+    first = key(write(tmp_path / "a" / "requirements.txt", "-r base.txt\n"))
+    second = key(write(tmp_path / "b" / "requirements.txt", "-r base.txt\n"))
+    assert first != second